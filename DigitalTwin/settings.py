@@ -62,6 +62,9 @@ if os.name == 'nt':
 SECRET_KEY = os.environ.get("SECRET_KEY")
 MAPBOX_ACCESS_TOKEN = os.environ.get("MAPBOX_ACCESS_TOKEN")
 TITILER_BASE_URL = os.environ.get("TITILER_BASE_URL")
+WEATHER_INGEST_TOKEN = os.environ.get("WEATHER_INGEST_TOKEN")
+WATER_INDICATOR_CACHE_TIMEOUT = int(os.environ.get("WATER_INDICATOR_CACHE_TIMEOUT", 900))
+WATER_SCENARIO_TIMEOUT = int(os.environ.get("WATER_SCENARIO_TIMEOUT", 3600))
 
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = os.environ.get("DEBUG", "False").lower() == "true"
@@ -148,6 +151,21 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/ref/settings/#caches
+# Shared by every worker and management command: watersupply.cache retires
+# cached indicator bundles through a stamp stored here, which a per-process
+# cache would only bump in the process that wrote.
+# Create the table with `python manage.py createcachetable`.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "django_cache",
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
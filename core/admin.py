@@ -1,3 +1,19 @@
 from django.contrib import admin
+from .models import ZonalStat, ZonalStatRequest
+
+
+class ZonalStatAdmin(admin.ModelAdmin):
+    model = ZonalStat
+    list_display = ['raster_model', 'raster_id', 'band', 'zone_level', 'zone_id', 'count', 'mean', 'min', 'max']
+    list_filter = ['raster_model', 'zone_level']
+    search_fields = ['zone_id']
+
+
+class ZonalStatRequestAdmin(admin.ModelAdmin):
+    model = ZonalStatRequest
+    list_display = ['requested_at', 'raster_model', 'raster_id', 'zone_level', 'zone_id']
+    list_filter = ['raster_model', 'zone_level']
 
 # Register your models here.
+admin.site.register(ZonalStat, ZonalStatAdmin)
+admin.site.register(ZonalStatRequest, ZonalStatRequestAdmin)
@@ -0,0 +1,87 @@
+"""
+PostgreSQL COPY helpers for bulk loads.
+
+Works with both psycopg (3) and psycopg2, whichever Django is using.
+"""
+import io
+
+from django.db import connection
+
+
+def _quote(name):
+    return connection.ops.quote_name(name)
+
+
+def copy_csv(cursor, table, columns, buffer):
+    """
+    Stream CSV text from ``buffer`` into ``table`` with COPY FROM STDIN.
+
+    Empty fields are loaded as NULL.
+    """
+    sql = (
+        f"COPY {_quote(table)} ({', '.join(_quote(c) for c in columns)}) "
+        f"FROM STDIN WITH (FORMAT csv, NULL '')"
+    )
+    raw = cursor.cursor
+    if hasattr(raw, 'copy'):
+        # psycopg 3
+        with raw.copy(sql) as copy:
+            while chunk := buffer.read(1 << 20):
+                copy.write(chunk)
+    else:
+        # psycopg2
+        raw.copy_expert(sql, buffer)
+
+
+def dataframe_to_csv_buffer(df, columns):
+    """Serialise the given DataFrame columns into an in-memory CSV buffer."""
+    buffer = io.StringIO()
+    df.to_csv(buffer, columns=columns, index=False, header=False, na_rep='')
+    buffer.seek(0)
+    return buffer
+
+
+def stage_dataframe(cursor, table, df, columns):
+    """
+    COPY a DataFrame into a temporary table shaped like ``table``.
+
+    Returns:
+        Name of the staging table; the caller drops it when done.
+    """
+    staging = f"{table}_staging"
+    cursor.execute(f"DROP TABLE IF EXISTS {_quote(staging)}")
+    cursor.execute(
+        f"CREATE TEMP TABLE {_quote(staging)} AS "
+        f"SELECT {', '.join(_quote(c) for c in columns)} FROM {_quote(table)} WITH NO DATA"
+    )
+    copy_csv(cursor, staging, columns, dataframe_to_csv_buffer(df, columns))
+    return staging
+
+
+def copy_dataframe(table, df, columns, conflict_columns=None):
+    """
+    COPY a DataFrame into ``table``.
+
+    With ``conflict_columns`` the rows are staged in a temporary table and
+    merged with ``INSERT ... ON CONFLICT DO NOTHING``, so duplicates of
+    existing rows are skipped instead of aborting the load.
+
+    Returns:
+        Number of rows inserted.
+    """
+    column_sql = ', '.join(_quote(c) for c in columns)
+
+    with connection.cursor() as cursor:
+        if not conflict_columns:
+            copy_csv(cursor, table, columns, dataframe_to_csv_buffer(df, columns))
+            return len(df)
+
+        staging = stage_dataframe(cursor, table, df, columns)
+        cursor.execute(
+            f"INSERT INTO {_quote(table)} ({column_sql}) "
+            f"SELECT {column_sql} FROM {_quote(staging)} "
+            f"ON CONFLICT ({', '.join(_quote(c) for c in conflict_columns)}) DO NOTHING"
+        )
+        inserted = cursor.rowcount
+        cursor.execute(f"DROP TABLE {_quote(staging)}")
+        return inserted
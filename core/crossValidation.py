@@ -0,0 +1,236 @@
+"""
+Leave-one-out cross-validation of the interpolation methods.
+
+Every station is predicted from the other stations and compared with its
+measured value. All stations are held out at once: one KDTree query with
+``k + 1`` neighbours gives each station its neighbourhood without itself,
+and every method is then evaluated on those (stations, k) neighbour arrays
+in batched numpy — no loop per held-out station. The neighbour query is
+shared by all candidate methods.
+
+``select_method`` turns the scores into the 'auto' interpolation method.
+"""
+import numpy as np
+from scipy.spatial import KDTree
+from scipy.special import xlogy
+
+from core.kriging import fit_variogram, krige_neighbours, merge_duplicate_points
+
+
+# Candidates tried by method='auto'; parameters are make_interpolator kwargs
+DEFAULT_CANDIDATES = [
+    {'method': 'nearest'},
+    {'method': 'idw', 'power': 1},
+    {'method': 'idw', 'power': 2},
+    {'method': 'idw', 'power': 3},
+    {'method': 'linear'},
+    {'method': 'spline'},
+    {'method': 'kriging', 'variogram_model': 'spherical'},
+    {'method': 'kriging', 'variogram_model': 'exponential'},
+]
+
+# Neighbourhood of the local methods when a candidate sets no k, as
+# core.rasterOperations.LOCAL_K; IDW then uses every station
+DEFAULT_K = 12
+
+# Fewer stations than this leave nothing meaningful to hold out
+MIN_STATIONS = 4
+
+
+def _loo_neighbours(coords, k):
+    """
+    (dist, idx) of the k nearest *other* stations of every station.
+
+    The station itself is moved out of its own neighbour list even when
+    several stations share its coordinates.
+    """
+    n = len(coords)
+    kq = min(k + 1, n)
+    dist, idx = KDTree(coords).query(coords, k=kq, workers=-1)
+    dist, idx = dist.reshape(n, kq), idx.reshape(n, kq)
+    order = np.argsort(idx == np.arange(n)[:, np.newaxis], axis=1, kind='stable')
+    return np.take_along_axis(dist, order, 1)[:, :-1], np.take_along_axis(idx, order, 1)[:, :-1]
+
+
+def _solve(A, b):
+    try:
+        return np.linalg.solve(A, b[..., np.newaxis])[..., 0]
+    except np.linalg.LinAlgError:
+        # Degenerate neighbourhoods (e.g. collinear stations): least squares
+        return (np.linalg.pinv(A) @ b[..., np.newaxis])[..., 0]
+
+
+def _predict_nearest(coords, values, dist, idx, **params):
+    return values[idx[:, 0]]
+
+
+def _predict_idw(coords, values, dist, idx, power=1, **params):
+    weights = 1 / (dist + 1e-10) ** power
+    return (weights * values[idx]).sum(axis=1) / weights.sum(axis=1)
+
+
+_RBF_KERNELS = {
+    # kernel(r), degree of the polynomial tail — as scipy's RBFInterpolator
+    'linear': (lambda r: -r, 0),
+    'spline': (lambda r: xlogy(r ** 2, r), 1),
+}
+
+
+def _predict_rbf(coords, values, dist, idx, method='linear', **params):
+    """Local RBF fitted to each station's neighbours, evaluated at the station."""
+    kernel, degree = _RBF_KERNELS[method]
+    m, k = idx.shape
+
+    # Centre every neighbourhood on its held-out station
+    local = coords[idx] - coords[:, np.newaxis, :]                         # (m, k, 2)
+    between = np.linalg.norm(local[:, :, None, :] - local[:, None, :, :], axis=-1)
+    poly = np.ones((m, k, 1)) if degree == 0 else np.concatenate([np.ones((m, k, 1)), local], axis=2)
+    p = poly.shape[2]
+
+    A = np.zeros((m, k + p, k + p))
+    A[:, :k, :k] = kernel(between)
+    A[:, :k, k:] = poly
+    A[:, k:, :k] = poly.transpose(0, 2, 1)
+    b = np.zeros((m, k + p))
+    b[:, :k] = values[idx]
+
+    coef = _solve(A, b)
+    # At the origin the polynomial tail reduces to its constant term
+    return np.einsum('ij,ij->i', coef[:, :k], kernel(dist)) + coef[:, k]
+
+
+def _predict_kriging(coords, values, dist, idx, variogram=None, **params):
+    return krige_neighbours(dist, idx, coords, values, variogram)
+
+
+_PREDICTORS = {
+    'nearest': _predict_nearest,
+    'idw': _predict_idw,
+    'linear': _predict_rbf,
+    'spline': _predict_rbf,
+    'kriging': _predict_kriging,
+}
+
+
+def _candidate_k(candidate, n):
+    k = candidate.get('k')
+    if candidate['method'] == 'nearest':
+        k = 1
+    elif k is None:
+        k = n if candidate['method'] == 'idw' else DEFAULT_K
+    if candidate['method'] == 'spline':
+        k = max(k, 4)
+    return max(1, min(int(k), n - 1))
+
+
+def loo_errors(point_x, point_y, point_values, candidates):
+    """
+    Leave-one-out residuals (predicted - measured) of every candidate.
+
+    Returns:
+        list of 1D arrays, one per candidate (empty when too few stations),
+        one residual per distinct station in merge_duplicate_points order
+    """
+    point_x, point_y, point_values = merge_duplicate_points(
+        np.asarray(point_x, dtype=float),
+        np.asarray(point_y, dtype=float),
+        np.asarray(point_values, dtype=float),
+    )
+    n = len(point_values)
+    if n < MIN_STATIONS:
+        return [np.empty(0) for _ in candidates]
+
+    coords = np.c_[point_x, point_y]
+    k_max = max(_candidate_k(c, n) for c in candidates)
+    dist, idx = _loo_neighbours(coords, k_max)
+
+    variograms = {}
+    errors = []
+    for candidate in candidates:
+        method = candidate['method']
+        if method not in _PREDICTORS:
+            raise ValueError(f"Cannot cross-validate method '{method}'")
+        k = _candidate_k(candidate, n)
+        params = {key: value for key, value in candidate.items() if key != 'k'}
+        if method == 'kriging':
+            model = candidate.get('variogram_model', 'spherical')
+            if model not in variograms:
+                variograms[model] = fit_variogram(point_x, point_y, point_values, model=model)
+            params['variogram'] = variograms[model]
+        predicted = _PREDICTORS[method](coords, point_values, dist[:, :k], idx[:, :k], **params)
+        errors.append(predicted - point_values)
+    return errors
+
+
+def cross_validate(samples, candidates=None):
+    """
+    Score candidates over one or more station samples (e.g. the timesteps
+    of a date range); residuals of all samples are pooled.
+
+    Parameters:
+    - samples: iterable of (point_x, point_y, point_values).
+    - candidates: list of {'method': ..., **make_interpolator params};
+      DEFAULT_CANDIDATES when omitted.
+
+    Returns:
+        list of {'method', 'params', 'rmse', 'mae', 'n'} sorted by RMSE.
+    """
+    candidates = candidates or DEFAULT_CANDIDATES
+    pooled = [[] for _ in candidates]
+    for point_x, point_y, point_values in samples:
+        for residuals, errors in zip(pooled, loo_errors(point_x, point_y, point_values, candidates)):
+            residuals.append(errors)
+
+    scores = []
+    for candidate, residuals in zip(candidates, pooled):
+        errors = np.concatenate(residuals) if residuals else np.empty(0)
+        errors = errors[np.isfinite(errors)]
+        scores.append({
+            'method': candidate['method'],
+            'params': {key: value for key, value in candidate.items() if key != 'method'},
+            'rmse': float(np.sqrt(np.mean(errors ** 2))) if errors.size else None,
+            'mae': float(np.mean(np.abs(errors))) if errors.size else None,
+            'n': int(errors.size),
+        })
+    return sorted(scores, key=lambda s: np.inf if s['rmse'] is None else s['rmse'])
+
+
+def points_sample(input_points, values='value'):
+    """(point_x, point_y, point_values) arrays from interpolation input points."""
+    from core.rasterOperations import _point_arrays
+    return _point_arrays(input_points, values)
+
+
+def _metrics(score):
+    return {'rmse': score['rmse'], 'mae': score['mae'], 'n': score['n']}
+
+
+def select_method(samples, method='auto', candidates=None, fallback='idw'):
+    """
+    Resolve the interpolation method and score it.
+
+    With method='auto' every candidate is cross-validated and the lowest
+    RMSE wins; otherwise only the given method is scored.
+
+    Returns:
+        (method, params, summary) — params are make_interpolator kwargs and
+        summary is the dict stored as raster metadata['cross_validation'].
+    """
+    samples = list(samples)
+    if method != 'auto':
+        if method not in _PREDICTORS:
+            return method, {}, None
+        scores = cross_validate(samples, [{'method': method}])
+        return method, {}, {'method': method, **_metrics(scores[0])}
+
+    scores = cross_validate(samples, candidates)
+    best = scores[0]
+    if best['rmse'] is None:
+        return fallback, {}, None
+    return best['method'], best['params'], {
+        'method': best['method'],
+        'params': best['params'],
+        **_metrics(best),
+        'candidates': scores,
+    }
+
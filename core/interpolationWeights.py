@@ -0,0 +1,222 @@
+"""
+Cached sparse interpolation weights.
+
+For a fixed station layout and output grid, IDW is a linear map from the
+station values to the grid: ``grid = W @ values`` with ``W`` a sparse
+(cells x stations) matrix holding ``k`` weights per row. The station network
+barely changes, so ``W`` is built once per (station set, grid, method,
+parameters) and every further timestep or variable on the same grid is a
+single sparse matrix-vector product.
+
+The 'nearest' method (Thiessen / Voronoi allocation) caches a station-index
+grid instead: each timestep is then a plain ``values[index_grid]`` lookup.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from scipy import sparse
+from scipy.spatial import KDTree
+from django.conf import settings
+
+
+# Upper bound for the cache, in megabytes of matrix storage. The cache lives
+# per process: worker pools split this budget with set_cache_limit.
+CACHE_MAX_MB = getattr(settings, 'INTERPOLATION_WEIGHTS_CACHE_MB', 512)
+
+_cache = OrderedDict()
+_cache_bytes = 0
+_cache_max_bytes = CACHE_MAX_MB * 1024 * 1024
+_lock = threading.Lock()
+
+
+def _matrix_nbytes(matrix):
+    if sparse.issparse(matrix):
+        return matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+    return matrix.nbytes
+
+
+def station_key(point_x, point_y):
+    """Stable hash of a station layout (order-sensitive, like the value vector)."""
+    coords = np.round(np.c_[point_x, point_y], 3)
+    return hashlib.sha1(np.ascontiguousarray(coords).tobytes()).hexdigest()
+
+
+def grid_key(x_coords, y_coords):
+    """Hashable description of a regular grid from its coordinate vectors."""
+    return (
+        round(float(x_coords[0]), 3), round(float(x_coords[-1]), 3), len(x_coords),
+        round(float(y_coords[0]), 3), round(float(y_coords[-1]), 3), len(y_coords),
+    )
+
+
+def idw_weight_matrix(point_x, point_y, x_coords, y_coords, k=None, power=1, radius=None, chunk_rows=256):
+    """
+    Build the normalised IDW weight matrix for a grid.
+
+    Rows follow the grid in row-major order (north to south, west to east).
+    Cells with no station inside ``radius`` get an empty row. k and power
+    default as in core.rasterOperations.idw_interpolate (all stations, 1/d).
+
+    Returns:
+        scipy.sparse.csr_matrix of shape (len(y_coords) * len(x_coords), n_stations)
+    """
+    n = len(point_x)
+    tree = KDTree(np.c_[point_x, point_y])
+    k = n if k is None else max(1, min(int(k), n))
+    upper_bound = radius if radius else np.inf
+
+    blocks = []
+    for start in range(0, len(y_coords), chunk_rows):
+        gx, gy = np.meshgrid(x_coords, y_coords[start:start + chunk_rows])
+        dist, idx = tree.query(
+            np.c_[gx.ravel(), gy.ravel()],
+            k=k,
+            distance_upper_bound=upper_bound,
+            workers=-1,
+        )
+        if k == 1:
+            dist, idx = dist[:, np.newaxis], idx[:, np.newaxis]
+
+        found = np.isfinite(dist)
+        weights = np.where(found, 1 / (np.where(found, dist, 1) + 1e-10) ** power, 0)
+        weight_sum = weights.sum(axis=1, keepdims=True)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weights = np.where(weight_sum > 0, weights / weight_sum, 0)
+
+        rows = np.repeat(np.arange(gx.size), k)
+        block = sparse.csr_matrix(
+            (weights.ravel(), (rows, np.where(found, idx, 0).ravel())),
+            shape=(gx.size, n),
+        )
+        block.eliminate_zeros()
+        blocks.append(block)
+
+    return sparse.vstack(blocks, format='csr')
+
+
+def nearest_index_grid(point_x, point_y, x_coords, y_coords, radius=None, chunk_rows=256):
+    """
+    Index of the nearest station for every grid cell (Voronoi allocation).
+
+    Cells with no station inside ``radius`` get -1.
+
+    Returns:
+        int32 array of shape (len(y_coords), len(x_coords))
+    """
+    n = len(point_x)
+    tree = KDTree(np.c_[point_x, point_y])
+    upper_bound = radius if radius else np.inf
+
+    index = np.empty((len(y_coords), len(x_coords)), dtype=np.int32)
+    for start in range(0, len(y_coords), chunk_rows):
+        gx, gy = np.meshgrid(x_coords, y_coords[start:start + chunk_rows])
+        _, idx = tree.query(
+            np.c_[gx.ravel(), gy.ravel()],
+            distance_upper_bound=upper_bound,
+            workers=-1,
+        )
+        # KDTree marks "nothing in range" with index n
+        index[start:start + gx.shape[0]] = np.where(idx == n, -1, idx).reshape(gx.shape)
+    return index
+
+
+_BUILDERS = {
+    'idw': idw_weight_matrix,
+    'nearest': nearest_index_grid,
+}
+
+
+def get_weights(point_x, point_y, x_coords, y_coords, method='idw', **params):
+    """
+    Return the cached weight matrix (or index grid for 'nearest') for this
+    station layout and grid, building it on first use.
+    """
+    global _cache_bytes
+
+    if method not in _BUILDERS:
+        raise ValueError(f"No sparse weights available for method '{method}'")
+
+    key = (
+        station_key(point_x, point_y),
+        grid_key(x_coords, y_coords),
+        method,
+        tuple(sorted(params.items())),
+    )
+
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    matrix = _BUILDERS[method](point_x, point_y, x_coords, y_coords, **params)
+
+    with _lock:
+        _cache[key] = matrix
+        _cache_bytes += _matrix_nbytes(matrix)
+        _evict()
+
+    return matrix
+
+
+def _evict():
+    global _cache_bytes
+    while _cache_bytes > _cache_max_bytes and len(_cache) > 1:
+        _, evicted = _cache.popitem(last=False)
+        _cache_bytes -= _matrix_nbytes(evicted)
+
+
+def set_cache_limit(max_mb):
+    """
+    Set this process's cache budget in megabytes, evicting as needed.
+
+    Used as a process pool initializer with ``CACHE_MAX_MB / workers`` so a
+    pool of N workers stays within the configured total.
+    """
+    global _cache_max_bytes
+    with _lock:
+        _cache_max_bytes = max_mb * 1024 * 1024
+        _evict()
+
+
+def worker_cache_mb(workers):
+    """Per-worker share of CACHE_MAX_MB for a pool of ``workers`` processes."""
+    return CACHE_MAX_MB / max(int(workers), 1)
+
+
+def apply_weights(matrix, point_values, shape, nodata=-9999):
+    """Evaluate ``matrix @ point_values`` and reshape to the grid."""
+    values = np.asarray(point_values, dtype=float)
+    grid = matrix @ values
+    # Cells whose row is empty had no station in range
+    grid[np.diff(matrix.indptr) == 0] = nodata
+    return grid.reshape(shape)
+
+
+def apply_index_grid(index_grid, point_values, nodata=-9999):
+    """Evaluate a nearest-station index grid: one fancy-indexing lookup."""
+    # Append nodata so the -1 "no station" index picks it up
+    values = np.append(np.asarray(point_values, dtype=float), nodata)
+    return values[index_grid]
+
+
+def apply_weights_many(matrix, value_columns, shape, nodata=-9999):
+    """
+    Evaluate several value vectors (e.g. temperature, humidity, wind for the
+    same hour) against one weight matrix in a single sparse product.
+
+    Returns:
+        3D array (len(value_columns), rows, cols)
+    """
+    values = np.column_stack([np.asarray(v, dtype=float) for v in value_columns])
+    grids = matrix @ values
+    grids[np.diff(matrix.indptr) == 0] = nodata
+    return grids.T.reshape((values.shape[1],) + tuple(shape))
+
+
+def clear_cache():
+    global _cache_bytes
+    with _lock:
+        _cache.clear()
+        _cache_bytes = 0
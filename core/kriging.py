@@ -0,0 +1,176 @@
+"""
+Ordinary kriging with a fitted variogram and a local search neighbourhood.
+
+Each output cell is estimated from its ``k`` nearest stations only, so the
+cost is O(cells * k^3) — linear in the number of grid cells — instead of the
+dense N x N system of a global solve. The per-cell kriging systems are
+solved in batches with ``np.linalg.solve``.
+"""
+import numpy as np
+from scipy.optimize import curve_fit
+from scipy.spatial import KDTree
+from scipy.spatial.distance import pdist
+
+
+def spherical(h, nugget, sill, range_):
+    h = np.asarray(h, dtype=float)
+    r = np.minimum(h / range_, 1.0)
+    return np.where(h > 0, nugget + (sill - nugget) * (1.5 * r - 0.5 * r ** 3), 0.0)
+
+
+def exponential(h, nugget, sill, range_):
+    h = np.asarray(h, dtype=float)
+    return np.where(h > 0, nugget + (sill - nugget) * (1 - np.exp(-3 * h / range_)), 0.0)
+
+
+def gaussian(h, nugget, sill, range_):
+    h = np.asarray(h, dtype=float)
+    return np.where(h > 0, nugget + (sill - nugget) * (1 - np.exp(-3 * (h / range_) ** 2)), 0.0)
+
+
+VARIOGRAM_MODELS = {
+    'spherical': spherical,
+    'exponential': exponential,
+    'gaussian': gaussian,
+}
+
+# Above this many stations the empirical variogram uses a random subset
+_MAX_VARIOGRAM_POINTS = 2000
+
+
+def merge_duplicate_points(point_x, point_y, point_values):
+    """Average values of points sharing the same coordinates."""
+    coords = np.c_[point_x, point_y]
+    unique, inverse = np.unique(coords, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    sums = np.bincount(inverse, weights=point_values, minlength=len(unique))
+    counts = np.bincount(inverse, minlength=len(unique))
+    return unique[:, 0], unique[:, 1], sums / counts
+
+
+def fit_variogram(point_x, point_y, point_values, model='spherical', n_lags=12, seed=0):
+    """
+    Fit (nugget, sill, range) of a variogram model to the empirical
+    semivariogram of the stations.
+
+    Returns:
+        dict with 'model', 'nugget', 'sill', 'range'
+    """
+    if model not in VARIOGRAM_MODELS:
+        raise ValueError(f"Unknown variogram model '{model}'")
+
+    coords = np.c_[point_x, point_y]
+    values = np.asarray(point_values, dtype=float)
+    if len(values) > _MAX_VARIOGRAM_POINTS:
+        pick = np.random.default_rng(seed).choice(len(values), _MAX_VARIOGRAM_POINTS, replace=False)
+        coords, values = coords[pick], values[pick]
+
+    variance = float(np.var(values))
+    if len(values) < 3 or variance == 0:
+        # Not enough structure to fit: flat variogram over the extent
+        extent = float(np.ptp(coords, axis=0).max()) if len(values) > 1 else 1.0
+        return {'model': model, 'nugget': 0.0, 'sill': max(variance, 1e-12), 'range': max(extent, 1.0)}
+
+    lags = pdist(coords)
+    semivariance = 0.5 * pdist(values[:, np.newaxis], 'sqeuclidean')
+
+    # Classic rule of thumb: only use lags up to half the maximum distance
+    max_lag = lags.max() / 2
+    edges = np.linspace(0, max_lag, n_lags + 1)
+    bins = np.digitize(lags, edges) - 1
+    inside = (bins >= 0) & (bins < n_lags)
+    counts = np.bincount(bins[inside], minlength=n_lags)
+    gamma = np.bincount(bins[inside], weights=semivariance[inside], minlength=n_lags)
+    has_pairs = counts > 0
+    centres = ((edges[:-1] + edges[1:]) / 2)[has_pairs]
+    gamma = gamma[has_pairs] / counts[has_pairs]
+
+    func = VARIOGRAM_MODELS[model]
+    try:
+        (nugget, sill, range_), _ = curve_fit(
+            func, centres, gamma,
+            p0=[0.0, variance, max_lag / 2],
+            bounds=([0.0, 1e-12, 1e-6], [variance * 2, variance * 4, lags.max() * 2]),
+            sigma=1 / np.sqrt(counts[has_pairs]),
+            maxfev=5000,
+        )
+    except (RuntimeError, ValueError):
+        nugget, sill, range_ = 0.0, variance, max_lag / 2
+
+    return {'model': model, 'nugget': float(nugget), 'sill': float(max(sill, nugget + 1e-12)), 'range': float(range_)}
+
+
+def ordinary_kriging(point_x, point_y, point_values, x_coords, y_coords,
+                     k=16, variogram=None, variogram_model='spherical',
+                     chunk_cells=20000):
+    """
+    Ordinary kriging of a regular grid with a local neighbourhood.
+
+    Parameters:
+    - point_x, point_y, point_values: 1D arrays describing the stations.
+    - x_coords, y_coords: 1D arrays of grid column / row coordinates.
+    - k: Number of nearest stations in each cell's kriging system.
+    - variogram: Pre-fitted variogram dict (see fit_variogram); fitted
+      from the stations when omitted.
+    - chunk_cells: Number of cells whose systems are solved per batch.
+
+    Returns:
+    - A 2D numpy array of shape (len(y_coords), len(x_coords)).
+    """
+    point_x, point_y, point_values = merge_duplicate_points(
+        np.asarray(point_x, dtype=float),
+        np.asarray(point_y, dtype=float),
+        np.asarray(point_values, dtype=float),
+    )
+    n = len(point_x)
+    if n == 1:
+        return np.full((len(y_coords), len(x_coords)), point_values[0])
+
+    if variogram is None:
+        variogram = fit_variogram(point_x, point_y, point_values, model=variogram_model)
+
+    coords = np.c_[point_x, point_y]
+    tree = KDTree(coords)
+    k = max(2, min(int(k), n))
+
+    gx, gy = np.meshgrid(x_coords, y_coords)
+    cells = np.c_[gx.ravel(), gy.ravel()]
+    out = np.empty(len(cells))
+
+    for start in range(0, len(cells), chunk_cells):
+        block = cells[start:start + chunk_cells]
+        dist, idx = tree.query(block, k=k, workers=-1)
+        out[start:start + len(block)] = krige_neighbours(dist, idx, coords, point_values, variogram)
+
+    return out.reshape(gx.shape)
+
+
+def krige_neighbours(dist, idx, coords, point_values, variogram):
+    """
+    Solve a batch of ordinary kriging systems at once.
+
+    Parameters:
+    - dist, idx: (m, k) distances and station indices of each target's
+      neighbours (as returned by KDTree.query).
+    - coords, point_values: station coordinates (n, 2) and values (n,).
+    - variogram: fitted variogram dict (see fit_variogram).
+
+    Returns:
+    - (m,) array of estimates.
+    """
+    func = VARIOGRAM_MODELS[variogram['model']]
+    params = (variogram['nugget'], variogram['sill'], variogram['range'])
+    m, k = idx.shape
+
+    neighbours = coords[idx]                                               # (m, k, 2)
+    between = np.linalg.norm(neighbours[:, :, None, :] - neighbours[:, None, :, :], axis=-1)
+
+    # Kriging system with the Lagrange multiplier for the unbiasedness constraint
+    A = np.ones((m, k + 1, k + 1))
+    A[:, :k, :k] = func(between, *params) + np.eye(k) * 1e-10 * variogram['sill']
+    A[:, k, k] = 0.0
+    b = np.ones((m, k + 1))
+    b[:, :k] = func(dist, *params)
+
+    weights = np.linalg.solve(A, b[..., np.newaxis])[..., 0]
+    return np.einsum('ij,ij->i', weights[:, :k], point_values[idx])
@@ -0,0 +1,61 @@
+import time
+
+import numpy as np
+from scipy.spatial import KDTree
+from django.core.management.base import BaseCommand
+
+from core.rasterOperations import idw_interpolate
+
+
+def _idw_loop(point_x, point_y, point_values, x_coords, y_coords):
+    """The original per-cell IDW loop, kept only as a benchmark reference."""
+    grid_x, grid_y = np.meshgrid(x_coords, y_coords)
+    tree = KDTree(np.c_[point_x, point_y])
+    grid_values = np.zeros(grid_x.shape)
+    for i in range(grid_x.shape[0]):
+        for j in range(grid_x.shape[1]):
+            dist, idx = tree.query([grid_x[i, j], grid_y[i, j]], k=len(point_x))
+            weights = 1 / (dist + 1e-10)
+            weights /= weights.sum()
+            grid_values[i, j] = np.sum(weights * point_values[idx])
+    return grid_values
+
+
+class Command(BaseCommand):
+    help = 'Benchmark vectorised IDW against the per-cell loop (cells/s)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stations', type=int, default=50, help='Number of random stations')
+        parser.add_argument('--size', type=int, default=200, help='Grid width/height in cells')
+        parser.add_argument('--k', type=int, default=12, help='Neighbours for the vectorised IDW')
+        parser.add_argument('--skip-loop', action='store_true', help='Only time the vectorised version')
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(42)
+        n, size = options['stations'], options['size']
+        extent = 10_000.0  # 10 km square
+        point_x = rng.uniform(0, extent, n)
+        point_y = rng.uniform(0, extent, n)
+        point_values = rng.normal(20, 5, n)
+        coords = np.linspace(0, extent, size)
+        cells = size * size
+
+        start = time.perf_counter()
+        fast = idw_interpolate(point_x, point_y, point_values, coords, coords, k=n, power=1)
+        fast_s = time.perf_counter() - start
+        self.stdout.write(f"vectorised (k=all, p=1): {cells / fast_s:,.0f} cells/s ({fast_s:.3f} s)")
+
+        start = time.perf_counter()
+        idw_interpolate(point_x, point_y, point_values, coords, coords, k=options['k'])
+        knn_s = time.perf_counter() - start
+        self.stdout.write(f"vectorised (k={options['k']}, p=2): {cells / knn_s:,.0f} cells/s ({knn_s:.3f} s)")
+
+        if options['skip_loop']:
+            return
+
+        start = time.perf_counter()
+        slow = _idw_loop(point_x, point_y, point_values, coords, coords)
+        slow_s = time.perf_counter() - start
+        self.stdout.write(f"per-cell loop:           {cells / slow_s:,.0f} cells/s ({slow_s:.3f} s)")
+        self.stdout.write(f"max abs difference:      {np.abs(fast - slow).max():.2e}")
+        self.stdout.write(self.style.SUCCESS(f"speed-up: {slow_s / fast_s:,.1f}x"))
@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand
+from core.models import ZonalStat
+from core.utils import RASTER_REGISTRY
+from core.zonalStats import compute_zonal_stats, process_pending
+
+
+class Command(BaseCommand):
+    help = 'Compute per-zone raster statistics (Neighborhood / District / City) into ZonalStat'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model',
+            type=str,
+            help='Only process a specific raster model (e.g. "weather.TemperatureRaster")'
+        )
+        parser.add_argument(
+            '--id',
+            type=int,
+            help='Only process a specific raster by its ID (requires --model)'
+        )
+        parser.add_argument(
+            '--level',
+            action='append',
+            choices=ZonalStat.ZoneLevel.values,
+            help='Zone level to compute; repeat for several (default: all)'
+        )
+        parser.add_argument(
+            '--pending',
+            action='store_true',
+            help='Only process the rasters and zones queued by saves (run periodically)'
+        )
+
+    def handle(self, *args, **options):
+        if options['pending']:
+            written = process_pending(log=self.stdout.write)
+            self.stdout.write(self.style.SUCCESS(f'\nDone! {written} rows'))
+            return
+
+        if options['model']:
+            if options['model'] not in RASTER_REGISTRY:
+                self.stderr.write(f"Model '{options['model']}' not found in raster registry.")
+                return
+            models = {options['model']: RASTER_REGISTRY[options['model']]}
+        else:
+            models = RASTER_REGISTRY
+
+        # Shared across rasters so polygons are burned once per grid and level
+        label_cache = {}
+
+        for model_key, Model in models.items():
+            self.stdout.write(f"\nProcessing {model_key}...")
+            qs = Model.objects.all()
+            if options['id']:
+                qs = qs.filter(id=options['id'])
+            for instance in qs.iterator(chunk_size=1):
+                try:
+                    n = compute_zonal_stats(instance, levels=options['level'], label_cache=label_cache)
+                    self.stdout.write(self.style.SUCCESS(f"  ✓ id={instance.id}: {n} rows"))
+                except Exception as e:
+                    self.stderr.write(f"  ✗ id={instance.id}: {e}")
+
+        self.stdout.write(self.style.SUCCESS('\nDone!'))
@@ -0,0 +1,89 @@
+# Generated by Django 5.2.12 on 2026-10-19 09:00
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="ZonalStat",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "raster_model",
+                    models.CharField(
+                        help_text="Registry key of the raster model (e.g. 'weather.TemperatureRaster')",
+                        max_length=100,
+                    ),
+                ),
+                (
+                    "raster_id",
+                    models.IntegerField(help_text="Primary key of the raster record"),
+                ),
+                (
+                    "band",
+                    models.IntegerField(default=1, help_text="1-based band index"),
+                ),
+                (
+                    "zone_level",
+                    models.CharField(
+                        choices=[
+                            ("neighborhood", "Neighborhood"),
+                            ("district", "District"),
+                            ("city", "City"),
+                        ],
+                        help_text="Administrative level of the zone",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "zone_id",
+                    models.CharField(
+                        help_text="Primary key of the Neighborhood, District or City",
+                        max_length=50,
+                    ),
+                ),
+                (
+                    "count",
+                    models.IntegerField(
+                        default=0, help_text="Number of valid pixels inside the zone"
+                    ),
+                ),
+                ("min", models.FloatField(blank=True, null=True)),
+                ("max", models.FloatField(blank=True, null=True)),
+                ("mean", models.FloatField(blank=True, null=True)),
+                ("std", models.FloatField(blank=True, null=True)),
+                ("sum", models.FloatField(blank=True, null=True)),
+                (
+                    "last_updated",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+            ],
+            options={
+                "verbose_name": "Zonal Statistic",
+                "verbose_name_plural": "Zonal Statistics",
+                "indexes": [
+                    models.Index(
+                        fields=["raster_model", "raster_id"],
+                        name="zonalstat_raster_idx",
+                    ),
+                    models.Index(
+                        fields=["zone_level", "zone_id"],
+                        name="zonalstat_zone_idx",
+                    ),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("raster_model", "raster_id", "band", "zone_level", "zone_id"),
+                        name="unique_zonal_stat",
+                    )
+                ],
+            },
+        ),
+    ]
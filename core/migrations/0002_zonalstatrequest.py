@@ -0,0 +1,69 @@
+# Generated by Django 5.2.12 on 2026-10-19 15:00
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ZonalStatRequest",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "raster_model",
+                    models.CharField(
+                        blank=True,
+                        default="",
+                        help_text="Registry key of the raster model, for raster requests",
+                        max_length=100,
+                    ),
+                ),
+                (
+                    "raster_id",
+                    models.IntegerField(
+                        blank=True,
+                        help_text="Primary key of the raster record, for raster requests",
+                        null=True,
+                    ),
+                ),
+                (
+                    "zone_level",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("neighborhood", "Neighborhood"),
+                            ("district", "District"),
+                            ("city", "City"),
+                        ],
+                        default="",
+                        help_text="Administrative level, for zone requests",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "zone_id",
+                    models.CharField(
+                        blank=True,
+                        default="",
+                        help_text="Primary key of the zone, for zone requests",
+                        max_length=50,
+                    ),
+                ),
+                (
+                    "requested_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+            ],
+            options={
+                "verbose_name": "Zonal Statistics Request",
+                "verbose_name_plural": "Zonal Statistics Requests",
+                "ordering": ["requested_at"],
+            },
+        ),
+    ]
@@ -1,3 +1,68 @@
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+
+class ZonalStat(models.Model):
+    """Per-zone, per-band summary statistics of a registered raster."""
+
+    class ZoneLevel(models.TextChoices):
+        Neighborhood = 'neighborhood', 'Neighborhood'
+        District = 'district', 'District'
+        City = 'city', 'City'
+
+    id = models.BigAutoField(primary_key=True)
+    raster_model = models.CharField(max_length=100, help_text="Registry key of the raster model (e.g. 'weather.TemperatureRaster')")
+    raster_id = models.IntegerField(help_text="Primary key of the raster record")
+    band = models.IntegerField(default=1, help_text="1-based band index")
+    zone_level = models.CharField(max_length=20, choices=ZoneLevel.choices, help_text="Administrative level of the zone")
+    zone_id = models.CharField(max_length=50, help_text="Primary key of the Neighborhood, District or City")
+    count = models.IntegerField(default=0, help_text="Number of valid pixels inside the zone")
+    min = models.FloatField(null=True, blank=True)
+    max = models.FloatField(null=True, blank=True)
+    mean = models.FloatField(null=True, blank=True)
+    std = models.FloatField(null=True, blank=True)
+    sum = models.FloatField(null=True, blank=True)
+    last_updated = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.raster_model} #{self.raster_id} b{self.band} - {self.zone_level} {self.zone_id}: {self.mean}"
+
+    class Meta:
+        verbose_name = "Zonal Statistic"
+        verbose_name_plural = "Zonal Statistics"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['raster_model', 'raster_id', 'band', 'zone_level', 'zone_id'],
+                name='unique_zonal_stat',
+            )
+        ]
+        indexes = [
+            models.Index(fields=['raster_model', 'raster_id'], name='zonalstat_raster_idx'),
+            models.Index(fields=['zone_level', 'zone_id'], name='zonalstat_zone_idx'),
+        ]
+
+
+class ZonalStatRequest(models.Model):
+    """
+    Pending zonal-statistics work, queued by raster and boundary saves and
+    processed by `manage.py compute_zonal_stats --pending`.
+
+    A raster request names a raster record; a zone request names a zone
+    whose geometry changed and is recomputed against every raster.
+    """
+    id = models.BigAutoField(primary_key=True)
+    raster_model = models.CharField(max_length=100, blank=True, default='', help_text="Registry key of the raster model, for raster requests")
+    raster_id = models.IntegerField(null=True, blank=True, help_text="Primary key of the raster record, for raster requests")
+    zone_level = models.CharField(max_length=20, blank=True, default='', choices=ZonalStat.ZoneLevel.choices, help_text="Administrative level, for zone requests")
+    zone_id = models.CharField(max_length=50, blank=True, default='', help_text="Primary key of the zone, for zone requests")
+    requested_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        if self.raster_model:
+            return f"{self.raster_model} #{self.raster_id}"
+        return f"{self.zone_level} {self.zone_id}"
+
+    class Meta:
+        verbose_name = "Zonal Statistics Request"
+        verbose_name_plural = "Zonal Statistics Requests"
+        ordering = ['requested_at']
@@ -1,5 +1,5 @@
 import numpy as np
-from scipy.interpolate import Rbf
+from scipy.interpolate import RBFInterpolator
 from scipy.spatial import distance, KDTree
 from django.contrib.gis.gdal import GDALRaster, SpatialReference
 from django.contrib.gis.geos import Point
@@ -35,51 +35,210 @@ def get_raster_field_name(model):
     raise ValueError(f"No RasterField found on {model.__name__}")
 
 
-def interpolate_raster(input_points, values, bounds, resolution, method='linear'):
+def _point_arrays(input_points, values='value'):
+    """Split input point dicts into x, y and value arrays.
+
+    Points may carry either a 'geom' (GEOS Point) or plain 'x'/'y' keys.
+    """
+    point_x = np.array([p['geom'].x if 'geom' in p else p['x'] for p in input_points], dtype=float)
+    point_y = np.array([p['geom'].y if 'geom' in p else p['y'] for p in input_points], dtype=float)
+    point_values = np.array([p[values] for p in input_points], dtype=float)
+    return point_x, point_y, point_values
+
+
+def idw_interpolate(point_x, point_y, point_values, x_coords, y_coords,
+                    k=None, power=1, radius=None, chunk_rows=256, nodata=-9999):
+    """
+    Vectorised Inverse Distance Weighting on a regular grid.
+
+    One batched KDTree query is issued per block of ``chunk_rows`` rows, so
+    memory stays at O(chunk_rows * width * k) regardless of the extent.
+
+    Parameters:
+    - point_x, point_y, point_values: 1D arrays describing the stations.
+    - x_coords, y_coords: 1D arrays of grid column / row coordinates.
+    - k: Number of nearest stations used per cell (capped at the station
+      count); None uses every station, as the original per-cell loop did.
+    - power: Distance exponent of the weights. The default 1 keeps the
+      original 1/d weighting; 2 is classic IDW.
+    - radius: Optional search radius in map units; cells without any station
+      inside it get ``nodata``.
+    - chunk_rows: Number of grid rows evaluated per KDTree query.
+
+    Returns:
+    - A 2D numpy array of shape (len(y_coords), len(x_coords)).
+    """
+    tree = KDTree(np.c_[point_x, point_y])
+    k = len(point_x) if k is None else max(1, min(int(k), len(point_x)))
+    upper_bound = radius if radius else np.inf
+
+    grid_values = np.empty((len(y_coords), len(x_coords)), dtype=float)
+
+    for start in range(0, len(y_coords), chunk_rows):
+        rows = y_coords[start:start + chunk_rows]
+        gx, gy = np.meshgrid(x_coords, rows)
+        dist, idx = tree.query(
+            np.c_[gx.ravel(), gy.ravel()],
+            k=k,
+            distance_upper_bound=upper_bound,
+            workers=-1,
+        )
+        if k == 1:
+            dist, idx = dist[:, np.newaxis], idx[:, np.newaxis]
+
+        # Neighbours beyond the radius come back as inf / index == n
+        found = np.isfinite(dist)
+        weights = np.where(found, 1 / (np.where(found, dist, 1) + 1e-10) ** power, 0)
+        neighbour_values = point_values[np.where(found, idx, 0)]
+
+        weight_sum = weights.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            block = (weights * neighbour_values).sum(axis=1) / weight_sum
+        block[weight_sum == 0] = nodata
+
+        grid_values[start:start + len(rows)] = block.reshape(gx.shape)
+
+    return grid_values
+
+
+def grid_coords(bounds, resolution):
+    """Column x and row y coordinates of a north-up grid covering bounds."""
+    if resolution <= 0:
+        raise ValueError("Resolution must be a positive number.")
+    min_x, min_y, max_x, max_y = bounds
+    x_coords = np.arange(min_x, max_x, resolution)
+    # North-up: first row is the top of the extent
+    y_coords = np.arange(max_y, min_y, -resolution)
+    return x_coords, y_coords
+
+
+# Default search neighbourhood of the local methods (linear, spline, kriging)
+LOCAL_K = 12
+
+
+def make_interpolator(point_x, point_y, point_values, method='linear',
+                      k=None, power=1, radius=None, chunk_rows=256, cache_weights=False,
+                      variogram_model='spherical'):
+    """
+    Build a block evaluator for the given method.
+
+    Returns a callable ``f(x_coords, y_coords) -> 2D array`` so the same
+    fitted interpolator can fill a whole grid or one window at a time.
+
+    ``k`` is the number of nearest stations used per cell. When omitted,
+    'idw' uses every station with 1/d weights (``power=1``), the behaviour
+    of the original implementation, and the local methods use LOCAL_K.
+
+    Methods:
+    - 'idw': Inverse distance weighting over the k nearest stations.
+    - 'linear' / 'spline': RBFInterpolator (linear / thin-plate kernel)
+      restricted to the k nearest stations of each cell.
+    - 'kriging': Ordinary kriging with a variogram fitted to the stations
+      and a k-nearest search neighbourhood (see core.kriging).
+    - 'nearest': Value of the nearest station (Thiessen polygons). The
+      station-index grid is always cached per station layout, so repeated
+      timesteps are a single array lookup.
+    - 'auto': The method with the lowest leave-one-out RMSE on these
+      stations (see core.crossValidation).
+
+    With ``cache_weights`` the IDW weights for each grid (or window) are kept
+    in core.interpolationWeights and reused by later calls with the same
+    station layout, so repeated timesteps cost one sparse product.
     """
-    Interpolates raster data using Radial Basis Function (RBF) interpolation.
+    if method == 'auto':
+        from core.crossValidation import select_method
+
+        method, params, _ = select_method([(point_x, point_y, point_values)])
+        kwargs = dict(k=k, power=power, radius=radius, chunk_rows=chunk_rows,
+                      cache_weights=cache_weights, variogram_model=variogram_model)
+        return make_interpolator(point_x, point_y, point_values, method, **{**kwargs, **params})
+
+    neighbours = LOCAL_K if k is None else k
+    if method in ('linear', 'spline'):
+        from core.kriging import merge_duplicate_points
+
+        # Coincident stations make the RBF system singular
+        point_x, point_y, point_values = merge_duplicate_points(point_x, point_y, point_values)
+        rbf = RBFInterpolator(
+            np.c_[point_x, point_y],
+            point_values,
+            kernel='linear' if method == 'linear' else 'thin_plate_spline',
+            neighbors=neighbours if neighbours < len(point_x) else None,
+        )
+
+        def evaluate(x_coords, y_coords):
+            grid_x, grid_y = np.meshgrid(x_coords, y_coords)
+            return rbf(np.c_[grid_x.ravel(), grid_y.ravel()]).reshape(grid_x.shape)
+        return evaluate
+    elif method == 'kriging':
+        from core.kriging import fit_variogram, ordinary_kriging
+
+        # Fit once so every window shares the same variogram
+        variogram = fit_variogram(point_x, point_y, point_values, model=variogram_model)
+
+        def evaluate(x_coords, y_coords):
+            return ordinary_kriging(
+                point_x, point_y, point_values, x_coords, y_coords,
+                k=max(neighbours, 2), variogram=variogram,
+            )
+        return evaluate
+    elif method == 'nearest':
+        from core.interpolationWeights import get_weights, apply_index_grid
+
+        def evaluate(x_coords, y_coords):
+            index_grid = get_weights(
+                point_x, point_y, x_coords, y_coords, method='nearest',
+                radius=radius, chunk_rows=chunk_rows,
+            )
+            return apply_index_grid(index_grid, point_values)
+        return evaluate
+    elif method == 'idw' and cache_weights:
+        from core.interpolationWeights import get_weights, apply_weights
+
+        def evaluate(x_coords, y_coords):
+            weights = get_weights(
+                point_x, point_y, x_coords, y_coords, method='idw',
+                k=k, power=power, radius=radius, chunk_rows=chunk_rows,
+            )
+            return apply_weights(weights, point_values, (len(y_coords), len(x_coords)))
+        return evaluate
+    elif method == 'idw':
+        def evaluate(x_coords, y_coords):
+            return idw_interpolate(
+                point_x, point_y, point_values, x_coords, y_coords,
+                k=k, power=power, radius=radius, chunk_rows=chunk_rows,
+            )
+        return evaluate
+    else:
+        raise ValueError(f"Unknown interpolation method '{method}'")
+
+
+def interpolate_raster(input_points, values, bounds, resolution, method='linear',
+                       k=None, power=1, radius=None, chunk_rows=256):
+    """
+    Interpolates raster data from scattered points.
     
     Parameters:
-    - input_points: List of tuples (x, y) representing the coordinates of input points.
-    - values: List of values corresponding to each input point.
-    - grid_x: 1D array of x-coordinates for the output grid.
-    - grid_y: 1D array of y-coordinates for the output grid.
+    - input_points: List of dicts with either a 'geom' Point or 'x'/'y' keys.
+    - values: Key of the value to interpolate in each point dict.
+    - bounds: (min_x, min_y, max_x, max_y) of the output raster.
     - resolution: Resolution of the output raster.
-    - method: Interpolation method ('linear', 'cubic', 'quintic', etc.).
+    - method: Interpolation method ('idw', 'linear', 'spline', 'kriging', 'nearest', 'auto').
+    - k, power, radius, chunk_rows: Method parameters, see make_interpolator.
     
     Returns:
-    - A 2D numpy array representing the interpolated raster.
+    - (temp_path, GDALRaster) of the interpolated raster.
     """
-    if resolution <= 0:
-        raise ValueError("Resolution must be a positive number.")       
-    
     min_x, min_y, max_x, max_y = bounds
+    x_coords, y_coords = grid_coords(bounds, resolution)
     
-    x_coords = np.arange(min_x, max_x, resolution)
-    y_coords = np.arange(min_y, max_y, resolution)
-    grid_x, grid_y = np.meshgrid(x_coords, y_coords)
-    
-    point_x = np.array([p['geom'].x for p in input_points])
-    point_y = np.array([p['geom'].y for p in input_points])
-    point_values = np.array([p[values] for p in input_points])
-    
-    if method == 'linear':
-        rbf = Rbf(point_x, point_y, point_values, function='linear')
-        grid_values = rbf(grid_x, grid_y)
-    
-    if method == 'idw':
-        tree = KDTree(np.c_[point_x, point_y])
-        grid_values = np.zeros(grid_x.shape)
-        for i in range(grid_x.shape[0]):
-            for j in range(grid_x.shape[1]):
-                dist, idx = tree.query([grid_x[i, j], grid_y[i, j]], k=len(point_x))
-                weights = 1 / (dist + 1e-10)
-                weights /= weights.sum()
-                grid_values[i, j] = np.sum(weights * point_values[idx])
-                
-    elif method == 'kriging':
-        rbf = Rbf(point_x, point_y, point_values, function='gaussian')
-        grid_values = rbf(grid_x, grid_y)
+    point_x, point_y, point_values = _point_arrays(input_points, values)
+    
+    evaluate = make_interpolator(
+        point_x, point_y, point_values, method,
+        k=k, power=power, radius=radius, chunk_rows=chunk_rows,
+    )
+    grid_values = evaluate(x_coords, y_coords)
     
     # Create temporary GeoTIFF
     temp_file = tempfile.NamedTemporaryFile(suffix='.tif', delete=False)
@@ -105,6 +264,286 @@ def interpolate_raster(input_points, values, bounds, resolution, method='linear'
     return temp_path, driver
 
 
+def _windowed_profile(bounds, resolution, count, block_size, nodata):
+    """Tiled, deflate-compressed float32 GeoTIFF profile for a regular grid."""
+    from rasterio.transform import from_origin
+
+    min_x, min_y, max_x, max_y = bounds
+    x_coords, y_coords = grid_coords(bounds, resolution)
+    # GeoTIFF tiles must be multiples of 16
+    block_size = max(16, int(block_size) // 16 * 16)
+    profile = {
+        'driver': 'GTiff',
+        'width': len(x_coords),
+        'height': len(y_coords),
+        'count': count,
+        'dtype': 'float32',
+        'crs': f"EPSG:{settings.COORDINATE_SYSTEM}",
+        'transform': from_origin(min_x, max_y, resolution, resolution),
+        'nodata': nodata,
+        'tiled': True,
+        'blockxsize': block_size,
+        'blockysize': block_size,
+        'compress': 'deflate',
+        'interleave': 'band',
+        'BIGTIFF': 'IF_SAFER',
+    }
+    return profile, x_coords, y_coords, block_size
+
+
+def _cog_in_place(dst_path):
+    """Rewrite a GeoTIFF as a band-interleaved Cloud Optimized GeoTIFF."""
+    cog_path = dst_path.replace('.tif', '_cog.tif')
+    cog_translate(
+        source=dst_path,
+        dst_path=cog_path,
+        dst_kwargs={**cog_profiles.get("DEFLATE"), 'interleave': 'band'},
+        overview_level=6,
+        overview_resampling="nearest",
+        use_cog_driver=True,
+        quiet=True,
+    )
+    os.replace(cog_path, dst_path)
+
+
+def _temp_tif():
+    temp_file = tempfile.NamedTemporaryFile(suffix='.tif', delete=False)
+    temp_file.close()
+    return temp_file.name
+
+
+def _window_blocks(point_sets, values, x_coords, y_coords, block_size, method,
+                   nodata=-9999, **method_kwargs):
+    """
+    Yield (first row, [block per point set]) for every window of rows.
+
+    With 'idw', point sets on the same station layout (e.g. the variables of
+    one hour, or the hours of a day) share one weight matrix per window and
+    are evaluated together in a single sparse product.
+    """
+    arrays = [_point_arrays(points, values) for points in point_sets]
+
+    if method != 'idw':
+        evaluators = [make_interpolator(px, py, pv, method, **method_kwargs) for px, py, pv in arrays]
+        for row in range(0, len(y_coords), block_size):
+            rows = y_coords[row:row + block_size]
+            yield row, [evaluate(x_coords, rows) for evaluate in evaluators]
+        return
+
+    from core.interpolationWeights import station_key, get_weights, idw_weight_matrix, apply_weights_many
+
+    cache_weights = method_kwargs.pop('cache_weights', False)
+    params = {key: method_kwargs[key] for key in ('k', 'power', 'radius', 'chunk_rows') if key in method_kwargs}
+    layouts = {}
+    for i, (px, py, _) in enumerate(arrays):
+        layouts.setdefault(station_key(px, py), []).append(i)
+
+    for row in range(0, len(y_coords), block_size):
+        rows = y_coords[row:row + block_size]
+        blocks = [None] * len(arrays)
+        for members in layouts.values():
+            px, py, _ = arrays[members[0]]
+            if cache_weights:
+                weights = get_weights(px, py, x_coords, rows, method='idw', **params)
+            else:
+                weights = idw_weight_matrix(px, py, x_coords, rows, **params)
+            grids = apply_weights_many(
+                weights, [arrays[i][2] for i in members], (len(rows), len(x_coords)), nodata=nodata,
+            )
+            for i, grid in zip(members, grids):
+                blocks[i] = grid
+        yield row, blocks
+
+
+def interpolate_cube_windowed(band_points, values, bounds, resolution,
+                              method='linear', dst_path=None, block_size=512, cog=False,
+                              nodata=-9999, band_descriptions=None, **method_kwargs):
+    """
+    Interpolate several point sets onto one grid as the bands of a single
+    tiled GeoTIFF (e.g. the hourly steps of a day), one window at a time.
+
+    Parameters:
+    - band_points: List of input_points lists, one per band.
+    - band_descriptions: Optional list of band descriptions (e.g. ISO
+      timestamps), also stored as a ``time`` tag on each band.
+    - Other parameters as interpolate_raster_windowed.
+
+    Returns:
+    - Path of the written raster.
+    """
+    from rasterio.windows import Window
+
+    profile, x_coords, y_coords, block_size = _windowed_profile(
+        bounds, resolution, len(band_points), block_size, nodata
+    )
+    width = profile['width']
+    dst_path = dst_path or _temp_tif()
+
+    with rasterio.open(dst_path, 'w', **profile) as dst:
+        for row, blocks in _window_blocks(band_points, values, x_coords, y_coords, block_size,
+                                          method, nodata=nodata, **method_kwargs):
+            stack = np.stack(blocks).astype('float32')
+            dst.write(stack, window=Window(0, row, width, stack.shape[1]))
+        for band, description in enumerate(band_descriptions or [], start=1):
+            dst.set_band_description(band, description)
+            dst.update_tags(band, time=description)
+
+    if cog:
+        _cog_in_place(dst_path)
+
+    return dst_path
+
+
+def interpolate_rasters_windowed(point_sets, values, bounds, resolution,
+                                 method='linear', dst_paths=None, block_size=512, cog=False,
+                                 nodata=-9999, **method_kwargs):
+    """
+    Interpolate several point sets onto one grid, each into its own
+    single-band GeoTIFF (e.g. temperature, humidity and wind of one hour),
+    one window at a time.
+
+    Parameters:
+    - point_sets: List of input_points lists, one per output raster.
+    - dst_paths: Output path per point set; None entries (or no list) get a
+      temporary .tif.
+    - Other parameters as interpolate_raster_windowed.
+
+    Returns:
+    - List of written paths, in point_sets order.
+    """
+    from contextlib import ExitStack
+    from rasterio.windows import Window
+
+    profile, x_coords, y_coords, block_size = _windowed_profile(
+        bounds, resolution, 1, block_size, nodata
+    )
+    width = profile['width']
+    dst_paths = [path or _temp_tif() for path in (dst_paths or [None] * len(point_sets))]
+
+    with ExitStack() as stack:
+        outputs = [stack.enter_context(rasterio.open(path, 'w', **profile)) for path in dst_paths]
+        for row, blocks in _window_blocks(point_sets, values, x_coords, y_coords, block_size,
+                                          method, nodata=nodata, **method_kwargs):
+            for dst, block in zip(outputs, blocks):
+                dst.write(block.astype('float32'), 1, window=Window(0, row, width, block.shape[0]))
+
+    if cog:
+        for path in dst_paths:
+            _cog_in_place(path)
+
+    return dst_paths
+
+
+def interpolate_raster_windowed(input_points, values, bounds, resolution,
+                                method='linear', dst_path=None, block_size=512, cog=False,
+                                nodata=-9999, **method_kwargs):
+    """
+    Interpolate straight to a tiled GeoTIFF, one window of rows at a time.
+
+    Only ``block_size`` rows of the output exist in memory at once, so peak
+    memory is bounded by ``block_size * width`` rather than by the extent.
+
+    Parameters:
+    - input_points, values, bounds, resolution, method: as interpolate_raster.
+    - dst_path: Output path (a temporary .tif is created when omitted).
+    - block_size: Internal tile size and number of rows written per window.
+    - cog: Convert the tiled GeoTIFF into a Cloud Optimized GeoTIFF in place.
+    - method_kwargs: Passed to make_interpolator (k, power, radius, ...).
+
+    Returns:
+    - Path of the written raster.
+    """
+    return interpolate_cube_windowed(
+        [input_points], values=values, bounds=bounds, resolution=resolution,
+        method=method, dst_path=dst_path, block_size=block_size, cog=cog,
+        nodata=nodata, **method_kwargs
+    )
+
+
+BAND_AGGREGATES = ('min', 'max', 'mean', 'sum')
+
+
+def band_aggregates(src_path, dst_path=None, cog=False):
+    """
+    Per-pixel min / max / mean / sum across all bands of a multi-band
+    raster, written as a 4-band GeoTIFF, plus per-band statistics.
+
+    Every block of the source is read once with all its bands, and all the
+    reductions are done on that (bands, rows, cols) stack.
+
+    Returns:
+    - (dst_path, band_stats) where band_stats is a list of
+      {'min', 'max', 'mean'} dicts, one per source band.
+    """
+    dst_path = dst_path or _temp_tif()
+
+    with rasterio.open(src_path) as src:
+        nodata = src.nodata if src.nodata is not None else -9999
+        profile = {**src.profile, 'count': len(BAND_AGGREGATES), 'nodata': nodata}
+        profile.pop('photometric', None)
+        n = src.count
+        band_min = np.full(n, np.inf)
+        band_max = np.full(n, -np.inf)
+        band_sum = np.zeros(n)
+        band_count = np.zeros(n, dtype=np.int64)
+
+        with rasterio.open(dst_path, 'w', **profile) as dst:
+            for _, window in src.block_windows(1):
+                stack = src.read(window=window, masked=True)
+                reduced = {
+                    'min': stack.min(axis=0),
+                    'max': stack.max(axis=0),
+                    'mean': stack.mean(axis=0),
+                    'sum': stack.sum(axis=0),
+                }
+                for i, name in enumerate(BAND_AGGREGATES, start=1):
+                    dst.write(np.ma.filled(reduced[name], nodata).astype(profile['dtype']), i, window=window)
+
+                flat = stack.reshape(n, -1)
+                valid = (~np.ma.getmaskarray(flat)).sum(axis=1)
+                has = valid > 0
+                band_min[has] = np.minimum(band_min[has], flat.min(axis=1).data[has])
+                band_max[has] = np.maximum(band_max[has], flat.max(axis=1).data[has])
+                band_sum += np.ma.filled(flat.astype(np.float64).sum(axis=1), 0.0)
+                band_count += valid
+
+            for i, name in enumerate(BAND_AGGREGATES, start=1):
+                dst.set_band_description(i, name)
+
+    if cog:
+        _cog_in_place(dst_path)
+
+    band_stats = [
+        {
+            'min': float(band_min[b]) if band_count[b] else None,
+            'max': float(band_max[b]) if band_count[b] else None,
+            'mean': float(band_sum[b] / band_count[b]) if band_count[b] else None,
+        }
+        for b in range(n)
+    ]
+    return dst_path, band_stats
+
+
+def raster_statistics(path, band=1):
+    """
+    min / max / mean / count of the valid pixels of a raster file, read
+    block by block so large rasters are never loaded whole.
+    """
+    minimum, maximum, total, count = np.inf, -np.inf, 0.0, 0
+    with rasterio.open(path) as src:
+        for _, window in src.block_windows(band):
+            data = src.read(band, window=window, masked=True)
+            valid = data.compressed()
+            if valid.size:
+                minimum = min(minimum, float(valid.min()))
+                maximum = max(maximum, float(valid.max()))
+                total += float(valid.sum(dtype=np.float64))
+                count += valid.size
+    if not count:
+        return {'min': None, 'max': None, 'mean': None, 'count': 0}
+    return {'min': minimum, 'max': maximum, 'mean': total / count, 'count': count}
+
+
 def export_raster_to_cog(instance):
     """
     Export any model instance with a RasterField to a COG.
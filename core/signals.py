@@ -1,7 +1,10 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 from core.utils import RASTER_REGISTRY
 from core.rasterOperations import export_raster_to_cog
+from core import zonalStats
+from core.models import ZonalStat
+from common.models import Neighborhood, District, City
 
 
 def auto_export_cog(sender, instance, created, **kwargs):
@@ -15,7 +18,65 @@ def auto_export_cog(sender, instance, created, **kwargs):
             print(f"⚠️ Warning: COG export failed for {instance}: {e}")
 
 
+def auto_zonal_stats(sender, instance, update_fields=None, **kwargs):
+    """Queue the raster for zonal statistics whenever its pixels may have changed."""
+    # export_raster_to_cog saves only cog_path — the pixels are unchanged
+    if update_fields and set(update_fields) <= {'cog_path'}:
+        return
+    zonalStats.queue_raster(instance)
+
+
+def drop_zonal_stats(sender, instance, **kwargs):
+    zonalStats.delete_raster_stats(instance)
+
+
 # Connect the signal to EVERY raster model in the registry
 for label, model_class in RASTER_REGISTRY.items():
     post_save.connect(auto_export_cog, sender=model_class)
+    post_save.connect(auto_zonal_stats, sender=model_class)
+    post_delete.connect(drop_zonal_stats, sender=model_class)
+
+
+# ── Boundary changed → queue that zone for every raster ──────────────
+_ZONE_LEVELS = {
+    Neighborhood: ZonalStat.ZoneLevel.Neighborhood,
+    District: ZonalStat.ZoneLevel.District,
+    City: ZonalStat.ZoneLevel.City,
+}
+
+
+def _geometry_changed(sender, instance, update_fields):
+    # Population roll-ups don't touch the geometry
+    if update_fields and 'geom' not in update_fields:
+        return False
+    stored = list(sender.objects.filter(pk=instance.pk).values_list('geom', flat=True)[:1])
+    if not stored:
+        return True
+    old, new = stored[0], instance.geom
+    if old is None or new is None:
+        return old is not new
+    if new.srid and old.srid and new.srid != old.srid:
+        new = new.transform(old.srid, clone=True)
+    return not old.equals_exact(new)
+
+
+@receiver(pre_save, sender=Neighborhood, dispatch_uid="neigh_presave_zonal_stats")
+@receiver(pre_save, sender=District, dispatch_uid="district_presave_zonal_stats")
+@receiver(pre_save, sender=City, dispatch_uid="city_presave_zonal_stats")
+def zone_geometry_check(sender, instance, update_fields=None, **kwargs):
+    instance._zonal_geom_changed = _geometry_changed(sender, instance, update_fields)
+
+
+@receiver(post_save, sender=Neighborhood, dispatch_uid="neigh_save_zonal_stats")
+@receiver(post_save, sender=District, dispatch_uid="district_save_zonal_stats")
+@receiver(post_save, sender=City, dispatch_uid="city_save_zonal_stats")
+def zone_saved(sender, instance, **kwargs):
+    if getattr(instance, '_zonal_geom_changed', True):
+        zonalStats.queue_zone(_ZONE_LEVELS[sender], instance.pk)
+
 
+@receiver(post_delete, sender=Neighborhood, dispatch_uid="neigh_delete_zonal_stats")
+@receiver(post_delete, sender=District, dispatch_uid="district_delete_zonal_stats")
+@receiver(post_delete, sender=City, dispatch_uid="city_delete_zonal_stats")
+def zone_deleted(sender, instance, **kwargs):
+    zonalStats.delete_zone_stats(_ZONE_LEVELS[sender], instance.pk)
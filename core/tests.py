@@ -1,3 +1,251 @@
-from django.test import TestCase
+import json
+import os
 
-# Create your tests here.
+from django.test import RequestFactory, SimpleTestCase
+import numpy as np
+import rasterio
+
+from core import interpolationWeights
+from core.crossValidation import loo_errors
+from core.kriging import VARIOGRAM_MODELS, fit_variogram, merge_duplicate_points, ordinary_kriging
+from core.rasterOperations import (
+    idw_interpolate, interpolate_raster, interpolate_rasters_windowed, make_interpolator,
+)
+from core.views import polygon_zonal_stats
+
+
+def station_layout(n=15, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(0, 1000, n), rng.uniform(0, 1000, n), rng.uniform(5, 25, n)
+
+
+def brute_force_idw(point_x, point_y, point_values, x, y, k, power):
+    dist = np.hypot(point_x - x, point_y - y)
+    nearest = np.argsort(dist, kind='stable')[:k]
+    weights = 1 / (dist[nearest] + 1e-10) ** power
+    return (weights * point_values[nearest]).sum() / weights.sum()
+
+
+class TestIdwInterpolate(SimpleTestCase):
+
+    def setUp(self):
+        self.point_x, self.point_y, self.point_values = station_layout()
+        self.x_coords = np.arange(0, 1000, 90.0)
+        self.y_coords = np.arange(1000, 0, -110.0)
+
+    def test_matches_brute_force(self):
+        grid = idw_interpolate(
+            self.point_x, self.point_y, self.point_values,
+            self.x_coords, self.y_coords, k=5, power=2, chunk_rows=3,
+        )
+        for r, y in enumerate(self.y_coords):
+            for c, x in enumerate(self.x_coords):
+                expected = brute_force_idw(self.point_x, self.point_y, self.point_values, x, y, 5, 2)
+                self.assertAlmostEqual(grid[r, c], expected, places=9)
+
+    def test_defaults_weight_every_station_by_inverse_distance(self):
+        # The original per-cell loop: 1/d over all stations
+        grid = idw_interpolate(self.point_x, self.point_y, self.point_values, self.x_coords, self.y_coords)
+        n = len(self.point_x)
+        for r, y in enumerate(self.y_coords):
+            for c, x in enumerate(self.x_coords):
+                expected = brute_force_idw(self.point_x, self.point_y, self.point_values, x, y, n, 1)
+                self.assertAlmostEqual(grid[r, c], expected, places=9)
+
+    def test_cells_outside_radius_get_nodata(self):
+        grid = idw_interpolate(
+            np.array([0.0]), np.array([0.0]), np.array([7.0]),
+            np.array([0.0, 500.0]), np.array([0.0]), radius=100, nodata=-9999,
+        )
+        np.testing.assert_array_equal(grid, [[7.0, -9999]])
+
+    def test_grid_arguments_are_required(self):
+        points = [{'x': 0.0, 'y': 0.0, 'value': 1.0}]
+        with self.assertRaises(TypeError):
+            interpolate_raster(points, 'value')
+
+
+class TestInterpolationWeights(SimpleTestCase):
+
+    def setUp(self):
+        self.point_x, self.point_y, self.point_values = station_layout()
+        self.x_coords = np.arange(0, 1000, 90.0)
+        self.y_coords = np.arange(1000, 0, -110.0)
+        self.shape = (len(self.y_coords), len(self.x_coords))
+        interpolationWeights.clear_cache()
+        self.addCleanup(interpolationWeights.clear_cache)
+        self.addCleanup(interpolationWeights.set_cache_limit, interpolationWeights.CACHE_MAX_MB)
+
+    def test_weights_match_idw_interpolate(self):
+        matrix = interpolationWeights.idw_weight_matrix(
+            self.point_x, self.point_y, self.x_coords, self.y_coords, k=5, radius=400, chunk_rows=4,
+        )
+        expected = idw_interpolate(
+            self.point_x, self.point_y, self.point_values,
+            self.x_coords, self.y_coords, k=5, radius=400,
+        )
+        np.testing.assert_allclose(
+            interpolationWeights.apply_weights(matrix, self.point_values, self.shape), expected,
+        )
+
+    def test_apply_weights_many_matches_single_columns(self):
+        matrix = interpolationWeights.idw_weight_matrix(
+            self.point_x, self.point_y, self.x_coords, self.y_coords, k=5, radius=300,
+        )
+        columns = [self.point_values, self.point_values * 2 - 3, np.arange(len(self.point_x))]
+        grids = interpolationWeights.apply_weights_many(matrix, columns, self.shape)
+        self.assertEqual(grids.shape, (3,) + self.shape)
+        for grid, column in zip(grids, columns):
+            np.testing.assert_allclose(grid, interpolationWeights.apply_weights(matrix, column, self.shape))
+
+    def test_set_cache_limit_evicts_to_budget(self):
+        for y_coords in (self.y_coords, self.y_coords - 1, self.y_coords - 2):
+            interpolationWeights.get_weights(self.point_x, self.point_y, self.x_coords, y_coords, k=5)
+        self.assertEqual(len(interpolationWeights._cache), 3)
+        interpolationWeights.set_cache_limit(0)
+        self.assertEqual(len(interpolationWeights._cache), 1)
+
+    def test_rasters_on_one_layout_share_weights(self):
+        temperature = [{'x': x, 'y': y, 'value': v}
+                       for x, y, v in zip(self.point_x, self.point_y, self.point_values)]
+        humidity = [{**point, 'value': point['value'] * 3} for point in temperature]
+        paths = interpolate_rasters_windowed(
+            [temperature, humidity], 'value', (0, 0, 1000, 1000), 100,
+            method='idw', block_size=16, k=5, cache_weights=True,
+        )
+        self.addCleanup(lambda: [os.remove(path) for path in paths])
+        self.assertEqual(len(interpolationWeights._cache), 1)
+
+        x_coords = np.arange(0, 1000, 100.0)
+        y_coords = np.arange(1000, 0, -100.0)
+        for path, factor in zip(paths, (1, 3)):
+            with rasterio.open(path) as src:
+                expected = idw_interpolate(
+                    self.point_x, self.point_y, self.point_values * factor, x_coords, y_coords, k=5,
+                )
+                np.testing.assert_allclose(src.read(1), expected, rtol=1e-5)
+
+
+def brute_force_kriging(point_x, point_y, point_values, x, y, variogram):
+    """Dense ordinary kriging over every station, one cell at a time."""
+    func = VARIOGRAM_MODELS[variogram['model']]
+    params = (variogram['nugget'], variogram['sill'], variogram['range'])
+    n = len(point_x)
+    between = np.hypot(point_x[:, None] - point_x[None, :], point_y[:, None] - point_y[None, :])
+    A = np.ones((n + 1, n + 1))
+    A[:n, :n] = func(between, *params) + np.eye(n) * 1e-10 * variogram['sill']
+    A[n, n] = 0.0
+    b = np.append(func(np.hypot(point_x - x, point_y - y), *params), 1.0)
+    return np.linalg.solve(A, b)[:n] @ point_values
+
+
+class TestOrdinaryKriging(SimpleTestCase):
+
+    def setUp(self):
+        self.point_x, self.point_y, self.point_values = station_layout(n=12)
+        self.x_coords = np.arange(0, 1000, 125.0)
+        self.y_coords = np.arange(1000, 0, -150.0)
+        self.variogram = {'model': 'exponential', 'nugget': 0.0, 'sill': 30.0, 'range': 600.0}
+
+    def test_full_neighbourhood_matches_dense_solve(self):
+        grid = ordinary_kriging(
+            self.point_x, self.point_y, self.point_values, self.x_coords, self.y_coords,
+            k=len(self.point_x), variogram=self.variogram, chunk_cells=7,
+        )
+        for r, y in enumerate(self.y_coords):
+            for c, x in enumerate(self.x_coords):
+                expected = brute_force_kriging(
+                    self.point_x, self.point_y, self.point_values, x, y, self.variogram,
+                )
+                self.assertAlmostEqual(grid[r, c], expected, places=6)
+
+    def test_exact_at_stations(self):
+        for i in range(3):
+            grid = ordinary_kriging(
+                self.point_x, self.point_y, self.point_values,
+                self.point_x[i:i + 1], self.point_y[i:i + 1], k=6, variogram=self.variogram,
+            )
+            self.assertAlmostEqual(grid[0, 0], self.point_values[i], places=5)
+
+    def test_duplicate_stations_are_averaged(self):
+        grid = ordinary_kriging(
+            np.array([0.0, 0.0, 500.0]), np.array([0.0, 0.0, 500.0]), np.array([2.0, 4.0, 10.0]),
+            np.array([0.0]), np.array([0.0]), variogram=self.variogram,
+        )
+        self.assertAlmostEqual(grid[0, 0], 3.0, places=5)
+
+    def test_constant_field_fits_flat_variogram(self):
+        values = np.full(len(self.point_x), 7.5)
+        variogram = fit_variogram(self.point_x, self.point_y, values)
+        self.assertEqual(variogram['nugget'], 0.0)
+        grid = ordinary_kriging(self.point_x, self.point_y, values, self.x_coords, self.y_coords, k=5)
+        np.testing.assert_allclose(grid, 7.5)
+
+
+class TestLeaveOneOut(SimpleTestCase):
+
+    def setUp(self):
+        # loo_errors reports stations in merge_duplicate_points (coordinate) order
+        self.point_x, self.point_y, self.point_values = merge_duplicate_points(*station_layout(n=20, seed=3))
+
+    def held_out(self, method, **params):
+        """Predict every station from a fit on the others, one at a time."""
+        predicted = []
+        for i in range(len(self.point_x)):
+            keep = np.arange(len(self.point_x)) != i
+            evaluate = make_interpolator(
+                self.point_x[keep], self.point_y[keep], self.point_values[keep], method, **params,
+            )
+            predicted.append(evaluate(self.point_x[i:i + 1], self.point_y[i:i + 1])[0, 0])
+        return np.array(predicted) - self.point_values
+
+    def test_matches_refitting_without_each_station(self):
+        cases = [
+            ({'method': 'nearest'}, {}),
+            ({'method': 'idw', 'power': 2, 'k': 6}, {'power': 2, 'k': 6}),
+            ({'method': 'linear', 'k': 8}, {'k': 8}),
+            ({'method': 'spline', 'k': 8}, {'k': 8}),
+        ]
+        errors = loo_errors(self.point_x, self.point_y, self.point_values, [c for c, _ in cases])
+        for (candidate, params), residuals in zip(cases, errors):
+            with self.subTest(method=candidate['method']):
+                expected = self.held_out(candidate['method'], **params)
+                np.testing.assert_allclose(residuals, expected, atol=1e-6)
+
+    def test_kriging_matches_refitting_with_the_same_variogram(self):
+        [residuals] = loo_errors(
+            self.point_x, self.point_y, self.point_values, [{'method': 'kriging', 'k': 6}],
+        )
+        variogram = fit_variogram(self.point_x, self.point_y, self.point_values)
+        for i, residual in enumerate(residuals):
+            keep = np.arange(len(self.point_x)) != i
+            predicted = ordinary_kriging(
+                self.point_x[keep], self.point_y[keep], self.point_values[keep],
+                self.point_x[i:i + 1], self.point_y[i:i + 1], k=6, variogram=variogram,
+            )
+            self.assertAlmostEqual(residual, predicted[0, 0] - self.point_values[i], places=6)
+
+    def test_too_few_stations(self):
+        [residuals] = loo_errors([0, 1, 2], [0, 1, 2], [1, 2, 3], [{'method': 'idw'}])
+        self.assertEqual(residuals.size, 0)
+
+
+class TestPolygonZonalStatsValidation(SimpleTestCase):
+    square = {"type": "Polygon", "coordinates": [[[0, 0], [1, 0], [1, 1], [0, 1], [0, 0]]]}
+
+    def post(self, **body):
+        request = RequestFactory().post(
+            '/raster/zonal-stats/', json.dumps({"geometry": self.square, **body}), content_type='application/json',
+        )
+        return polygon_zonal_stats(request)
+
+    def test_unhashable_layer_entries_are_rejected(self):
+        for layers in ([["a", "b"]], [{"layer": ["a"]}], [{"layer": {"a": 1}}], "population"):
+            self.assertEqual(self.post(layers=layers).status_code, 400, layers)
+
+    def test_layer_id_must_be_an_integer(self):
+        self.assertEqual(self.post(layers=[{"layer": "population", "id": [1]}]).status_code, 400)
+
+    def test_band_must_be_a_positive_integer(self):
+        for band in (0, -1, "2", 1.5, True):
+            self.assertEqual(self.post(layers=["population"], band=band).status_code, 400, band)
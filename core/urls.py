@@ -6,4 +6,5 @@ app_name = "core"
 urlpatterns = [
     path('raster/<str:app_label>/<str:layer_name>/tiles/', views.get_raster_tiles, name='raster-tiles'),
     path('raster/<str:app_label>/<str:layer_name>/info/', views.get_raster_info),
+    path('raster/zonal-stats/', views.polygon_zonal_stats, name='polygon-zonal-stats'),
 ]
\ No newline at end of file
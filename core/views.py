@@ -1,7 +1,10 @@
 from django.http import JsonResponse
+from django.views.decorators.http import require_POST
 from .utils import RASTER_REGISTRY
+from .zonalStats import polygon_stats_for_layers, DEFAULT_PERCENTILES
 from django.conf import settings
 from urllib.parse import quote
+import json
 import requests
 
 
@@ -86,5 +89,86 @@ def get_raster_tiles(request, app_label, layer_name):
     })
 
 
+@require_POST
+def polygon_zonal_stats(request):
+    """
+    Summary statistics of raster layers inside a user-drawn polygon.
 
+    POST JSON:
+        geometry:    GeoJSON Polygon/MultiPolygon (or Feature) in EPSG:4326
+        layers:      list of registry keys, or {"layer": key, "id": raster_id}
+                     objects (default: every raster layer with a COG). A bare
+                     key uses the layer's most recent raster.
+        percentiles: list of percentiles (default: 10, 25, 50, 75, 90)
+        band:        1-based band to read from every raster (default: 1)
+
+    Returns one entry per requested raster in "results" and "missing",
+    each carrying its "layer" and "id".
+    """
+    try:
+        body = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON"}, status=400)
+
+    geometry = body.get("geometry")
+    if isinstance(geometry, dict) and geometry.get("type") == "Feature":
+        geometry = geometry.get("geometry")
+    if not isinstance(geometry, dict) or geometry.get("type") not in ("Polygon", "MultiPolygon"):
+        return JsonResponse({"error": "geometry must be a GeoJSON Polygon or MultiPolygon"}, status=400)
+
+    try:
+        percentiles = [float(p) for p in body.get("percentiles", DEFAULT_PERCENTILES)]
+    except (TypeError, ValueError):
+        return JsonResponse({"error": "percentiles must be a list of numbers"}, status=400)
+    if any(p < 0 or p > 100 for p in percentiles):
+        return JsonResponse({"error": "percentiles must be between 0 and 100"}, status=400)
+
+    band = body.get("band", 1)
+    if isinstance(band, bool) or not isinstance(band, int) or band < 1:
+        return JsonResponse({"error": "band must be a positive integer"}, status=400)
+
+    layers = body.get("layers") or list(RASTER_REGISTRY)
+    if not isinstance(layers, list):
+        return JsonResponse({"error": "layers must be a list"}, status=400)
+
+    requested = []
+    for layer in layers:
+        registry_key, raster_id = (layer.get("layer"), layer.get("id")) if isinstance(layer, dict) else (layer, None)
+        if not isinstance(registry_key, str):
+            return JsonResponse({"error": 'each layer must be a registry key or a {"layer": key, "id": raster_id} object'}, status=400)
+        if raster_id is not None and (isinstance(raster_id, bool) or not isinstance(raster_id, int)):
+            return JsonResponse({"error": "layer id must be an integer"}, status=400)
+        requested.append((registry_key, raster_id))
+
+    jobs = {}
+    missing = []
+    for registry_key, raster_id in requested:
+        model_class = RASTER_REGISTRY.get(registry_key)
+        if not model_class:
+            missing.append({"layer": registry_key, "id": raster_id, "reason": "not found in raster registry"})
+            continue
+        if not hasattr(model_class, 'cog_path'):
+            missing.append({"layer": registry_key, "id": raster_id, "reason": "layer is not published as COG"})
+            continue
+
+        qs = model_class.objects.filter(cog_path__isnull=False)
+        if raster_id:
+            instance = qs.filter(id=raster_id).first()
+        else:
+            latest_first = ['-date', '-pk'] if any(f.name == 'date' for f in model_class._meta.fields) else ['-pk']
+            instance = qs.order_by(*latest_first).first()
+        if not instance:
+            missing.append({"layer": registry_key, "id": raster_id, "reason": "COG not generated yet"})
+            continue
+        jobs[(registry_key, instance.pk)] = instance.cog_path
+
+    results = polygon_stats_for_layers(jobs, geometry, percentiles, band=band)
+
+    return JsonResponse({
+        "results": [
+            {"layer": registry_key, "id": raster_id, "stats": stats}
+            for (registry_key, raster_id), stats in results.items()
+        ],
+        "missing": missing,
+    })
 
@@ -0,0 +1,452 @@
+"""
+Zonal statistics engine.
+
+Rasterises the administrative polygons (Neighborhood / District / City) once
+per raster grid and reduces every band against the resulting label grid with
+``np.bincount``-style reductions, so each raster is read exactly once no
+matter how many zones it covers. Results are stored in ``core.ZonalStat``.
+
+Raster and boundary saves only queue work (``core.ZonalStatRequest``, see
+core.signals); ``process_pending`` — run by ``compute_zonal_stats --pending``
+— does the reading and reducing outside the request cycle.
+"""
+import json
+import os
+from collections import defaultdict
+
+import numpy as np
+import rasterio
+from affine import Affine
+from rasterio.features import rasterize
+from django.contrib.gis.geos import Polygon
+from django.db import transaction
+from django.utils import timezone
+
+from common.models import Neighborhood, District, City
+from core.models import ZonalStat, ZonalStatRequest
+from core.rasterOperations import get_raster_field_name
+
+
+ZONE_MODELS = {
+    ZonalStat.ZoneLevel.Neighborhood: Neighborhood,
+    ZonalStat.ZoneLevel.District: District,
+    ZonalStat.ZoneLevel.City: City,
+}
+
+
+def raster_model_key(model):
+    """Registry key for a raster model, same format as core.utils.MODEL_REGISTRY."""
+    return f"{model._meta.app_label}.{model.__name__}"
+
+
+def _grid_of(raster):
+    """(transform, shape, srid) describing the pixel grid of a GDALRaster."""
+    return Affine.from_gdal(*raster.geotransform), (raster.height, raster.width), raster.srid
+
+
+def _raster_extent_polygon(raster):
+    extent = Polygon.from_bbox(raster.extent)
+    extent.srid = raster.srid
+    return extent
+
+
+def rasterize_zones(zones, transform, shape, srid):
+    """
+    Burn zone polygons into an int32 label grid.
+
+    Args:
+        zones: iterable of (zone_id, geometry) pairs
+        transform: affine transform of the target grid
+        shape: (rows, cols) of the target grid
+        srid: SRID of the target grid
+
+    Returns:
+        tuple: (labels array, list of zone ids). Label ``i`` (1-based) maps to
+        ``zone_ids[i - 1]``; 0 is background.
+    """
+    shapes = []
+    zone_ids = []
+    for zone_id, geom in zones:
+        if geom is None or geom.empty:
+            continue
+        if geom.srid and geom.srid != srid:
+            geom = geom.transform(srid, clone=True)
+        zone_ids.append(zone_id)
+        shapes.append((json.loads(geom.geojson), len(zone_ids)))
+
+    if not shapes:
+        return np.zeros(shape, dtype=np.int32), zone_ids
+
+    labels = rasterize(
+        shapes,
+        out_shape=shape,
+        transform=transform,
+        fill=0,
+        dtype='int32',
+    )
+    return labels, zone_ids
+
+
+def zonal_statistics(labels, bands, n_zones, nodata=None):
+    """
+    Vectorised per-zone statistics for every band in one pass.
+
+    Args:
+        labels: 2D int array of zone labels (0 = background)
+        bands: 3D array (band, rows, cols) or 2D array for a single band
+        n_zones: number of zones (highest label)
+        nodata: per-band nodata values (list) or a single value
+
+    Returns:
+        dict of arrays shaped (band, n_zones): count, sum, mean, std, min, max.
+        Zones without valid pixels have count 0 and NaN statistics.
+    """
+    bands = np.asarray(bands, dtype=np.float64)
+    if bands.ndim == 2:
+        bands = bands[np.newaxis, ...]
+    n_bands = bands.shape[0]
+
+    if not isinstance(nodata, (list, tuple, np.ndarray)):
+        nodata = [nodata] * n_bands
+
+    flat = bands.reshape(n_bands, -1)
+    valid = np.isfinite(flat) & (labels.reshape(1, -1) > 0)
+    for b, nd in enumerate(nodata):
+        if nd is not None:
+            valid[b] &= flat[b] != nd
+
+    # Offset each band's labels so all bands reduce in a single bincount
+    stride = n_zones + 1
+    band_idx, pix_idx = np.nonzero(valid)
+    keys = band_idx * stride + labels.reshape(-1)[pix_idx]
+    values = flat[band_idx, pix_idx]
+    size = n_bands * stride
+
+    count = np.bincount(keys, minlength=size)
+    total = np.bincount(keys, weights=values, minlength=size)
+    total_sq = np.bincount(keys, weights=values * values, minlength=size)
+
+    vmin = np.full(size, np.inf)
+    vmax = np.full(size, -np.inf)
+    np.minimum.at(vmin, keys, values)
+    np.maximum.at(vmax, keys, values)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / count
+        std = np.sqrt(np.maximum(total_sq / count - mean * mean, 0))
+
+    empty = count == 0
+    for arr in (mean, std, vmin, vmax):
+        arr[empty] = np.nan
+
+    def _shape(arr):
+        return arr.reshape(n_bands, stride)[:, 1:]
+
+    return {
+        'count': _shape(count),
+        'sum': _shape(total),
+        'mean': _shape(mean),
+        'std': _shape(std),
+        'min': _shape(vmin),
+        'max': _shape(vmax),
+    }
+
+
+def _read_bands(raster):
+    data = np.stack([band.data() for band in raster.bands])
+    nodata = [band.nodata_value for band in raster.bands]
+    return data, nodata
+
+
+def _load_grid(instance):
+    """
+    (transform, shape, srid, extent, data, nodata) of a raster instance.
+
+    Reads the raster column, or the COG for records written straight to
+    disk (``cog_only`` weather layers). None when neither is available.
+    """
+    raster = getattr(instance, get_raster_field_name(instance.__class__))
+    if raster is not None:
+        transform, shape, srid = _grid_of(raster)
+        data, nodata = _read_bands(raster)
+        return transform, shape, srid, _raster_extent_polygon(raster), data, nodata
+
+    cog_path = getattr(instance, 'cog_path', None)
+    if not cog_path or not os.path.exists(cog_path):
+        return None
+    with rasterio.open(cog_path) as src:
+        srid = src.crs.to_epsg()
+        extent = Polygon.from_bbox(tuple(src.bounds))
+        extent.srid = srid
+        return src.transform, (src.height, src.width), srid, extent, src.read(), [src.nodata] * src.count
+
+
+def _zones_for_level(level, extent, zone_ids=None):
+    qs = ZONE_MODELS[level].objects.filter(geom__intersects=extent)
+    if zone_ids is not None:
+        qs = qs.filter(pk__in=zone_ids)
+    return [(str(pk), geom) for pk, geom in qs.values_list('pk', 'geom')]
+
+
+def _to_float(value):
+    return None if np.isnan(value) else float(value)
+
+
+def compute_zonal_stats(instance, levels=None, zone_ids=None, label_cache=None):
+    """
+    Compute and store ZonalStat rows for one raster instance.
+
+    Args:
+        instance: raster model instance (any model in RASTER_REGISTRY)
+        levels: zone levels to compute (default: all)
+        zone_ids: restrict to these zone primary keys (used for boundary
+                  refresh); a dict of {level: ids} restricts each level
+                  to its own zones
+        label_cache: optional dict reused across rasters sharing a grid, so
+                     the polygons are rasterised once per grid and level
+
+    Returns:
+        Number of ZonalStat rows written.
+    """
+    model = instance.__class__
+    grid = _load_grid(instance)
+    if grid is None:
+        return 0
+
+    levels = levels or list(ZONE_MODELS)
+    label_cache = {} if label_cache is None else label_cache
+    key = raster_model_key(model)
+    transform, shape, srid, extent, data, nodata = grid
+    now = timezone.now()
+    rows = []
+
+    for level in levels:
+        level_ids = _level_zone_ids(zone_ids, level)
+        cache_key = (tuple(transform), shape, srid, level, tuple(level_ids) if level_ids is not None else None)
+        if cache_key not in label_cache:
+            zones = _zones_for_level(level, extent, level_ids)
+            label_cache[cache_key] = rasterize_zones(zones, transform, shape, srid)
+        labels, level_zone_ids = label_cache[cache_key]
+        if not level_zone_ids:
+            continue
+
+        stats = zonal_statistics(labels, data, len(level_zone_ids), nodata)
+
+        for b in range(data.shape[0]):
+            for z, zone_id in enumerate(level_zone_ids):
+                rows.append(ZonalStat(
+                    raster_model=key,
+                    raster_id=instance.pk,
+                    band=b + 1,
+                    zone_level=level,
+                    zone_id=zone_id,
+                    count=int(stats['count'][b, z]),
+                    min=_to_float(stats['min'][b, z]),
+                    max=_to_float(stats['max'][b, z]),
+                    mean=_to_float(stats['mean'][b, z]),
+                    std=_to_float(stats['std'][b, z]),
+                    sum=float(stats['sum'][b, z]),
+                    last_updated=now,
+                ))
+
+    with transaction.atomic():
+        for level in levels:
+            stale = ZonalStat.objects.filter(raster_model=key, raster_id=instance.pk, zone_level=level)
+            level_ids = _level_zone_ids(zone_ids, level)
+            if level_ids is not None:
+                stale = stale.filter(zone_id__in=[str(z) for z in level_ids])
+            stale.delete()
+        ZonalStat.objects.bulk_create(rows, batch_size=1000)
+
+    return len(rows)
+
+
+def _level_zone_ids(zone_ids, level):
+    if isinstance(zone_ids, dict):
+        return zone_ids.get(level, [])
+    return zone_ids
+
+
+def delete_zone_stats(level, zone_id):
+    ZonalStat.objects.filter(zone_level=level, zone_id=str(zone_id)).delete()
+    ZonalStatRequest.objects.filter(zone_level=level, zone_id=str(zone_id)).delete()
+
+
+def delete_raster_stats(instance):
+    key = raster_model_key(instance.__class__)
+    ZonalStat.objects.filter(raster_model=key, raster_id=instance.pk).delete()
+    ZonalStatRequest.objects.filter(raster_model=key, raster_id=instance.pk).delete()
+
+
+# ── Queue ─────────────────────────────────────────────────────────────
+
+def queue_raster(instance):
+    """
+    Queue a raster record for a full recompute. Re-queueing bumps
+    requested_at, so a run already holding the request keeps it queued.
+    """
+    ZonalStatRequest.objects.update_or_create(
+        raster_model=raster_model_key(instance.__class__), raster_id=instance.pk,
+        defaults={'requested_at': timezone.now()},
+    )
+
+
+def queue_zone(level, zone_id):
+    """Queue a zone whose geometry changed for a recompute against every raster."""
+    ZonalStatRequest.objects.update_or_create(
+        zone_level=level, zone_id=str(zone_id),
+        defaults={'requested_at': timezone.now()},
+    )
+
+
+def process_pending(log=print):
+    """
+    Work through the queued requests.
+
+    Every queued raster is recomputed for all zones; every other raster is
+    read once for all queued zones together. Requests are removed once
+    handled, unless they were queued again meanwhile. A raster request
+    that fails stays queued, and so do the zone requests when any raster
+    fails for them.
+
+    Returns:
+        Number of ZonalStat rows written.
+    """
+    from core.utils import RASTER_REGISTRY
+
+    snapshot = timezone.now()
+    pending = list(ZonalStatRequest.objects.filter(requested_at__lte=snapshot))
+    if not pending:
+        return 0
+
+    raster_requests = defaultdict(list)
+    zones = defaultdict(set)
+    for request in pending:
+        if request.raster_model:
+            raster_requests[(request.raster_model, request.raster_id)].append(request.pk)
+        elif request.zone_level:
+            zones[request.zone_level].add(request.zone_id)
+
+    label_cache = {}
+    written = 0
+    done = []
+    for (model_key, raster_id), request_ids in raster_requests.items():
+        model = RASTER_REGISTRY.get(model_key)
+        instance = model.objects.filter(pk=raster_id).first() if model else None
+        try:
+            if instance is not None:
+                n = compute_zonal_stats(instance, label_cache=label_cache)
+                written += n
+                log(f"  ✓ {model_key} id={raster_id}: {n} rows")
+            done.extend(request_ids)
+        except Exception as e:
+            log(f"  ✗ {model_key} id={raster_id}: {e}")
+
+    if zones:
+        zone_ids = {level: sorted(ids) for level, ids in zones.items()}
+        failed = False
+        for model_key, model in RASTER_REGISTRY.items():
+            for instance in model.objects.iterator(chunk_size=1):
+                if (model_key, instance.pk) in raster_requests:
+                    continue
+                try:
+                    written += compute_zonal_stats(
+                        instance, levels=list(zone_ids), zone_ids=zone_ids, label_cache=label_cache,
+                    )
+                except Exception as e:
+                    failed = True
+                    log(f"  ✗ {model_key} id={instance.pk}: {e}")
+        if failed:
+            log(f"  ⚠️ {sum(len(ids) for ids in zone_ids.values())} changed zones stay queued")
+        else:
+            done.extend(r.pk for r in pending if not r.raster_model)
+            log(f"  ✓ {sum(len(ids) for ids in zone_ids.values())} changed zones refreshed")
+
+    # A request re-queued during this run describes a newer version
+    ZonalStatRequest.objects.filter(pk__in=done, requested_at__lte=snapshot).delete()
+    return written
+
+
+def get_zonal_stats(level, zone_id, raster_model=None):
+    """Stored statistics for a zone, optionally limited to one raster model key."""
+    qs = ZonalStat.objects.filter(zone_level=level, zone_id=str(zone_id))
+    if raster_model:
+        qs = qs.filter(raster_model=raster_model)
+    return qs.order_by('raster_model', 'raster_id', 'band')
+
+
+# ── Ad-hoc polygon statistics straight from the COGs ──────────────────
+
+DEFAULT_PERCENTILES = (10, 25, 50, 75, 90)
+
+
+def polygon_stats_from_cog(cog_path, geometry, percentiles=DEFAULT_PERCENTILES, band=1):
+    """
+    Summary statistics of a COG inside a GeoJSON polygon (EPSG:4326).
+
+    Only the window covering the polygon is read, so the cost depends on
+    the polygon size rather than on the raster extent. Returns None when the
+    polygon does not overlap any valid pixel.
+    """
+    import rasterio
+    from rasterio.features import geometry_mask, geometry_window
+    from rasterio.warp import transform_geom
+    from rasterio.errors import WindowError
+
+    with rasterio.open(cog_path) as src:
+        geom = transform_geom('EPSG:4326', src.crs, geometry) if src.crs else geometry
+        try:
+            window = geometry_window(src, [geom])
+        except WindowError:
+            return None
+
+        data = src.read(band, window=window, masked=True)
+        outside = geometry_mask(
+            [geom],
+            out_shape=data.shape,
+            transform=src.window_transform(window),
+        )
+        values = data.astype(np.float64).filled(np.nan)[~outside]
+        values = values[np.isfinite(values)]
+
+    if values.size == 0:
+        return None
+
+    pcts = np.percentile(values, percentiles)
+    return {
+        'count': int(values.size),
+        'min': float(values.min()),
+        'max': float(values.max()),
+        'mean': float(values.mean()),
+        'std': float(values.std()),
+        'percentiles': {f"p{p:g}": float(v) for p, v in zip(percentiles, pcts)},
+    }
+
+
+def polygon_stats_for_layers(jobs, geometry, percentiles=DEFAULT_PERCENTILES, band=1, max_workers=8):
+    """
+    Run polygon_stats_from_cog for several layers in a thread pool.
+
+    Args:
+        jobs: dict of {key: cog_path}, e.g. keyed by (layer, raster id)
+        geometry: GeoJSON polygon in EPSG:4326
+        band: 1-based band read from every COG
+
+    Returns:
+        dict of {key: stats dict, None, or {'error': message}}
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    if not jobs:
+        return {}
+
+    def _run(item):
+        key, path = item
+        try:
+            return key, polygon_stats_from_cog(path, geometry, percentiles, band=band)
+        except Exception as e:
+            return key, {'error': str(e)}
+
+    # GDAL releases the GIL while decoding blocks, so threads overlap the I/O
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs))) as pool:
+        return dict(pool.map(_run, jobs.items()))
@@ -16,6 +16,7 @@ import geopandas as gpd
 from .forms import GeoUploadForm, MappingForm, get_target_model_choices
 from .utils import gpd_read_any
 from core.utils import MODEL_REGISTRY
+from watersupply.metering import recompute_metered_residential
 
 from django.db.models import Field, ForeignKey, OneToOneField, AutoField
 from django.contrib.gis.db.models import GeometryField, RasterField, MultiPolygonField
@@ -60,6 +61,12 @@ MODEL_OVERRIDES = {
     },
 }
 
+# Set-based recomputes run once after a (non dry-run) import of these models
+POST_IMPORT = {
+    'watersupply.MeteredResidential': recompute_metered_residential,
+    'watersupply.UsersLocation': recompute_metered_residential,
+}
+
 def _get_expected_geom_type(field):
     """Return human-readable geometry type expected by the field."""
     from django.contrib.gis.db.models import (
@@ -532,6 +539,8 @@ def _generic_import(gdf, target_label, colmap, dry_run=True, target_srid=None):
 
     if dry_run:
         transaction.set_rollback(True)
+    elif opts.label in POST_IMPORT:
+        POST_IMPORT[opts.label]()
 
     return {
         'target': opts.label,
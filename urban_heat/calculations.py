@@ -10,7 +10,7 @@ from .models import (
 )
 from common.models import Province, LandCoverVector, DigitalSurfaceModel
 from builtup.models import Park, Building, Street
-from weather.models import Meteorology
+from weather.models import MeteorologyLatest
 
 
 # ── Vegetation & Green Area ──────────────────────────────────────────
@@ -268,12 +268,15 @@ def calculate_nbs_coverage(province):
 def get_latest_meteorology(province):
     """Latest meteorological measurements within the province.
 
+    Reads the per-station latest-value table kept current on ingest
+    instead of sorting raw Meteorology rows.
+
     DAG edges:  Climate_Change     → Meteorology
                 Anthropogenic_Heat → Meteorology
                 Canyon_Aspect      → Meteorology
     """
     record = (
-        Meteorology.objects
+        MeteorologyLatest.objects
         .filter(station__geom__intersects=province.geom, station__is_active=True)
         .order_by('-date')
         .first()
@@ -21,5 +21,8 @@ admin.site.register(ExtractionWater)
 admin.site.register(ImportedWater)
 admin.site.register(WaterTreatment)
 admin.site.register(CoverageWaterSupply)
+admin.site.register(PipeBuffer)
+admin.site.register(NeighborhoodCoverage)
 admin.site.register(NonRevenueWater)
+admin.site.register(NonRevenueWaterYear)
 
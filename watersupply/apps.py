@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class WatersupplyConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "watersupply"
+
+    def ready(self):
+        from . import signals
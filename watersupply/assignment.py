@@ -0,0 +1,110 @@
+"""
+Set-based spatial assignments.
+
+ExtractionWater.save looks up its AvailableFreshWater (the balance area
+containing the well's centroid) one row at a time. After a bulk load of a
+well register the same assignment is done here for every well in a single
+UPDATE … FROM … ST_Contains, which uses the GiST index on the source
+polygons. Where several sources contain a well, the lowest source id wins.
+"""
+from django.db import connection
+
+from common.models import Province
+from .calculations import _table, _col
+from .models import AvailableFreshWater, ExtractionWater
+from . import cache as bundle_cache
+
+
+def _containing_sources_sql(well_filter):
+    """(well id, source id) of every well centroid inside a source polygon."""
+    W, S = ExtractionWater, AvailableFreshWater
+    return f"""
+        SELECT DISTINCT ON (e.{_col(W, 'id')})
+            e.{_col(W, 'id')} AS well_id, s.{_col(S, 'id')} AS source_id
+        FROM {_table(W)} e
+        JOIN {_table(S)} s
+          ON ST_Contains(s.{_col(S, 'geom')}, ST_Centroid(e.{_col(W, 'geom')}))
+        {well_filter}
+        ORDER BY e.{_col(W, 'id')}, s.{_col(S, 'id')}
+    """
+
+
+def _well_filter(well_ids, alias='w'):
+    if well_ids is None:
+        return '', {}
+    return f"WHERE {alias}.{_col(ExtractionWater, 'id')} = ANY(%(well_ids)s)", {'well_ids': list(well_ids)}
+
+
+def assign_well_sources(well_ids=None):
+    """
+    Point every well (or the given ExtractionWater ids) at the source
+    containing its centroid. Rows already pointing there are left alone.
+
+    Returns:
+        Number of wells whose source changed.
+    """
+    W = ExtractionWater
+    well_filter, params = _well_filter(well_ids, alias='e')
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE {_table(W)} w
+            SET {_col(W, 'source')} = m.source_id,
+                {_col(W, 'last_updated')} = now()
+            FROM ({_containing_sources_sql(well_filter)}) m
+            WHERE w.{_col(W, 'id')} = m.well_id
+              AND w.{_col(W, 'source')} IS DISTINCT FROM m.source_id
+            """,
+            params,
+        )
+        updated = cursor.rowcount
+    if updated:
+        bundle_cache.invalidate()
+    return updated
+
+
+def unassigned_wells(well_ids=None):
+    """Ids of wells whose centroid lies in no AvailableFreshWater polygon."""
+    W, S = ExtractionWater, AvailableFreshWater
+    well_filter, params = _well_filter(well_ids)
+    where = f"{well_filter} AND" if well_filter else "WHERE"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT w.{_col(W, 'id')}
+            FROM {_table(W)} w
+            {where} NOT EXISTS (
+                SELECT 1 FROM {_table(S)} s
+                WHERE ST_Contains(s.{_col(S, 'geom')}, ST_Centroid(w.{_col(W, 'geom')}))
+            )
+            ORDER BY 1
+            """,
+            params,
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def source_provinces(source_ids=None):
+    """
+    {source id: province id} for the province containing each source's
+    centroid, in one query — the lookup AvailableFreshWater.save and
+    TotalWaterProduction.save do per row.
+    """
+    S, P = AvailableFreshWater, Province
+    source_filter, params = '', {}
+    if source_ids is not None:
+        source_filter = f"WHERE s.{_col(S, 'id')} = ANY(%(source_ids)s)"
+        params = {'source_ids': list(source_ids)}
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT DISTINCT ON (s.{_col(S, 'id')}) s.{_col(S, 'id')}, p.{_col(P, 'id')}
+            FROM {_table(S)} s
+            JOIN {_table(P)} p
+              ON ST_Contains(p.{_col(P, 'geom')}, ST_Centroid(s.{_col(S, 'geom')}))
+            {source_filter}
+            ORDER BY s.{_col(S, 'id')}, p.{_col(P, 'id')}
+            """,
+            params,
+        )
+        return dict(cursor.fetchall())
@@ -0,0 +1,89 @@
+"""
+Cache of the (province, year) data bundle behind the water indicator panel.
+
+Every bundle key carries a generation stamp. Saving or deleting any model
+that feeds the bundle (see watersupply.signals) replaces the stamp once the
+transaction commits, which retires all cached bundles at once without
+knowing their keys. The stamp only reaches other workers and management
+commands through a shared cache backend (see CACHES in settings). Writes that
+bypass signals (QuerySet.update, bulk_create, raw SQL) are bounded by
+WATER_INDICATOR_CACHE_TIMEOUT.
+
+Scenario sessions pin the bundle a page was rendered from, so slider
+recalculations keep running on it without touching the database. Rendering
+the page stores the snapshot under a random token bound to its location
+and year. Snapshots are not invalidated; they expire after
+WATER_SCENARIO_TIMEOUT.
+"""
+import secrets
+import time
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+GENERATION_KEY = 'watersupply:bundle:generation'
+SCENARIO_PREFIX = 'watersupply:scenario'
+
+
+def _generation():
+    return cache.get_or_set(GENERATION_KEY, time.time_ns(), timeout=None)
+
+
+def bundle_key(location, year):
+    return f"watersupply:bundle:{_generation()}:{quote(str(location))}:{year}"
+
+
+def get_or_build(location, year, build):
+    """
+    Cached ``build(location, year)``. A None result (unknown province) is
+    not cached.
+    """
+    key = bundle_key(location, year)
+    data = cache.get(key)
+    if data is None:
+        data = build(location, year)
+        if data is not None:
+            cache.set(key, data, getattr(settings, 'WATER_INDICATOR_CACHE_TIMEOUT', 900))
+    return data
+
+
+def _bump_generation():
+    cache.set(GENERATION_KEY, time.time_ns(), timeout=None)
+
+
+def invalidate():
+    """
+    Retire every cached bundle when the current transaction commits.
+
+    Bumping earlier would let another request rebuild the bundle from the
+    pre-commit rows under the new stamp, and keep it until the timeout.
+    """
+    transaction.on_commit(_bump_generation)
+
+
+def _scenario_key(token, location, year):
+    return f"{SCENARIO_PREFIX}:{quote(str(token))}:{quote(str(location))}:{year}"
+
+
+def open_scenario(location, year, data):
+    """
+    Store the bundle a page is rendered from under a new random token and
+    return the token. The session does not depend on which worker serves
+    the page or the recalculations, nor on the bundle generation.
+    """
+    token = secrets.token_urlsafe(16)
+    cache.set(_scenario_key(token, location, year), data, getattr(settings, 'WATER_SCENARIO_TIMEOUT', 3600))
+    return token
+
+
+def get_scenario(location, year, token):
+    """
+    Bundle stored by open_scenario for (location, year, token), or None for
+    a missing, expired or foreign token.
+    """
+    if not token:
+        return None
+    return cache.get(_scenario_key(token, location, year))
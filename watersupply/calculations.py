@@ -1,13 +1,14 @@
+from django.db import connection
 from django.db.models import Sum, Avg, F, FloatField, ExpressionWrapper
 from django.contrib.gis.db import models as gis_models
 
 from .models import (
     ConsumptionCapita, TotalWaterDemand, ExtractionWater, ImportedWater,
-    AvailableFreshWater, PipeNetwork, CoverageWaterSupply, NonRevenueWater,
+    AvailableFreshWater, PipeNetwork, CoverageWaterSupply,
     WaterTreatment, MeteredResidential, UsersLocation, OPEX,
-    TotalWaterProduction,
+    TotalWaterProduction, AreaAffectedDrought, NonRevenueWaterYear,
 )
-from common.models import City, Province, Neighborhood
+from common.models import City, District, Province, Neighborhood
 
 
 # ── Consumption & Demand ─────────────────────────────────────────────
@@ -82,7 +83,10 @@ def calculate_supply_security(province):
         .aggregate(total=Sum('demandDay'))['total'] or 0
     )
     production = calculate_total_production_day(province)
+    return _supply_security_result(demand, production)
 
+
+def _supply_security_result(demand, production):
     if demand and production:
         supply_security = production / demand
     else:
@@ -148,13 +152,7 @@ def calculate_water_quality(year):
     """
     wt = WaterTreatment.objects.filter(year=year)
     if not wt.exists():
-        return {
-            'samples_taken': 0,
-            'samples_ok': 0,
-            'compliance_pct': None,
-            'treatment_efficiency': None,
-            'acceptance_rate': None,
-        }
+        return _water_quality_result(None)
 
     agg = wt.aggregate(
         samples_taken=Sum('samplesWaterQualityTaken'),
@@ -162,6 +160,18 @@ def calculate_water_quality(year):
         avg_efficiency=Avg('treatment_efficiency'),
         avg_acceptance=Avg('acceptanceRate'),
     )
+    return _water_quality_result(agg)
+
+
+def _water_quality_result(agg):
+    if agg is None:
+        return {
+            'samples_taken': 0,
+            'samples_ok': 0,
+            'compliance_pct': None,
+            'treatment_efficiency': None,
+            'acceptance_rate': None,
+        }
 
     taken = agg['samples_taken'] or 0
     ok = agg['samples_ok'] or 0
@@ -194,6 +204,10 @@ def calculate_collection_ratio(province):
         installed=Sum('installed_meters'),
         collected=Sum('collected_meters'),
     )
+    return _collection_ratio_result(agg)
+
+
+def _collection_ratio_result(agg):
     installed = agg['installed'] or 0
     collected = agg['collected'] or 0
 
@@ -220,7 +234,10 @@ def calculate_opex_recovery(year, province):
     # Get total OPEX for the year
     opex_record = OPEX.objects.filter(year=year).first()
     total_opex = opex_record.totalOPEX_EUR if opex_record else None
+    return _opex_recovery_result(revenue, total_opex)
+
 
+def _opex_recovery_result(revenue, total_opex):
     if total_opex and total_opex > 0:
         return {
             'revenue_EUR': round(revenue, 2),
@@ -247,6 +264,18 @@ def calculate_coverage(province):
     coverage_records = CoverageWaterSupply.objects.filter(city__in=cities)
 
     if not coverage_records.exists():
+        return _coverage_result(None)
+
+    agg = coverage_records.aggregate(
+        area=Sum('coveredArea_km2'),
+        covered=Sum('households_covered'),
+        total=Sum('households_total'),
+    )
+    return _coverage_result(agg)
+
+
+def _coverage_result(agg):
+    if agg is None:
         return {
             'covered_area_km2': 0,
             'households_covered': 0,
@@ -254,11 +283,6 @@ def calculate_coverage(province):
             'coverage_pct': None,
         }
 
-    agg = coverage_records.aggregate(
-        area=Sum('coveredArea_km2'),
-        covered=Sum('households_covered'),
-        total=Sum('households_total'),
-    )
     total = agg['total'] or 0
     covered = agg['covered'] or 0
 
@@ -278,28 +302,19 @@ def calculate_nrw(year):
     DAG edges:  Real_Losses     → NRW, ILI
                 Apparent_Losses → NRW, ILI
     """
-    nrw_qs = NonRevenueWater.objects.filter(year=year)
-
-    apparent = (
-        nrw_qs.filter(type='A')
-        .aggregate(total=Sum('loss_Quantity_m3'))['total'] or 0
-    )
-    real = (
-        nrw_qs.filter(type='R')
-        .aggregate(total=Sum('loss_Quantity_m3'))['total'] or 0
-    )
+    # Running totals maintained on every save / bulk load
+    totals = NonRevenueWaterYear.objects.filter(year=year).first()
+    if totals is None:
+        return _nrw_result(0, 0, None)
+    return _nrw_result(totals.apparent_m3_d, totals.carl_m3_d, totals.ILI)
 
-    latest_ili = (
-        nrw_qs.filter(type='R', ILI__isnull=False)
-        .order_by('-last_updated')
-        .first()
-    )
 
+def _nrw_result(apparent, real, ili):
     return {
         'apparent_losses_m3_d': apparent,
         'real_losses_m3_d': real,
         'total_nrw_m3_d': apparent + real,
-        'ili': latest_ili.ILI if latest_ili else None,
+        'ili': ili,
     }
 
 
@@ -325,19 +340,219 @@ def calculate_drought_area(province, year):
 
     DAG edge:  Total_Extraction → Area_Drought
     """
-    from .models import AreaAffectedDrought
-
     records = AreaAffectedDrought.objects.filter(
         Province=province, year=year,
     )
     if not records.exists():
-        return {'total_area_km2': 0, 'max_sensibility': 0}
+        return _drought_result(None)
 
     agg = records.aggregate(
         area=Sum('areaAffected_km2'),
         max_level=gis_models.Max('SensibilityLevel'),
     )
+    return _drought_result(agg)
+
+
+def _drought_result(agg):
+    if agg is None:
+        return {'total_area_km2': 0, 'max_sensibility': 0}
+
     return {
         'total_area_km2': round(agg['area'] or 0, 2),
         'max_sensibility': agg['max_level'] or 0,
     }
+
+
+# ── Consolidated province / year aggregates ──────────────────────────
+
+def _table(model):
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+def _col(model, field):
+    return connection.ops.quote_name(model._meta.get_field(field).column)
+
+
+def _province_aggregates_sql():
+    """
+    One statement with a single-row CTE per source table; filters that
+    differ per indicator (active wells, year, province geometry) are
+    conditional aggregates over the same scan.
+    """
+    W, T, M = ExtractionWater, WaterTreatment, MeteredResidential
+    C, Y, D = CoverageWaterSupply, NonRevenueWaterYear, AreaAffectedDrought
+    active_in_province = f"w.{_col(W, 'is_active')} AND ST_Intersects(w.{_col(W, 'geom')}, prov.geom)"
+    in_year = f"{_col(T, 'year')} = %(year)s"
+
+    return f"""
+        WITH prov AS (
+            SELECT {_col(Province, 'geom')} AS geom FROM {_table(Province)}
+            WHERE {_col(Province, 'id')} = %(province)s
+        ),
+        cities AS (
+            SELECT {_col(City, 'id')} AS id FROM {_table(City)}
+            WHERE {_col(City, 'province')} = %(province)s
+        ),
+        user_locs AS (
+            SELECT ul.{_col(UsersLocation, 'id')} AS id
+            FROM {_table(UsersLocation)} ul
+            JOIN {_table(Neighborhood)} n ON n.{_col(Neighborhood, 'id')} = ul.{_col(UsersLocation, 'neighborhood')}
+            JOIN {_table(District)} d ON d.{_col(District, 'id')} = n.{_col(Neighborhood, 'district')}
+            JOIN cities c ON c.id = d.{_col(District, 'city')}
+        ),
+        wells AS (
+            SELECT
+                sum(w.{_col(W, 'pumpflow_m3_s')}) FILTER (WHERE {active_in_province}) AS flow_m3_s,
+                sum(w.{_col(W, 'pumpEnergyRate_kWh_h')} * w.{_col(W, 'OperationTime_h_day')})
+                    FILTER (WHERE {active_in_province}) AS pump_kwh_day,
+                sum(w.{_col(W, 'pumpEmission_day_kg_CO2')}) FILTER (WHERE {active_in_province}) AS co2_kg_day,
+                avg(w.{_col(W, 'opex_EUR_m3')})
+                    FILTER (WHERE w.{_col(W, 'is_active')} AND w.{_col(W, 'opex_EUR_m3')} IS NOT NULL) AS avg_opex_m3
+            FROM {_table(W)} w, prov
+        ),
+        imported AS (
+            SELECT sum({_col(ImportedWater, 'quantity_m3_d')})
+                FILTER (WHERE {_col(ImportedWater, 'is_active')}) AS m3_d
+            FROM {_table(ImportedWater)}
+        ),
+        demand AS (
+            SELECT sum({_col(TotalWaterDemand, 'demandDay')}) AS m3_d
+            FROM {_table(TotalWaterDemand)}
+            WHERE {_col(TotalWaterDemand, 'city')} IN (SELECT id FROM cities)
+        ),
+        consumption AS (
+            SELECT avg({_col(ConsumptionCapita, 'consumption_capita_L_d')}) AS l_d
+            FROM {_table(ConsumptionCapita)}
+            WHERE {_col(ConsumptionCapita, 'year')} = %(year)s
+              AND {_col(ConsumptionCapita, 'city')} IN (SELECT id FROM cities)
+        ),
+        treatment AS (
+            SELECT
+                sum({_col(T, 'EnergyConsumption_MW_day')}) AS energy_mw_day,
+                count(*) FILTER (WHERE {in_year}) AS records,
+                sum({_col(T, 'samplesWaterQualityTaken')}) FILTER (WHERE {in_year}) AS samples_taken,
+                sum({_col(T, 'samplesWaterQuality_OK')}) FILTER (WHERE {in_year}) AS samples_ok,
+                avg({_col(T, 'treatment_efficiency')}) FILTER (WHERE {in_year}) AS avg_efficiency,
+                avg({_col(T, 'acceptanceRate')}) FILTER (WHERE {in_year}) AS avg_acceptance
+            FROM {_table(T)}
+        ),
+        meters AS (
+            SELECT
+                sum({_col(M, 'installed_meters')}) AS installed,
+                sum({_col(M, 'collected_meters')}) AS collected,
+                sum({_col(M, 'Recovery_EUR')}) AS revenue
+            FROM {_table(M)}
+            WHERE {_col(M, 'userLocation')} IN (SELECT id FROM user_locs)
+        ),
+        coverage AS (
+            SELECT
+                count(*) AS records,
+                sum({_col(C, 'coveredArea_km2')}) AS area,
+                sum({_col(C, 'households_covered')}) AS covered,
+                sum({_col(C, 'households_total')}) AS total
+            FROM {_table(C)}
+            WHERE {_col(C, 'city')} IN (SELECT id FROM cities)
+        ),
+        nrw AS (
+            SELECT
+                max({_col(Y, 'apparent_m3_d')}) AS apparent_losses,
+                max({_col(Y, 'carl_m3_d')}) AS real_losses,
+                max({_col(Y, 'ILI')}) AS ili
+            FROM {_table(Y)}
+            WHERE {_col(Y, 'year')} = %(year)s
+        ),
+        freshwater AS (
+            SELECT sum(a.{_col(AvailableFreshWater, 'totalQuantity_Mm3')}) AS mm3
+            FROM {_table(AvailableFreshWater)} a, prov
+            WHERE ST_Intersects(a.{_col(AvailableFreshWater, 'geom')}, prov.geom)
+        ),
+        drought AS (
+            SELECT
+                count(*) AS records,
+                sum({_col(D, 'areaAffected_km2')}) AS area,
+                max({_col(D, 'SensibilityLevel')}) AS max_level
+            FROM {_table(D)}
+            WHERE {_col(D, 'Province')} = %(province)s AND {_col(D, 'year')} = %(year)s
+        ),
+        network AS (
+            SELECT sum(ST_Length(ST_Intersection(p.{_col(PipeNetwork, 'geom')}, prov.geom))) AS length_m
+            FROM {_table(PipeNetwork)} p, prov
+            WHERE ST_Intersects(p.{_col(PipeNetwork, 'geom')}, prov.geom)
+        )
+        SELECT
+            wells.flow_m3_s, wells.pump_kwh_day, wells.co2_kg_day, wells.avg_opex_m3,
+            imported.m3_d, demand.m3_d, consumption.l_d,
+            treatment.energy_mw_day, treatment.records, treatment.samples_taken,
+            treatment.samples_ok, treatment.avg_efficiency, treatment.avg_acceptance,
+            meters.installed, meters.collected, meters.revenue,
+            (
+                SELECT {_col(OPEX, 'totalOPEX_EUR')} FROM {_table(OPEX)}
+                WHERE {_col(OPEX, 'year')} = %(year)s ORDER BY {_col(OPEX, 'id')} LIMIT 1
+            ),
+            coverage.records, coverage.area, coverage.covered, coverage.total,
+            nrw.apparent_losses, nrw.real_losses, nrw.ili,
+            freshwater.mm3,
+            drought.records, drought.area, drought.max_level,
+            network.length_m
+        FROM wells, imported, demand, consumption, treatment, meters, coverage, nrw,
+             freshwater, drought, network
+    """
+
+
+def calculate_province_aggregates(province, year):
+    """All water supply aggregates of a province and year in one query.
+
+    Returns the values of the individual calculate_* functions, in their
+    own shapes: consumption_capita, extraction_m3_d, imported_m3_d,
+    supply_security (demand, production, ratio), avg_opex_m3,
+    energy_kwh_day, co2_kg_day, water_quality, collection_ratio,
+    opex_recovery, coverage, nrw, available_freshwater, drought and
+    network_length_m.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(_province_aggregates_sql(), {'province': province.pk, 'year': year})
+        (flow_m3_s, pump_kwh_day, co2_kg_day, avg_opex_m3,
+         imported_m3_d, demand_m3_d, consumption_l_d,
+         wt_energy_mw_day, wt_records, samples_taken, samples_ok, avg_efficiency, avg_acceptance,
+         installed, collected, revenue, total_opex,
+         coverage_records, covered_area, households_covered, households_total,
+         apparent, real, ili,
+         freshwater_mm3,
+         drought_records, drought_area, drought_max_level,
+         network_length_m) = cursor.fetchone()
+
+    extraction_m3_d = (flow_m3_s or 0) * 86400
+    imported_m3_d = imported_m3_d or 0
+
+    return {
+        'consumption_capita':   consumption_l_d or 0,
+        'extraction_m3_d':      extraction_m3_d,
+        'imported_m3_d':        imported_m3_d,
+        'supply_security':      _supply_security_result(demand_m3_d or 0, extraction_m3_d + imported_m3_d),
+        'avg_opex_m3':          avg_opex_m3 or 0,
+        'energy_kwh_day':       (pump_kwh_day or 0) + (wt_energy_mw_day or 0) * 1000,
+        'co2_kg_day':           co2_kg_day or 0,
+        'water_quality':        _water_quality_result(
+            {
+                'samples_taken': samples_taken,
+                'samples_ok': samples_ok,
+                'avg_efficiency': avg_efficiency,
+                'avg_acceptance': avg_acceptance,
+            } if wt_records else None
+        ),
+        'collection_ratio':     _collection_ratio_result({'installed': installed, 'collected': collected}),
+        'opex_recovery':        _opex_recovery_result(revenue or 0, total_opex),
+        'coverage':             _coverage_result(
+            {
+                'area': covered_area,
+                'covered': households_covered,
+                'total': households_total,
+            } if coverage_records else None
+        ),
+        'nrw':                  _nrw_result(apparent or 0, real or 0, ili),
+        'available_freshwater': freshwater_mm3 or 0,
+        'drought':              _drought_result(
+            {'area': drought_area, 'max_level': drought_max_level} if drought_records else None
+        ),
+        'network_length_m':     network_length_m or 0,
+    }
@@ -0,0 +1,352 @@
+"""
+Incremental water supply coverage.
+
+Two cache tables make coverage a lookup instead of a union / buffer of the
+whole network:
+
+- PipeBuffer: the buffer polygon of every pipe at every coverage distance
+  in use (the buffer_m values of CoverageWaterSupply rows).
+- NeighborhoodCoverage: households per neighbourhood and whether a buffer
+  of one of its city's pipes at that distance reaches it.
+
+When one PipeNetwork row changes, only its buffers are recomputed; the
+neighbourhoods and CoverageWaterSupply rows touched by the old or new
+buffer are updated from the caches (see watersupply.signals). A city's
+pipes are the pipes intersecting the city.
+"""
+from django.contrib.gis.geos import GEOSGeometry, MultiPolygon
+from django.db import connection
+
+from common.models import City, District, Neighborhood
+from .calculations import _table, _col
+from .models import (
+    PipeNetwork, PipeBuffer, NeighborhoodCoverage, CoverageWaterSupply, UsersLocation,
+)
+
+
+DEFAULT_BUFFER_M = CoverageWaterSupply._meta.get_field('buffer_m').default
+
+
+def coverage_buffers():
+    """Buffer distances to maintain: every distance in use plus the default."""
+    return sorted(
+        set(CoverageWaterSupply.objects.values_list('buffer_m', flat=True).distinct())
+        | {DEFAULT_BUFFER_M}
+    )
+
+
+def _ewkb(geom):
+    return None if geom is None else bytes(geom.ewkb)
+
+
+def _geos(value):
+    return None if value is None else GEOSGeometry(bytes(value))
+
+
+# ── pipe buffers ─────────────────────────────────────────────────────
+
+def refresh_pipe_buffers(buffer_m, pipe_ids=None, missing_only=False):
+    """
+    (Re)compute PipeBuffer rows at one distance for the given pipes (all
+    pipes by default). With missing_only, existing buffers are kept.
+
+    Returns:
+        Ids of the pipes whose buffer was written.
+    """
+    pb, p = PipeBuffer, PipeNetwork
+    where = f"WHERE p.{_col(p, 'id')} = ANY(%(pipes)s)" if pipe_ids is not None else ""
+    conflict = (
+        "DO NOTHING" if missing_only else
+        f"DO UPDATE SET {_col(pb, 'geom')} = EXCLUDED.{_col(pb, 'geom')}, "
+        f"{_col(pb, 'last_updated')} = EXCLUDED.{_col(pb, 'last_updated')}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {_table(pb)} ({_col(pb, 'pipe')}, {_col(pb, 'buffer_m')}, {_col(pb, 'geom')}, {_col(pb, 'last_updated')})
+            SELECT p.{_col(p, 'id')}, %(buffer)s, ST_Multi(ST_Buffer(p.{_col(p, 'geom')}, %(buffer)s)), now()
+            FROM {_table(p)} p
+            {where}
+            ON CONFLICT ({_col(pb, 'pipe')}, {_col(pb, 'buffer_m')}) {conflict}
+            RETURNING {_col(pb, 'pipe')}
+            """,
+            {'buffer': buffer_m, 'pipes': list(pipe_ids or [])},
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def pipe_buffer_geoms(pipe_id):
+    """{buffer_m: buffer polygon} currently cached for one pipe."""
+    return {
+        buffer_m: geom
+        for buffer_m, geom in PipeBuffer.objects.filter(pipe_id=pipe_id).values_list('buffer_m', 'geom')
+    }
+
+
+# ── neighbourhood coverage ───────────────────────────────────────────
+
+def refresh_neighborhood_coverage(buffer_m, region=None, neighborhood_ids=None, pipe_ids=None,
+                                  missing_only=False):
+    """
+    Recompute NeighborhoodCoverage at one distance for the neighbourhoods
+    intersecting `region`, listed in `neighborhood_ids` and/or under the
+    buffers of `pipe_ids` (all by default). Only pipes intersecting the
+    neighbourhood's city count towards `covered`.
+    """
+    nc, n, ul, pb = NeighborhoodCoverage, Neighborhood, UsersLocation, PipeBuffer
+    p, d, c = PipeNetwork, District, City
+    filters = []
+    if region is not None:
+        filters.append(f"ST_Intersects(n.{_col(n, 'geom')}, ST_GeomFromEWKB(%(region)s))")
+    if neighborhood_ids is not None:
+        filters.append(f"n.{_col(n, 'id')} = ANY(%(neighborhoods)s)")
+    if pipe_ids is not None:
+        filters.append(f"""EXISTS (
+            SELECT 1 FROM {_table(pb)} pb
+            WHERE pb.{_col(pb, 'buffer_m')} = %(buffer)s
+              AND pb.{_col(pb, 'pipe')} = ANY(%(pipes)s)
+              AND ST_Intersects(pb.{_col(pb, 'geom')}, n.{_col(n, 'geom')})
+        )""")
+    where = f"WHERE {' OR '.join(filters)}" if filters else ""
+    conflict = (
+        "DO NOTHING" if missing_only else
+        f"DO UPDATE SET {_col(nc, 'households')} = EXCLUDED.{_col(nc, 'households')}, "
+        f"{_col(nc, 'covered')} = EXCLUDED.{_col(nc, 'covered')}, "
+        f"{_col(nc, 'last_updated')} = EXCLUDED.{_col(nc, 'last_updated')}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {_table(nc)} ({_col(nc, 'neighborhood')}, {_col(nc, 'buffer_m')},
+                                      {_col(nc, 'households')}, {_col(nc, 'covered')}, {_col(nc, 'last_updated')})
+            SELECT
+                n.{_col(n, 'id')},
+                %(buffer)s,
+                COALESCE((
+                    SELECT sum(ul.{_col(ul, 'usersTotal')}) FROM {_table(ul)} ul
+                    WHERE ul.{_col(ul, 'neighborhood')} = n.{_col(n, 'id')}
+                ), 0),
+                EXISTS (
+                    SELECT 1 FROM {_table(pb)} pb
+                    JOIN {_table(p)} p ON p.{_col(p, 'id')} = pb.{_col(pb, 'pipe')}
+                    JOIN {_table(d)} d ON d.{_col(d, 'id')} = n.{_col(n, 'district')}
+                    JOIN {_table(c)} c ON c.{_col(c, 'id')} = d.{_col(d, 'city')}
+                    WHERE pb.{_col(pb, 'buffer_m')} = %(buffer)s
+                      AND ST_Intersects(pb.{_col(pb, 'geom')}, n.{_col(n, 'geom')})
+                      AND ST_Intersects(p.{_col(p, 'geom')}, c.{_col(c, 'geom')})
+                ),
+                now()
+            FROM {_table(n)} n
+            {where}
+            ON CONFLICT ({_col(nc, 'neighborhood')}, {_col(nc, 'buffer_m')}) {conflict}
+            """,
+            {
+                'buffer': buffer_m, 'region': _ewkb(region),
+                'neighborhoods': list(neighborhood_ids or []), 'pipes': list(pipe_ids or []),
+            },
+        )
+
+
+def _household_counts_sql(city_filter):
+    nc, n, d = NeighborhoodCoverage, Neighborhood, District
+    return f"""
+        SELECT
+            d.{_col(d, 'city')} AS city_id,
+            COALESCE(sum(nc.{_col(nc, 'households')}) FILTER (WHERE nc.{_col(nc, 'covered')}), 0) AS covered,
+            COALESCE(sum(nc.{_col(nc, 'households')}), 0) AS total
+        FROM {_table(nc)} nc
+        JOIN {_table(n)} n ON n.{_col(n, 'id')} = nc.{_col(nc, 'neighborhood')}
+        JOIN {_table(d)} d ON d.{_col(d, 'id')} = n.{_col(n, 'district')}
+        WHERE nc.{_col(nc, 'buffer_m')} = %(buffer)s AND {city_filter}
+        GROUP BY d.{_col(d, 'city')}
+    """
+
+
+# ── city lookup ──────────────────────────────────────────────────────
+
+def city_coverage(city, buffer_m=DEFAULT_BUFFER_M):
+    """
+    Coverage polygon and household counts of a city at one distance.
+
+    Missing pipe buffers and neighbourhood rows are filled in first; once
+    cached this is a union of stored polygons and a sum. Neighbourhoods
+    under a newly stored buffer are re-flagged, since their rows may
+    predate it.
+
+    Returns:
+        (MultiPolygon or None, households_covered, households_total)
+    """
+    pb, p, c = PipeBuffer, PipeNetwork, City
+    new_pipes = refresh_pipe_buffers(
+        buffer_m,
+        PipeNetwork.objects.filter(geom__intersects=city.geom).values_list('id', flat=True),
+        missing_only=True,
+    )
+    if new_pipes:
+        refresh_neighborhood_coverage(buffer_m, pipe_ids=new_pipes)
+    refresh_neighborhood_coverage(
+        buffer_m,
+        neighborhood_ids=Neighborhood.objects.filter(district__city=city).values_list('id', flat=True),
+        missing_only=True,
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT ST_AsEWKB(ST_Multi(ST_Union(pb.{_col(pb, 'geom')})))
+            FROM {_table(pb)} pb
+            JOIN {_table(p)} p ON p.{_col(p, 'id')} = pb.{_col(pb, 'pipe')}
+            JOIN {_table(c)} c ON c.{_col(c, 'id')} = %(city)s
+            WHERE pb.{_col(pb, 'buffer_m')} = %(buffer)s
+              AND ST_Intersects(p.{_col(p, 'geom')}, c.{_col(c, 'geom')})
+            """,
+            {'city': city.pk, 'buffer': buffer_m},
+        )
+        geom = _geos(cursor.fetchone()[0])
+        cursor.execute(
+            _household_counts_sql(f"d.{_col(District, 'city')} = %(city)s"),
+            {'city': city.pk, 'buffer': buffer_m},
+        )
+        row = cursor.fetchone()
+
+    if geom is not None and not isinstance(geom, MultiPolygon):
+        geom = MultiPolygon(geom)
+    covered, total = (row[1], row[2]) if row else (0, 0)
+    return geom, covered, total
+
+
+# ── incremental update ───────────────────────────────────────────────
+
+def _update_city_records(buffer_m, pipe_id, old, new, region):
+    """
+    Patch the polygon and counts of CoverageWaterSupply rows at this
+    distance whose city intersects `region`: the old buffer is cut out and
+    the other city pipes' buffers overlapping it, plus the new buffer, are
+    unioned back in.
+    """
+    cws, pb, p, c = CoverageWaterSupply, PipeBuffer, PipeNetwork, City
+    params = {
+        'buffer': buffer_m, 'pipe': pipe_id,
+        'old': _ewkb(old), 'new': _ewkb(new), 'region': _ewkb(region),
+    }
+    affected = f"""
+        r.{_col(cws, 'buffer_m')} = %(buffer)s
+        AND r.{_col(cws, 'city')} IN (
+            SELECT c.{_col(c, 'id')} FROM {_table(c)} c
+            WHERE ST_Intersects(c.{_col(c, 'geom')}, ST_GeomFromEWKB(%(region)s))
+        )
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE {_table(cws)} r SET {_col(cws, 'geom')} = (
+                SELECT ST_Multi(ST_CollectionExtract(ST_Union(part), 3))
+                FROM (
+                    SELECT CASE WHEN %(old)s::bytea IS NULL THEN r.{_col(cws, 'geom')}
+                                ELSE ST_Difference(r.{_col(cws, 'geom')}, ST_GeomFromEWKB(%(old)s)) END
+                    UNION ALL
+                    SELECT pb.{_col(pb, 'geom')}
+                    FROM {_table(pb)} pb
+                    JOIN {_table(p)} p ON p.{_col(p, 'id')} = pb.{_col(pb, 'pipe')}
+                    WHERE %(old)s::bytea IS NOT NULL
+                      AND pb.{_col(pb, 'buffer_m')} = %(buffer)s
+                      AND pb.{_col(pb, 'pipe')} <> %(pipe)s
+                      AND ST_Intersects(pb.{_col(pb, 'geom')}, ST_GeomFromEWKB(%(old)s))
+                      AND ST_Intersects(p.{_col(p, 'geom')}, c.{_col(c, 'geom')})
+                    UNION ALL
+                    SELECT ST_GeomFromEWKB(%(new)s)
+                    FROM {_table(p)} p
+                    WHERE %(new)s::bytea IS NOT NULL
+                      AND p.{_col(p, 'id')} = %(pipe)s
+                      AND ST_Intersects(p.{_col(p, 'geom')}, c.{_col(c, 'geom')})
+                ) AS parts(part)
+            )
+            FROM {_table(c)} c
+            WHERE c.{_col(c, 'id')} = r.{_col(cws, 'city')} AND {affected}
+            """,
+            params,
+        )
+        _update_city_counts(cursor, affected, params)
+
+
+def _update_city_counts(cursor, affected, params):
+    """Recount the CoverageWaterSupply rows matching `affected` (alias r)."""
+    cws = CoverageWaterSupply
+    # Only the touched cities' neighbourhoods are aggregated
+    touched = (
+        f"d.{_col(District, 'city')} IN "
+        f"(SELECT r.{_col(cws, 'city')} FROM {_table(cws)} r WHERE {affected})"
+    )
+    cursor.execute(
+        f"""
+        UPDATE {_table(cws)} r SET
+            {_col(cws, 'coveredArea_km2')} = COALESCE(round((ST_Area(r.{_col(cws, 'geom')}) / 1e6)::numeric, 4), 0),
+            {_col(cws, 'households_covered')} = COALESCE(s.covered, 0),
+            {_col(cws, 'households_total')} = COALESCE(s.total, 0),
+            {_col(cws, 'coveragePCT')} = CASE WHEN s.total > 0
+                THEN round((s.covered * 100.0 / s.total)::numeric, 1) ELSE 0 END,
+            {_col(cws, 'last_updated')} = now()
+        FROM {_table(cws)} own
+        LEFT JOIN ({_household_counts_sql(touched)}) s ON s.city_id = own.{_col(cws, 'city')}
+        WHERE own.{_col(cws, 'id')} = r.{_col(cws, 'id')} AND {affected}
+        """,
+        params,
+    )
+
+
+def pipe_changed(pipe_id, old_buffers):
+    """
+    Bring the caches up to date after one pipe was saved or deleted.
+
+    old_buffers is {buffer_m: polygon} as cached before the change (see
+    pipe_buffer_geoms); a deleted pipe simply has no new buffer.
+    """
+    exists = PipeNetwork.objects.filter(pk=pipe_id).exists()
+    for buffer_m in coverage_buffers():
+        if exists:
+            refresh_pipe_buffers(buffer_m, [pipe_id])
+        new = PipeBuffer.objects.filter(pipe_id=pipe_id, buffer_m=buffer_m).values_list('geom', flat=True).first()
+        old = old_buffers.get(buffer_m)
+        if old is None and new is None:
+            continue
+        region = old.union(new) if old is not None and new is not None else (old or new)
+
+        refresh_neighborhood_coverage(buffer_m, region=region)
+        _update_city_records(buffer_m, pipe_id, old, new, region)
+
+
+def neighborhoods_changed(neighborhood_ids, city_ids=()):
+    """
+    Refresh households / covered flags of some neighbourhoods and the
+    records of their cities, plus those of `city_ids` (cities that lost a
+    neighbourhood, moved or deleted).
+    """
+    neighborhood_ids = list(neighborhood_ids)
+    cities = list(
+        set(city_ids)
+        | set(
+            Neighborhood.objects.filter(id__in=neighborhood_ids, district__isnull=False)
+            .values_list('district__city_id', flat=True)
+        )
+    )
+    cws = CoverageWaterSupply
+    for buffer_m in coverage_buffers():
+        refresh_neighborhood_coverage(buffer_m, neighborhood_ids=neighborhood_ids)
+        with connection.cursor() as cursor:
+            _update_city_counts(
+                cursor,
+                f"r.{_col(cws, 'buffer_m')} = %(buffer)s AND r.{_col(cws, 'city')} = ANY(%(cities)s)",
+                {'buffer': buffer_m, 'cities': cities},
+            )
+
+
+def rebuild_coverage(log=print):
+    """Full rebuild of both caches and every CoverageWaterSupply record."""
+    for buffer_m in coverage_buffers():
+        refresh_pipe_buffers(buffer_m)
+        refresh_neighborhood_coverage(buffer_m)
+        log(f"  ✓ buffers and neighbourhood coverage at {buffer_m:g} m")
+
+    for record in CoverageWaterSupply.objects.select_related('city'):
+        record.save()
+    log(f"  ✓ {CoverageWaterSupply.objects.count()} coverage records updated")
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from watersupply.assignment import assign_well_sources, unassigned_wells
+
+
+class Command(BaseCommand):
+    help = 'Assign every ExtractionWater to the AvailableFreshWater containing it in one statement (run after bulk loads)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--wells', type=int, nargs='+', help='Only these ExtractionWater ids')
+
+    def handle(self, *args, **options):
+        well_ids = options['wells']
+        with transaction.atomic():
+            updated = assign_well_sources(well_ids)
+        self.stdout.write(f"  ✓ {updated} wells reassigned")
+
+        missing = unassigned_wells(well_ids)
+        if missing:
+            shown = ', '.join(map(str, missing[:20])) + (' …' if len(missing) > 20 else '')
+            self.stdout.write(self.style.WARNING(
+                f"  ⚠️ {len(missing)} wells lie outside every source: {shown}"
+            ))
+        self.stdout.write(self.style.SUCCESS("\nDone!"))
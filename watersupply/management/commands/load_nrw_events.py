@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from watersupply.nrw import read_loss_events, prepare_loss_events, load_loss_events
+
+
+class Command(BaseCommand):
+    help = 'Bulk-load NonRevenueWater loss events from CSV or Parquet files via PostgreSQL COPY'
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help='CSV or Parquet files')
+        parser.add_argument('--chunksize', type=int, default=100_000, help='CSV rows per COPY batch')
+
+    def handle(self, *args, **options):
+        total_inserted = total_rejected = 0
+        started = time.perf_counter()
+
+        for path in options['paths']:
+            self.stdout.write(f"\nLoading {path}...")
+            try:
+                for chunk in read_loss_events(path, chunksize=options['chunksize']):
+                    clean, rejected = prepare_loss_events(chunk)
+                    with transaction.atomic():
+                        inserted = load_loss_events(clean)
+                    total_inserted += inserted
+                    total_rejected += len(rejected)
+                    for reason, count in rejected['reason'].value_counts().items() if len(rejected) else []:
+                        self.stderr.write(f"  - {count} rows rejected: {reason}")
+                    self.stdout.write(f"  ✓ {inserted} events")
+            except (OSError, ValueError, ImportError) as e:
+                raise CommandError(f"{path}: {e}")
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"\nDone! {total_inserted} events inserted, {total_rejected} rejected in {elapsed:.1f} s"
+        ))
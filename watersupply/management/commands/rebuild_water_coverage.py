@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from watersupply.coverage import rebuild_coverage
+
+
+class Command(BaseCommand):
+    help = 'Rebuild cached pipe buffers and neighbourhood coverage, then every CoverageWaterSupply record'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rebuild_coverage(log=self.stdout.write)
+        self.stdout.write(self.style.SUCCESS("\nDone!"))
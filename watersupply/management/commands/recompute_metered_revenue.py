@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from common.models import City
+from watersupply.metering import recompute_metered_residential
+
+
+class Command(BaseCommand):
+    help = 'Recompute consumption_m3_yr and Recovery_EUR of every MeteredResidential in one statement'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--city', type=int, help='Only the meters of this City id')
+
+    def handle(self, *args, **options):
+        city = options['city']
+        if city is not None and not City.objects.filter(pk=city).exists():
+            raise CommandError(f"City {city} does not exist")
+
+        with transaction.atomic():
+            updated = recompute_metered_residential(city=city)
+        self.stdout.write(self.style.SUCCESS(f"\nDone! {updated} meters updated"))
@@ -0,0 +1,73 @@
+"""
+Set-based recompute of MeteredResidential billed consumption and revenue.
+
+MeteredResidential.save derives consumption_m3_yr and Recovery_EUR from
+the latest ConsumptionCapita of the meter's city, several queries per
+row. recompute_metered_residential applies the same formula to every
+meter (or one city's meters) in a single UPDATE:
+
+    consumption_m3_yr = L/person/day / 1000 * 365 * populationServed * collected / installed
+    Recovery_EUR      = consumption_m3_yr * userTariff_EUR_m3
+
+A meter's city is that of its location's neighbourhood's district. As in
+save(), meters whose city has no ConsumptionCapita or whose location has
+no population served (or no district) are left untouched.
+"""
+from django.db import connection
+
+from common.models import District, Neighborhood
+from .calculations import _table, _col
+from .models import ConsumptionCapita, MeteredResidential, UsersLocation
+from . import cache as bundle_cache
+
+
+def recompute_metered_residential(city=None):
+    """
+    Recompute consumption_m3_yr and Recovery_EUR of all meters, or of the
+    meters of one city (City or id).
+
+    Returns:
+        Number of meters updated.
+    """
+    M, U, N, D, C = MeteredResidential, UsersLocation, Neighborhood, District, ConsumptionCapita
+    city_filter, params = '', {}
+    if city is not None:
+        city_filter = f"AND d.{_col(D, 'city')} = %(city)s"
+        params = {'city': getattr(city, 'pk', city)}
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            WITH latest AS (
+                SELECT DISTINCT ON ({_col(C, 'city')})
+                    {_col(C, 'city')} AS city_id, {_col(C, 'consumption_capita_L_d')} AS l_d
+                FROM {_table(C)}
+                ORDER BY {_col(C, 'city')}, {_col(C, 'year')} DESC, {_col(C, 'id')} DESC
+            ),
+            billed AS (
+                SELECT
+                    m.{_col(M, 'id')} AS id,
+                    c.l_d / 1000 * 365 * u.{_col(U, 'populationServed')}
+                        * CASE WHEN m.{_col(M, 'installed_meters')} <> 0
+                               THEN m.{_col(M, 'collected_meters')}::float8 / m.{_col(M, 'installed_meters')}
+                               ELSE 0 END AS m3_yr
+                FROM {_table(M)} m
+                JOIN {_table(U)} u ON u.{_col(U, 'id')} = m.{_col(M, 'userLocation')}
+                JOIN {_table(N)} n ON n.{_col(N, 'id')} = u.{_col(U, 'neighborhood')}
+                JOIN {_table(D)} d ON d.{_col(D, 'id')} = n.{_col(N, 'district')}
+                JOIN latest c ON c.city_id = d.{_col(D, 'city')}
+                WHERE u.{_col(U, 'populationServed')} <> 0
+                  {city_filter}
+            )
+            UPDATE {_table(M)} m SET
+                {_col(M, 'consumption_m3_yr')} = b.m3_yr,
+                {_col(M, 'Recovery_EUR')} = b.m3_yr * m.{_col(M, 'userTariff_EUR_m3')}
+            FROM billed b
+            WHERE m.{_col(M, 'id')} = b.id
+            """,
+            params,
+        )
+        updated = cursor.rowcount
+    if updated:
+        bundle_cache.invalidate()
+    return updated
@@ -0,0 +1,98 @@
+# Generated by Django 5.2.12 on 2026-10-19 15:00
+
+import django.contrib.gis.db.models.fields
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("common", "0004_alter_district_id_alter_neighborhood_id"),
+        ("watersupply", "0005_coveragewatersupply_buffer_m_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PipeBuffer",
+            fields=[
+                ("id", models.AutoField(primary_key=True, serialize=False)),
+                (
+                    "buffer_m",
+                    models.FloatField(help_text="Buffer distance in meters"),
+                ),
+                (
+                    "geom",
+                    django.contrib.gis.db.models.fields.MultiPolygonField(srid=28992),
+                ),
+                (
+                    "last_updated",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                (
+                    "pipe",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="buffers",
+                        to="watersupply.pipenetwork",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Pipe Buffer",
+                "verbose_name_plural": "Pipe Buffers",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("pipe", "buffer_m"), name="unique_pipe_buffer"
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="NeighborhoodCoverage",
+            fields=[
+                ("id", models.AutoField(primary_key=True, serialize=False)),
+                (
+                    "buffer_m",
+                    models.FloatField(help_text="Buffer distance in meters"),
+                ),
+                (
+                    "households",
+                    models.IntegerField(
+                        default=0,
+                        help_text="Households (UsersLocation.usersTotal) in the neighbourhood",
+                    ),
+                ),
+                (
+                    "covered",
+                    models.BooleanField(
+                        default=False,
+                        help_text="Whether a buffer of a pipe in its city intersects the neighbourhood",
+                    ),
+                ),
+                (
+                    "last_updated",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                (
+                    "neighborhood",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="water_coverage",
+                        to="common.neighborhood",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Neighborhood Coverage",
+                "verbose_name_plural": "Neighborhood Coverage Records",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("neighborhood", "buffer_m"),
+                        name="unique_neighborhood_coverage",
+                    )
+                ],
+            },
+        ),
+    ]
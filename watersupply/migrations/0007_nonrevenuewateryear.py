@@ -0,0 +1,82 @@
+# Generated by Django 5.2.12 on 2026-10-19 15:30
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("watersupply", "0006_pipebuffer_neighborhoodcoverage"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NonRevenueWaterYear",
+            fields=[
+                ("year", models.IntegerField(primary_key=True, serialize=False)),
+                (
+                    "events",
+                    models.IntegerField(default=0, help_text="Number of loss records"),
+                ),
+                (
+                    "apparent_m3_d",
+                    models.FloatField(
+                        default=0, help_text="Sum of apparent losses in m3/day"
+                    ),
+                ),
+                (
+                    "carl_m3_d",
+                    models.FloatField(
+                        default=0,
+                        help_text="Current Annual Real Losses: sum of real losses in m3/day",
+                    ),
+                ),
+                (
+                    "uarl_m3_d",
+                    models.FloatField(
+                        default=0,
+                        help_text="Unavoidable Annual Real Losses in m3/day",
+                    ),
+                ),
+                (
+                    "ILI",
+                    models.FloatField(
+                        blank=True,
+                        help_text="Infrastructure Leakage Index (CARL / UARL)",
+                        null=True,
+                    ),
+                ),
+                (
+                    "last_updated",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+            ],
+            options={
+                "verbose_name": "Non Revenue Water Year",
+                "verbose_name_plural": "Non Revenue Water Years",
+            },
+        ),
+        # Totals of the records already present
+        migrations.RunSQL(
+            sql="""
+                INSERT INTO watersupply_nonrevenuewateryear
+                    (year, events, apparent_m3_d, carl_m3_d, uarl_m3_d, "ILI", last_updated)
+                SELECT
+                    year,
+                    count(*),
+                    COALESCE(sum("loss_Quantity_m3") FILTER (WHERE type <> 'R'), 0),
+                    COALESCE(sum("loss_Quantity_m3") FILTER (WHERE type = 'R'), 0),
+                    COALESCE(sum("loss_Quantity_m3" * "UnavoidableLossses_PCT" / 100) FILTER (WHERE type = 'R'), 0),
+                    NULL,
+                    now()
+                FROM watersupply_nonrevenuewater
+                GROUP BY year;
+
+                UPDATE watersupply_nonrevenuewateryear
+                SET "ILI" = round((carl_m3_d / uarl_m3_d)::numeric, 2)
+                WHERE uarl_m3_d > 0;
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.contrib.gis.db import models
 from django.db.models import Sum, F, ExpressionWrapper, FloatField
+from django.db import transaction
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from common.models import Province, City, Neighborhood, EnvironmentalCosts
@@ -118,11 +119,12 @@ class MeteredResidential(models.Model):
     last_updated = models.DateTimeField(default=timezone.now)
     
     def save(self, *args, **kwargs):
-        city = self.userLocation.neighborhood.city
+        # Neighborhoods belong to a city through their district
+        district = self.userLocation.neighborhood.district
         # Get most recent record for this city, not filtered by current year
         consumption_record = ConsumptionCapita.objects.filter(
-            city=city
-        ).order_by('-year').first()
+            city=district.city_id
+        ).order_by('-year').first() if district else None
         
         if consumption_record and self.userLocation.populationServed:
             collection_ratio = (
@@ -373,60 +375,14 @@ class CoverageWaterSupply(models.Model):
     last_updated = models.DateTimeField(default=timezone.now)
 
     def save(self, *args, **kwargs):
-        from django.contrib.gis.geos import MultiPolygon
-        from django.contrib.gis.db.models import Union
+        from .coverage import city_coverage
 
-        # 1. Buffer all pipes in this city and dissolve overlaps
-        pipes = PipeNetwork.objects.filter(
-            destination__neighborhood__district__city=self.city
-        )
-        if not pipes.exists():
-            # Fallback: use all pipes whose geometry intersects the city
-            pipes = PipeNetwork.objects.filter(geom__intersects=self.city.geom)
-
-        if pipes.exists():
-            # Buffer each pipe and union into a single geometry
-            dissolved = (
-                pipes.aggregate(union=Union('geom'))['union']
-            )
-            if dissolved:
-                dissolved = dissolved.buffer(self.buffer_m)
-                # Ensure MultiPolygon
-                if dissolved.geom_type == 'Polygon':
-                    dissolved = MultiPolygon(dissolved)
-                self.geom = dissolved
-                self.coveredArea_km2 = round(dissolved.area / 1e6, 4)
-            else:
-                self.geom = None
-                self.coveredArea_km2 = 0
-        else:
-            self.geom = None
-            self.coveredArea_km2 = 0
-
-        # 2. Count households inside the buffer vs total in city
-        city_neighborhoods = Neighborhood.objects.filter(
-            district__city=self.city
-        )
-
-        # Total households: sum usersTotal from all UsersLocations in city
-        self.households_total = (
-            UsersLocation.objects.filter(neighborhood__in=city_neighborhoods)
-            .aggregate(total=Sum('usersTotal'))['total'] or 0
+        # Cached per-pipe buffers and per-neighbourhood counts (see watersupply.coverage)
+        self.geom, self.households_covered, self.households_total = city_coverage(
+            self.city, self.buffer_m
         )
+        self.coveredArea_km2 = round(self.geom.area / 1e6, 4) if self.geom else 0
 
-        # Covered households: only neighborhoods intersecting the buffer
-        if self.geom:
-            covered_neighborhoods = city_neighborhoods.filter(
-                geom__intersects=self.geom
-            )
-            self.households_covered = (
-                UsersLocation.objects.filter(neighborhood__in=covered_neighborhoods)
-                .aggregate(total=Sum('usersTotal'))['total'] or 0
-            )
-        else:
-            self.households_covered = 0
-
-        # 3. Coverage percentage
         if self.households_total > 0:
             self.coveragePCT = round(
                 self.households_covered / self.households_total * 100, 1
@@ -444,6 +400,44 @@ class CoverageWaterSupply(models.Model):
         verbose_name = "Coverage Water Supply"
         verbose_name_plural = "Coverage Water Supply Records"
 
+class PipeBuffer(models.Model):
+    """Buffer polygon of one pipe at one coverage distance, kept in sync by signals."""
+    id = models.AutoField(primary_key=True)
+    pipe = models.ForeignKey(PipeNetwork, on_delete=models.CASCADE, related_name="buffers")
+    buffer_m = models.FloatField(help_text="Buffer distance in meters")
+    geom = models.MultiPolygonField(srid=COORDINATE_SYSTEM)
+    last_updated = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Pipe {self.pipe_id} - {self.buffer_m} m"
+
+    class Meta:
+        verbose_name = "Pipe Buffer"
+        verbose_name_plural = "Pipe Buffers"
+        constraints = [
+            models.UniqueConstraint(fields=['pipe', 'buffer_m'], name='unique_pipe_buffer')
+        ]
+
+
+class NeighborhoodCoverage(models.Model):
+    """Households of a neighbourhood and whether a buffer of its city's pipes reaches it."""
+    id = models.AutoField(primary_key=True)
+    neighborhood = models.ForeignKey(Neighborhood, on_delete=models.CASCADE, related_name="water_coverage")
+    buffer_m = models.FloatField(help_text="Buffer distance in meters")
+    households = models.IntegerField(default=0, help_text="Households (UsersLocation.usersTotal) in the neighbourhood")
+    covered = models.BooleanField(default=False, help_text="Whether a buffer of a pipe in its city intersects the neighbourhood")
+    last_updated = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.neighborhood} - {self.buffer_m} m: {'covered' if self.covered else 'not covered'}"
+
+    class Meta:
+        verbose_name = "Neighborhood Coverage"
+        verbose_name_plural = "Neighborhood Coverage Records"
+        constraints = [
+            models.UniqueConstraint(fields=['neighborhood', 'buffer_m'], name='unique_neighborhood_coverage')
+        ]
+
 class NonRevenueWater(models.Model):
     class LossesTypes(models.TextChoices):
         Apparent = 'A','Apparent'
@@ -452,6 +446,17 @@ class NonRevenueWater(models.Model):
     APPARENT_CHOICES = ['CM', 'UA', 'DE', 'OT']
     REAL_CHOICES     = ['LP', 'LS', 'LM', 'OT']
 
+    # Random event profiles: specificLoss -> (quantity range m3/day, unavoidable %)
+    LOSS_PROFILES = {
+        'CM': (50, 300, 60),     # Meter inaccuracy: moderate volume, high unavoidable
+        'UA': (20, 200, 10),     # Unauthorized: moderate, low unavoidable
+        'DE': (10, 100, 30),     # Data handling: low volume
+        'LP': (100, 2000, 25),   # Leakage mains: high volume
+        'LS': (50, 500, 20),     # Leakage storage: medium
+        'LM': (30, 400, 15),     # Leakage meters: medium
+        'OT': (10, 150, 40),     # Other
+    }
+
     class LossesChoices(models.TextChoices):
         ConsumerMeter = 'CM','Meter Innacurracy'
         Unauthorized = 'UA', 'Unathorized consumption'
@@ -482,25 +487,18 @@ class NonRevenueWater(models.Model):
         else:
             self.type = self.LossesTypes.Apparent
 
-        # Calculate ILI for Real losses: CARL / UARL across the whole year
-        if self.type == self.LossesTypes.Real:
-            # Get all other Real loss records for this year (exclude self if updating)
-            qs = NonRevenueWater.objects.filter(year=self.year, type='R')
+        # ILI for Real losses: CARL / UARL across the whole year, from the
+        # running totals in NonRevenueWaterYear (updated in the same transaction)
+        with transaction.atomic():
             if self.pk:
-                qs = qs.exclude(pk=self.pk)
-
-            carl_daily = sum(r.loss_Quantity_m3 for r in qs) + self.loss_Quantity_m3
-            uarl_daily = (
-                sum(r.loss_Quantity_m3 * r.UnavoidableLossses_PCT / 100 for r in qs)
-                + self.loss_Quantity_m3 * self.UnavoidableLossses_PCT / 100
-            )
+                previous = NonRevenueWater.objects.filter(pk=self.pk).first()
+                if previous:
+                    NonRevenueWaterYear.add_event(previous, sign=-1)
+            totals = NonRevenueWaterYear.add_event(self)
 
-            self.ILI = round(carl_daily / uarl_daily, 2) if uarl_daily > 0 else None
-        else:
-            self.ILI = None
-
-        self.last_updated = timezone.now()
-        super().save(*args, **kwargs)
+            self.ILI = totals.ILI if self.type == self.LossesTypes.Real else None
+            self.last_updated = timezone.now()
+            super().save(*args, **kwargs)
 
     def clean(self):
         valid_types = {
@@ -527,16 +525,7 @@ class NonRevenueWater(models.Model):
         """
         import random
 
-        # Profiles: (specificLoss, quantity range m3/day, unavoidable %)
-        profiles = {
-            'CM': (50, 300, 60),     # Meter inaccuracy: moderate volume, high unavoidable
-            'UA': (20, 200, 10),     # Unauthorized: moderate, low unavoidable
-            'DE': (10, 100, 30),     # Data handling: low volume
-            'LP': (100, 2000, 25),   # Leakage mains: high volume
-            'LS': (50, 500, 20),     # Leakage storage: medium
-            'LM': (30, 400, 15),     # Leakage meters: medium
-            'OT': (10, 150, 40),     # Other
-        }
+        profiles = NonRevenueWater.LOSS_PROFILES
 
         choice = random.choice(list(profiles.keys()))
         q_min, q_max, unavoidable_pct = profiles[choice]
@@ -552,6 +541,47 @@ class NonRevenueWater(models.Model):
         event.save()
         return event
     
+class NonRevenueWaterYear(models.Model):
+    """
+    Running totals of NonRevenueWater per year, kept in step with every
+    save and delete (see watersupply.signals) and rebuilt by bulk loads
+    (watersupply.nrw.recompute_years).
+    """
+    year = models.IntegerField(primary_key=True)
+    events = models.IntegerField(default=0, help_text="Number of loss records")
+    apparent_m3_d = models.FloatField(default=0, help_text="Sum of apparent losses in m3/day")
+    carl_m3_d = models.FloatField(default=0, help_text="Current Annual Real Losses: sum of real losses in m3/day")
+    uarl_m3_d = models.FloatField(default=0, help_text="Unavoidable Annual Real Losses in m3/day")
+    ILI = models.FloatField(null=True, blank=True, help_text="Infrastructure Leakage Index (CARL / UARL)")
+    last_updated = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.year}: CARL {self.carl_m3_d} m3/d, ILI {self.ILI}"
+
+    @classmethod
+    def add_event(cls, event, sign=1):
+        """Add (or with sign=-1 remove) one loss record; returns the locked, updated row."""
+        totals, _ = cls.objects.select_for_update().get_or_create(year=event.year)
+        totals.events += sign
+        if event.type == NonRevenueWater.LossesTypes.Real:
+            totals.carl_m3_d += sign * event.loss_Quantity_m3
+            totals.uarl_m3_d += sign * event.loss_Quantity_m3 * event.UnavoidableLossses_PCT / 100
+        else:
+            totals.apparent_m3_d += sign * event.loss_Quantity_m3
+        if totals.events <= 0:
+            # Last record gone: drop float residue of the running sums
+            totals.events = 0
+            totals.apparent_m3_d = totals.carl_m3_d = totals.uarl_m3_d = 0
+        totals.ILI = round(totals.carl_m3_d / totals.uarl_m3_d, 2) if totals.uarl_m3_d > 0 else None
+        totals.last_updated = timezone.now()
+        totals.save()
+        return totals
+
+    class Meta:
+        verbose_name = "Non Revenue Water Year"
+        verbose_name_plural = "Non Revenue Water Years"
+
+
 class OPEX(models.Model):
     id = models.AutoField(primary_key=True)
     year = models.IntegerField(help_text="Year of operation")
@@ -0,0 +1,195 @@
+"""
+Bulk loads of NonRevenueWater loss events.
+
+Events are validated column-wise with pandas and written with PostgreSQL
+COPY. Per-row save() is skipped, so the yearly totals (NonRevenueWaterYear)
+and the ILI of the Real-loss rows are recomputed once per affected year
+afterwards instead of once per event.
+
+``simulate_loss_events`` draws synthetic events from the same profiles as
+NonRevenueWater.generate_random_event, vectorised and seeded, for stress
+tests of the NRW dashboard and synthetic training data.
+"""
+import numpy as np
+import pandas as pd
+from django.db import connection
+from django.utils import timezone
+
+from core.bulk import copy_dataframe
+from . import cache as bundle_cache
+from .calculations import _table, _col
+from .models import NonRevenueWater, NonRevenueWaterYear
+
+
+EVENT_FIELDS = ['year', 'specificLoss', 'loss_Quantity_m3', 'WaterCost_EUR_day', 'UnavoidableLossses_PCT']
+
+COPY_COLUMNS = [*EVENT_FIELDS, 'type', 'last_updated']
+
+
+def read_loss_events(path, chunksize=100_000):
+    """Yield DataFrames from a CSV (streamed) or Parquet file."""
+    if str(path).lower().endswith(('.parquet', '.pq')):
+        yield pd.read_parquet(path)
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+def prepare_loss_events(df):
+    """
+    Validate and normalise a batch of loss events.
+
+    The loss type is derived from specificLoss exactly as in
+    NonRevenueWater.save.
+
+    Returns:
+        tuple: (clean DataFrame with COPY_COLUMNS, rejected DataFrame with a
+        ``reason`` column)
+    """
+    missing = set(EVENT_FIELDS) - set(df.columns)
+    if missing:
+        raise ValueError(f"Loss events need the columns: {', '.join(sorted(missing))}")
+
+    df = df.copy()
+    rejected = []
+
+    df['specificLoss'] = df['specificLoss'].astype(str).str.strip()
+    bad = ~df['specificLoss'].isin(NonRevenueWater.LossesChoices.values)
+    rejected.append(df[bad].assign(reason='unknown specificLoss'))
+    df = df[~bad]
+
+    for field in ['year', 'loss_Quantity_m3', 'WaterCost_EUR_day', 'UnavoidableLossses_PCT']:
+        df[field] = pd.to_numeric(df[field], errors='coerce')
+    bad = df[EVENT_FIELDS].isna().any(axis=1)
+    rejected.append(df[bad].assign(reason='missing or non-numeric value'))
+    df = df[~bad]
+
+    bad = (df['loss_Quantity_m3'] < 0) | ~df['UnavoidableLossses_PCT'].between(0, 100)
+    rejected.append(df[bad].assign(reason='value out of range'))
+    df = df[~bad]
+
+    df['year'] = df['year'].astype('int64')
+    df['type'] = df['specificLoss'].isin(NonRevenueWater.REAL_CHOICES).map(
+        {True: NonRevenueWater.LossesTypes.Real.value, False: NonRevenueWater.LossesTypes.Apparent.value}
+    )
+    df['last_updated'] = timezone.now()
+
+    rejected = pd.concat(rejected)
+    return df[COPY_COLUMNS], rejected
+
+
+def recompute_years(years):
+    """
+    Rebuild NonRevenueWaterYear for the given years from the loss records
+    in one statement, then stamp the yearly ILI on their Real-loss rows.
+    """
+    years = sorted({int(y) for y in years})
+    if not years:
+        return
+
+    nrw, totals = NonRevenueWater, NonRevenueWaterYear
+    real = f"{_col(nrw, 'type')} = 'R'"
+    quantity = _col(nrw, 'loss_Quantity_m3')
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {_table(totals)} (
+                {_col(totals, 'year')}, {_col(totals, 'events')}, {_col(totals, 'apparent_m3_d')},
+                {_col(totals, 'carl_m3_d')}, {_col(totals, 'uarl_m3_d')}, {_col(totals, 'ILI')},
+                {_col(totals, 'last_updated')}
+            )
+            SELECT
+                y.year,
+                count(e.{_col(nrw, 'id')}),
+                COALESCE(sum(e.{quantity}) FILTER (WHERE NOT e.{real}), 0),
+                COALESCE(sum(e.{quantity}) FILTER (WHERE e.{real}), 0),
+                COALESCE(sum(e.{quantity} * e.{_col(nrw, 'UnavoidableLossses_PCT')} / 100) FILTER (WHERE e.{real}), 0),
+                NULL,
+                now()
+            FROM unnest(%(years)s::int[]) AS y(year)
+            LEFT JOIN {_table(nrw)} e ON e.{_col(nrw, 'year')} = y.year
+            GROUP BY y.year
+            ON CONFLICT ({_col(totals, 'year')}) DO UPDATE SET
+                {_col(totals, 'events')} = EXCLUDED.{_col(totals, 'events')},
+                {_col(totals, 'apparent_m3_d')} = EXCLUDED.{_col(totals, 'apparent_m3_d')},
+                {_col(totals, 'carl_m3_d')} = EXCLUDED.{_col(totals, 'carl_m3_d')},
+                {_col(totals, 'uarl_m3_d')} = EXCLUDED.{_col(totals, 'uarl_m3_d')},
+                {_col(totals, 'last_updated')} = EXCLUDED.{_col(totals, 'last_updated')}
+            """,
+            {'years': years},
+        )
+        cursor.execute(
+            f"""
+            UPDATE {_table(totals)} SET {_col(totals, 'ILI')} = CASE
+                WHEN {_col(totals, 'uarl_m3_d')} > 0
+                THEN round(({_col(totals, 'carl_m3_d')} / {_col(totals, 'uarl_m3_d')})::numeric, 2)
+            END
+            WHERE {_col(totals, 'year')} = ANY(%(years)s)
+            """,
+            {'years': years},
+        )
+        cursor.execute(
+            f"""
+            UPDATE {_table(nrw)} e SET {_col(nrw, 'ILI')} = CASE WHEN e.{real} THEN t.{_col(totals, 'ILI')} END
+            FROM {_table(totals)} t
+            WHERE t.{_col(totals, 'year')} = e.{_col(nrw, 'year')} AND t.{_col(totals, 'year')} = ANY(%(years)s)
+            """,
+            {'years': years},
+        )
+
+
+def load_loss_events(df):
+    """
+    COPY a prepared batch into NonRevenueWater and recompute the totals
+    and ILI of every year in it.
+
+    Returns:
+        Number of rows inserted.
+    """
+    if df.empty:
+        return 0
+    inserted = copy_dataframe(NonRevenueWater._meta.db_table, df, COPY_COLUMNS)
+    recompute_years(df['year'].unique())
+    bundle_cache.invalidate()
+    return inserted
+
+
+def simulate_loss_events(years, events_per_year, seed=None, water_cost_m3=0.50, profiles=None):
+    """
+    Monte Carlo loss events: per event a uniformly drawn category and a
+    uniform quantity within its range, as generate_random_event does.
+
+    Parameters:
+    - years: iterable of years.
+    - events_per_year: number of events drawn for every year.
+    - seed: seed of the numpy generator; the same seed gives the same events.
+    - profiles: {specificLoss: (min m3/day, max m3/day, unavoidable %)};
+      NonRevenueWater.LOSS_PROFILES by default.
+
+    Returns:
+        DataFrame with EVENT_FIELDS, ready for prepare_loss_events.
+    """
+    profiles = profiles or NonRevenueWater.LOSS_PROFILES
+    years = np.asarray(list(years), dtype='int64')
+    rng = np.random.default_rng(seed)
+
+    codes = np.array(list(profiles))
+    q_min, q_max, unavoidable = (np.array(column, dtype=float) for column in zip(*profiles.values()))
+
+    n = len(years) * events_per_year
+    category = rng.integers(len(codes), size=n)
+    quantity = np.round(rng.uniform(q_min[category], q_max[category]), 1)
+
+    return pd.DataFrame({
+        'year': np.repeat(years, events_per_year),
+        'specificLoss': codes[category],
+        'loss_Quantity_m3': quantity,
+        'WaterCost_EUR_day': np.round(quantity * water_cost_m3, 2),
+        'UnavoidableLossses_PCT': unavoidable[category],
+    })
+
+
+def simulate_and_load(years, events_per_year, seed=None, water_cost_m3=0.50):
+    """Simulate events and bulk-load them; returns the number inserted."""
+    events = simulate_loss_events(years, events_per_year, seed=seed, water_cost_m3=water_cost_m3)
+    clean, _ = prepare_loss_events(events)
+    return load_loss_events(clean)
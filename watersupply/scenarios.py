@@ -0,0 +1,192 @@
+"""
+In-memory well-network scenarios.
+
+The active wells of a province are loaded once into numpy arrays (one
+entry per ExtractionWater row). A scenario is an on/off vector, optionally
+with changed flows or operating hours; a batch of S scenarios is an
+(S, wells) matrix and is evaluated in one vectorised pass. Nothing touches
+the database until WellNetwork.commit is called for a chosen scenario.
+
+Per well and day, with the conventions of watersupply.calculations and
+ExtractionWater.save:
+
+    production_m3_d = flow_m3_s * 86400
+    energy_kwh_day  = pumpEnergyRate_kWh_h * OperationTime_h_day * (flow / nominal flow)
+    co2_kg_day      = energy_kwh_day * pumpEmmissionFactor_kg_CO2_kWh
+    opex_EUR_day    = production_m3_d * opex_EUR_m3
+"""
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ExtractionWater
+from . import cache as bundle_cache
+
+
+SECONDS_PER_DAY = 86400
+
+# ExtractionWater field per array attribute; missing values load as 0
+_FIELDS = {
+    'flow_m3_s':        'pumpflow_m3_s',
+    'max_flow_m3_s':    'pumpMaxFlow_m3_s',
+    'hours_day':        'OperationTime_h_day',
+    'energy_kwh_h':     'pumpEnergyRate_kWh_h',
+    'emission_kg_kwh':  'pumpEmmissionFactor_kg_CO2_kWh',
+    'opex_EUR_m3':      'opex_EUR_m3',
+    'labor_EUR_m3':     'labor_EUR_m3',
+    'energy_EUR_m3':    'energy_EUR_m3',
+    'chemicals_EUR_m3': 'chemicals_EUR_m3',
+    'tax_EUR_m3':       'tax_EUR_m3',
+    'co2_cost_EUR_m3':  'co2_cost_EUR_m3',
+    'drought_EUR_m3':   'drought_damage_EUR_m3',
+}
+
+
+class WellNetwork:
+    """The wells of a province as arrays, indexed like `ids`."""
+
+    def __init__(self, ids, names, active, **arrays):
+        self.ids = np.asarray(ids)
+        self.names = list(names)
+        self.active = np.asarray(active, dtype=bool)
+        for attr in _FIELDS:
+            setattr(self, attr, np.nan_to_num(np.asarray(arrays[attr], dtype=float)))
+        self._index = {well_id: i for i, well_id in enumerate(self.ids.tolist())}
+
+    @classmethod
+    def for_province(cls, province):
+        """Load every well inside the province (active or not) in one query."""
+        rows = list(
+            ExtractionWater.objects
+            .filter(geom__intersects=province.geom)
+            .order_by('id')
+            .values_list('id', 'stationName', 'is_active', *_FIELDS.values())
+        )
+        columns = list(zip(*rows)) if rows else [()] * (3 + len(_FIELDS))
+        arrays = {
+            attr: [np.nan if v is None else v for v in values]
+            for attr, values in zip(_FIELDS, columns[3:])
+        }
+        return cls(columns[0], columns[1], columns[2], **arrays)
+
+    def __len__(self):
+        return len(self.ids)
+
+    # ── building scenarios ────────────────────────────────────────────
+    def index_of(self, well_ids):
+        """Array positions of ExtractionWater ids; unknown ids raise KeyError."""
+        return np.array([self._index[well_id] for well_id in well_ids], dtype=int)
+
+    def scenario(self, off=(), on=(), flow_m3_s=None):
+        """
+        One (active, flow) pair from the current state with some wells
+        switched off / on and flows changed ({well id: m3/s}).
+        """
+        active = self.active.copy()
+        active[self.index_of(off)] = False
+        active[self.index_of(on)] = True
+        flow = self.flow_m3_s.copy()
+        if flow_m3_s:
+            flow[self.index_of(flow_m3_s.keys())] = list(flow_m3_s.values())
+        return active, flow
+
+    def single_outages(self):
+        """(wells, wells) matrix: row i is the current state with well i off."""
+        active = np.tile(self.active, (len(self), 1))
+        np.fill_diagonal(active, False)
+        return active
+
+    def random_outages(self, n, p_off, seed=None):
+        """n scenarios where every active well fails independently with p_off."""
+        rng = np.random.default_rng(seed)
+        return self.active & (rng.random((n, len(self))) >= p_off)
+
+    def _flows(self, flow_m3_s):
+        """Scenario flows (current by default), clipped to the pump maximum where known."""
+        flow = self.flow_m3_s if flow_m3_s is None else np.asarray(flow_m3_s, dtype=float)
+        return np.where(self.max_flow_m3_s > 0, np.minimum(flow, self.max_flow_m3_s), flow)
+
+    # ── evaluation ────────────────────────────────────────────────────
+    def evaluate(self, active=None, flow_m3_s=None, hours_day=None):
+        """
+        Daily totals of a batch of scenarios.
+
+        Parameters:
+        - active: bool array (S, wells) or (wells,); the current state by default.
+        - flow_m3_s: flows (S, wells) or (wells,); current flows by default.
+          Clipped to the pump maximum where one is known; pump energy scales
+          with flow relative to the current flow.
+        - hours_day: operating hours (S, wells) or (wells,).
+
+        Returns:
+            dict of arrays of length S: production_m3_d, energy_kwh_day,
+            co2_kg_day, opex_EUR_day, environmental_EUR_day, active_wells.
+        """
+        active = self.active if active is None else np.asarray(active, dtype=bool)
+        active = np.atleast_2d(active).astype(float)
+
+        flow = self._flows(flow_m3_s)
+        hours = self.hours_day if hours_day is None else np.asarray(hours_day, dtype=float)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            flow_ratio = np.where(self.flow_m3_s > 0, flow / self.flow_m3_s, 1.0)
+
+        production = active * (flow * SECONDS_PER_DAY)                  # (S, wells)
+        energy = active * (self.energy_kwh_h * hours * flow_ratio)
+
+        return {
+            'production_m3_d':       production.sum(axis=1),
+            'energy_kwh_day':        energy.sum(axis=1),
+            'co2_kg_day':            energy @ self.emission_kg_kwh,
+            'opex_EUR_day':          production @ self.opex_EUR_m3,
+            'environmental_EUR_day': production @ (self.co2_cost_EUR_m3 + self.drought_EUR_m3),
+            'active_wells':          active.sum(axis=1).astype(int),
+        }
+
+    def opex_breakdown(self, active=None, flow_m3_s=None):
+        """Daily labor / energy / chemicals / tax cost of a batch of scenarios."""
+        active = self.active if active is None else np.asarray(active, dtype=bool)
+        flow = self._flows(flow_m3_s)
+        production = np.atleast_2d(active) * (flow * SECONDS_PER_DAY)
+        return {
+            'labor_EUR_day':     production @ self.labor_EUR_m3,
+            'energy_EUR_day':    production @ self.energy_EUR_m3,
+            'chemicals_EUR_day': production @ self.chemicals_EUR_m3,
+            'tax_EUR_day':       production @ self.tax_EUR_m3,
+        }
+
+    # ── write back ────────────────────────────────────────────────────
+    def commit(self, active, flow_m3_s=None):
+        """
+        Write one scenario back: is_active and (if given) pumpflow_m3_s of
+        the wells that differ from the loaded state. Flows are clipped to
+        the pump maximum as in evaluate(). Cached indicator bundles are
+        invalidated.
+
+        Returns:
+            Number of wells updated.
+        """
+        active = np.asarray(active, dtype=bool)
+        flow = self._flows(flow_m3_s)
+        changed = np.flatnonzero((active != self.active) | (flow != self.flow_m3_s))
+        if not len(changed):
+            return 0
+
+        now = timezone.now()
+        wells = ExtractionWater.objects.in_bulk(self.ids[changed].tolist())
+        for i in changed:
+            well = wells[self.ids[i].item()]
+            well.is_active = bool(active[i])
+            well.pumpflow_m3_s = float(flow[i])
+            well.last_updated = now
+
+        # bulk_update skips save(): neither field feeds its derived values
+        with transaction.atomic():
+            ExtractionWater.objects.bulk_update(
+                wells.values(), ['is_active', 'pumpflow_m3_s', 'last_updated']
+            )
+        bundle_cache.invalidate()
+
+        self.active = active.copy()
+        self.flow_m3_s = flow.copy()
+        return len(changed)
@@ -1,9 +1,25 @@
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import pre_save, post_save, post_delete, pre_delete
 from django.dispatch import receiver
 from django.db.models import Sum, F, FloatField, Case, When, Value, ExpressionWrapper
 from django.utils import timezone
-from .models import ConsumptionCapita
-from common.models import City, Province
+from .models import (
+    ConsumptionCapita, TotalWaterDemand, UsersLocation, MeteredResidential,
+    AvailableFreshWater, ExtractionWater, ImportedWater, WaterTreatment,
+    PipeNetwork, CoverageWaterSupply, NonRevenueWater, OPEX, AreaAffectedDrought,
+    NonRevenueWaterYear,
+)
+from . import cache as bundle_cache
+from . import coverage
+from .metering import recompute_metered_residential
+from common.models import City, Province, District, Neighborhood
+
+# Models read by views._get_province_data
+BUNDLE_SOURCES = (
+    ConsumptionCapita, TotalWaterDemand, UsersLocation, MeteredResidential,
+    AvailableFreshWater, ExtractionWater, ImportedWater, WaterTreatment,
+    PipeNetwork, CoverageWaterSupply, NonRevenueWater, OPEX, AreaAffectedDrought,
+    City, Province, Neighborhood,
+)
 
 
 @receiver(post_save, sender=City)
@@ -14,10 +30,91 @@ def update_consumption_on_population_change(sender, instance, **kwargs):
     """
     ConsumptionCapita.objects.filter(city=instance).update(
         total_consumption_m3_yr=ExpressionWrapper(
-            F("consumption_capita_L_d") / 1000.0 * F("province__population")*365,
+            F("consumption_capita_L_d") / 1000.0 * instance.currentPopulation * 365,
             output_field=FloatField(),
         ),
         
         last_updated=timezone.now(),
     )
-    
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_indicator_bundles(sender, **kwargs):
+    """Drop cached indicator bundles when any of their source rows change."""
+    if sender in BUNDLE_SOURCES:
+        bundle_cache.invalidate()
+
+
+# ── Incremental coverage (see watersupply.coverage) ──────────────────
+
+@receiver(post_save, sender=PipeNetwork)
+def update_coverage_on_pipe_save(sender, instance, **kwargs):
+    # Cached buffers still describe the pipe before this save
+    coverage.pipe_changed(instance.pk, coverage.pipe_buffer_geoms(instance.pk))
+    bundle_cache.invalidate()
+
+
+@receiver(pre_delete, sender=PipeNetwork)
+def remember_pipe_buffers(sender, instance, **kwargs):
+    instance._old_buffers = coverage.pipe_buffer_geoms(instance.pk)
+
+
+@receiver(post_delete, sender=PipeNetwork)
+def update_coverage_on_pipe_delete(sender, instance, **kwargs):
+    coverage.pipe_changed(instance.pk, getattr(instance, '_old_buffers', {}))
+    bundle_cache.invalidate()
+
+
+@receiver(pre_save, sender=UsersLocation)
+def remember_users_neighborhood(sender, instance, **kwargs):
+    instance._old_neighborhood_id = (
+        UsersLocation.objects.filter(pk=instance.pk).values_list('neighborhood_id', flat=True).first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=UsersLocation)
+@receiver(post_delete, sender=UsersLocation)
+def update_coverage_on_users_change(sender, instance, **kwargs):
+    # A move also takes the households out of the old neighbourhood
+    old = getattr(instance, '_old_neighborhood_id', None)
+    coverage.neighborhoods_changed({instance.neighborhood_id, old} - {None})
+    bundle_cache.invalidate()
+
+
+@receiver(pre_save, sender=Neighborhood)
+def remember_neighborhood_city(sender, instance, **kwargs):
+    instance._old_city_id = (
+        Neighborhood.objects.filter(pk=instance.pk).values_list('district__city_id', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Neighborhood)
+def update_coverage_on_neighborhood_save(sender, instance, **kwargs):
+    old = getattr(instance, '_old_city_id', None)
+    coverage.neighborhoods_changed([instance.pk], city_ids=[old] if old is not None else [])
+    bundle_cache.invalidate()
+
+
+@receiver(post_delete, sender=Neighborhood)
+def update_coverage_on_neighborhood_delete(sender, instance, **kwargs):
+    # Its NeighborhoodCoverage rows are gone (CASCADE); recount its city
+    coverage.neighborhoods_changed(
+        [], city_ids=District.objects.filter(pk=instance.district_id).values_list('city_id', flat=True)
+    )
+    bundle_cache.invalidate()
+
+
+@receiver(post_delete, sender=NonRevenueWater)
+def remove_loss_from_year_totals(sender, instance, **kwargs):
+    NonRevenueWaterYear.add_event(instance, sign=-1)
+
+
+# ── Metered revenue (see watersupply.metering) ───────────────────────
+
+@receiver(post_save, sender=ConsumptionCapita)
+@receiver(post_delete, sender=ConsumptionCapita)
+def recompute_meters_on_consumption_change(sender, instance, **kwargs):
+    """The city's meters bill against its latest per-capita consumption."""
+    recompute_metered_residential(city=instance.city_id)
@@ -1,10 +1,12 @@
 # water/tests/factories.py
-from django.contrib.gis.geos import Point, MultiPoint, MultiPolygon, Polygon
-from common.models import Province, City, Neighborhood
+from itertools import count
+
+from django.contrib.gis.geos import Point, MultiPoint, MultiPolygon, Polygon, LineString, MultiLineString
+from common.models import Province, City, District, Neighborhood
 from watersupply.models import (
     UsersLocation, MeteredResidential,
     ConsumptionCapita, ExtractionWater,
-    AvailableFreshWater, OPEX
+    AvailableFreshWater, OPEX, PipeNetwork
 )
 
 def make_polygon(x=5.0, y=52.0):
@@ -31,9 +33,31 @@ def make_city(province=None, **kwargs):
     defaults.update(kwargs)
     return City.objects.create(**defaults)
 
-def make_neighborhood(city=None, **kwargs):
+# District and Neighborhood have CharField primary keys
+_ids = count(1)
+
+def make_district(city=None, **kwargs):
     city = city or make_city()
-    defaults = dict(neighborhoodName="Test Neighborhood", city=city, geom=make_polygon(), currentPopulation=1200)
+    defaults = dict(
+        id=f"D{next(_ids):04d}",
+        city=city,
+        districtName="Test District",
+        currentPopulation=5000,
+        geom=make_polygon(),
+    )
+    defaults.update(kwargs)
+    return District.objects.create(**defaults)
+
+def make_neighborhood(district=None, **kwargs):
+    """Neighborhoods reach their city through the district."""
+    district = district or make_district()
+    defaults = dict(
+        id=f"N{next(_ids):04d}",
+        neighborhoodName="Test Neighborhood",
+        district=district,
+        geom=make_polygon(),
+        currentPopulation=1200,
+    )
     defaults.update(kwargs)
     return Neighborhood.objects.create(**defaults)
 
@@ -72,4 +96,46 @@ def make_metered_residential(user_location=None, **kwargs):
         userAffordability_PCT=3.5,
     )
     defaults.update(kwargs)
-    return MeteredResidential(**defaults)  # don't .save() yet — let test control it
\ No newline at end of file
+    return MeteredResidential(**defaults)  # don't .save() yet — let test control it
+
+def make_source(x=5.0, y=52.0, **kwargs):
+    defaults = dict(
+        SourceName="Test Source",
+        geom=make_polygon(x, y),
+        infiltrationRate_cm_h=1.0,
+        infiltrationDepth_cm=50.0,
+        totalQuantity_Mm3=100.0,
+        yield_Mm3_year=10.0,
+    )
+    defaults.update(kwargs)
+    # save() looks the province up per row; bulk_create skips it
+    return AvailableFreshWater.objects.bulk_create([AvailableFreshWater(**defaults)])[0]
+
+def make_well(source=None, x=5.0, y=52.0, **kwargs):
+    source = source or make_source(x, y)
+    defaults = dict(
+        source=source,
+        geom=MultiPoint(Point(x, y), srid=4326),
+        stationName="Test Well",
+        pumpflow_m3_s=0.25,
+        pumpMaxFlow_m3_s=0.5,
+        OperationTime_h_day=20.0,
+        depth_m=80.0,
+        pumpEfficiency=70.0,
+        pumpEnergyRate_kWh_h=10.0,
+        pumpEmission_day_kg_CO2=40.0,
+    )
+    defaults.update(kwargs)
+    # save() reassigns the source and derives costs; bulk_create keeps these values
+    return ExtractionWater.objects.bulk_create([ExtractionWater(**defaults)])[0]
+
+def make_pipe(*points, **kwargs):
+    """Pipe along lon/lat points; saving it updates the coverage caches."""
+    defaults = dict(
+        geom=MultiLineString(LineString(points or ((5.0, 52.0), (5.01, 52.0))), srid=4326),
+        diameter_mm=200.0,
+    )
+    defaults.update(kwargs)
+    pipe = PipeNetwork(**defaults)
+    pipe.save()
+    return pipe
\ No newline at end of file
@@ -0,0 +1,59 @@
+# water/tests/test_assignment.py
+from django.test import TestCase
+
+from .factories import make_polygon, make_province, make_source, make_well
+from watersupply.assignment import assign_well_sources, unassigned_wells, source_provinces
+from watersupply.models import ExtractionWater
+
+
+class TestWellAssignment(TestCase):
+
+    def setUp(self):
+        # Two overlapping sources around (5.0, 52.0) and one elsewhere
+        self.low = make_source(SourceName="Low")
+        self.high = make_source(5.05, 52.0, SourceName="High")
+        self.east = make_source(6.0, 52.0, SourceName="East")
+
+        self.overlap = make_well(self.east, x=5.05, stationName="Overlap")
+        self.only_high = make_well(self.east, x=5.12, stationName="Only high")
+        self.in_east = make_well(self.east, x=6.0, stationName="East")
+        self.outside = make_well(self.east, x=8.0, stationName="Outside")
+
+    def source_of(self, well):
+        return ExtractionWater.objects.get(pk=well.pk).source_id
+
+    def test_lowest_source_id_wins_where_sources_overlap(self):
+        self.assertEqual(assign_well_sources(), 2)
+
+        self.assertEqual(self.source_of(self.overlap), min(self.low.pk, self.high.pk))
+        self.assertEqual(self.source_of(self.only_high), self.high.pk)
+        self.assertEqual(self.source_of(self.in_east), self.east.pk)
+        self.assertEqual(assign_well_sources(), 0)
+
+    def test_well_outside_every_source(self):
+        assign_well_sources()
+
+        self.assertEqual(self.source_of(self.outside), self.east.pk)
+        self.assertEqual(unassigned_wells(), [self.outside.pk])
+
+    def test_only_the_given_wells(self):
+        self.assertEqual(assign_well_sources([self.only_high.pk, self.outside.pk]), 1)
+
+        self.assertEqual(self.source_of(self.only_high), self.high.pk)
+        self.assertEqual(self.source_of(self.overlap), self.east.pk)
+        self.assertEqual(unassigned_wells([self.overlap.pk, self.outside.pk]), [self.outside.pk])
+        self.assertEqual(unassigned_wells([self.overlap.pk]), [])
+
+
+class TestSourceProvinces(TestCase):
+
+    def test_province_containing_each_source(self):
+        west = make_province(ProvinceName="West", geom=make_polygon(5.0, 52.0))
+        make_province(ProvinceName="West overlap", geom=make_polygon(5.0, 52.05))
+        east = make_province(ProvinceName="East", geom=make_polygon(6.0, 52.0))
+        in_west = make_source()
+        in_east = make_source(6.0, 52.0)
+        outside = make_source(8.0, 52.0)
+
+        self.assertEqual(source_provinces(), {in_west.pk: west.pk, in_east.pk: east.pk})
+        self.assertEqual(source_provinces([in_east.pk, outside.pk]), {in_east.pk: east.pk})
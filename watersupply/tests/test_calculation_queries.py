@@ -0,0 +1,137 @@
+# water/tests/test_calculation_queries.py
+from django.contrib.gis.geos import MultiPoint, Point
+from django.test import TestCase
+
+from .factories import (
+    make_polygon, make_province, make_city, make_consumption_capita,
+    make_district, make_neighborhood, make_users_location,
+    make_metered_residential, make_source, make_well,
+)
+from watersupply.models import (
+    TotalWaterDemand, ImportedWater, WaterTreatment, CoverageWaterSupply,
+    OPEX, AreaAffectedDrought, NonRevenueWaterYear,
+)
+from watersupply.calculations import (
+    calculate_province_aggregates,
+    _get_consumption_capita,
+    calculate_supply_security,
+    calculate_total_extraction,
+    calculate_energy_consumption,
+    calculate_co2_emission,
+    calculate_water_quality,
+    calculate_collection_ratio,
+    calculate_opex_recovery,
+    calculate_coverage,
+    calculate_nrw,
+    calculate_available_freshwater,
+    calculate_drought_area,
+)
+from watersupply.views import _get_province_data
+
+
+class TestProvinceAggregates(TestCase):
+
+    def setUp(self):
+        self.province = make_province(currentPopulation=50000)
+        self.city = make_city(province=self.province)
+        make_consumption_capita(city=self.city, year=2024, consumption_capita_L_d=120.0)
+        make_consumption_capita(city=self.city, year=2023, consumption_capita_L_d=150.0)
+        TotalWaterDemand.objects.create(city=self.city, year=2024)
+
+        # A second province and city that every indicator must ignore
+        other_province = make_province(ProvinceName="Other Province", geom=make_polygon(7.0, 52.0))
+        other_city = make_city(province=other_province, cityName="Other City", geom=make_polygon(7.0, 52.0))
+        make_consumption_capita(city=other_city, year=2024, consumption_capita_L_d=200.0)
+
+        # Wells: active and inactive inside the province, one outside
+        source = make_source(totalQuantity_Mm3=100.0)
+        make_source(7.0, 52.0, SourceName="Other Source", totalQuantity_Mm3=40.0)
+        make_well(source, stationName="Active", pumpflow_m3_s=0.25, pumpEmission_day_kg_CO2=40.0)
+        make_well(source, x=5.05, stationName="No emissions", pumpflow_m3_s=0.5,
+                  pumpEmission_day_kg_CO2=None)
+        make_well(source, x=4.95, stationName="Inactive", pumpflow_m3_s=2.0, is_active=False)
+        make_well(x=7.0, stationName="Outside", pumpflow_m3_s=4.0)
+        ImportedWater.objects.create(sourceName="Import", quantity_m3_d=1000.0, price_EUR_m3=0.5)
+        ImportedWater.objects.create(sourceName="Closed", quantity_m3_d=500.0, price_EUR_m3=0.5,
+                                     is_active=False)
+
+        # Treatment: two plants this year, one the year before
+        for year, energy, efficiency, ok, taken in [
+            (2024, 1.5, 90.0, 95, 100),
+            (2024, 2.5, 80.0, 40, 50),
+            (2023, 0.5, 50.0, 10, 40),
+        ]:
+            WaterTreatment.objects.create(
+                year=year, UnitaryOPEX_EUR_m3=0.25, treatment_efficiency=efficiency,
+                samplesWaterQuality_OK=ok, samplesWaterQualityTaken=taken,
+                EnergyConsumption_MW_day=energy, acceptanceRate=efficiency,
+                geom=MultiPoint(Point(5.0, 52.0), srid=4326),
+            )
+
+        # Meters in two neighbourhoods of the province, one outside
+        district = make_district(city=self.city)
+        for neighborhood, collected in [
+            (make_neighborhood(district=district), 350),
+            (make_neighborhood(district=district), 200),
+            (make_neighborhood(district=make_district(city=other_city)), 100),
+        ]:
+            make_metered_residential(
+                user_location=make_users_location(neighborhood=neighborhood),
+                collected_meters=collected,
+            ).save()
+
+        # save() rebuilds coverage from the pipe network; keep these figures
+        CoverageWaterSupply.objects.bulk_create([
+            CoverageWaterSupply(city=self.city, year=2024, coveredArea_km2=12.5,
+                                households_covered=300, households_total=400, coveragePCT=75.0),
+            CoverageWaterSupply(city=other_city, year=2024, coveredArea_km2=3.0,
+                                households_covered=10, households_total=100, coveragePCT=10.0),
+        ])
+
+        for province, year, level, area in [
+            (self.province, 2024, 2, 1.5),
+            (self.province, 2024, 3, 2.25),
+            (self.province, 2023, 4, 8.0),
+            (other_province, 2024, 5, 6.0),
+        ]:
+            AreaAffectedDrought.objects.create(
+                geom=province.geom, Province=province, areaName="Area",
+                SensibilityLevel=level, year=year, areaAffected_km2=area,
+            )
+
+        # save() is broken upstream; the first row of the year wins in both paths
+        OPEX.objects.bulk_create([
+            OPEX(year=2023, UnitaryOPEX_EUR_m3=0.5, totalOPEX_EUR=10000.0),
+            OPEX(year=2024, UnitaryOPEX_EUR_m3=0.5, totalOPEX_EUR=20000.0),
+            OPEX(year=2024, UnitaryOPEX_EUR_m3=0.5, totalOPEX_EUR=99999.0),
+        ])
+        NonRevenueWaterYear.objects.create(year=2024, events=3, apparent_m3_d=120.0,
+                                           carl_m3_d=300.0, uarl_m3_d=100.0, ILI=3.0)
+        NonRevenueWaterYear.objects.create(year=2023, events=1, apparent_m3_d=50.0)
+
+    def test_province_data_query_count(self):
+        """Province lookup + one aggregate statement, whatever the data volume."""
+        with self.assertNumQueries(2):
+            data = _get_province_data("Test Province", 2024)
+        self.assertEqual(data['consumption_capita'], 120.0)
+
+    def test_matches_individual_calculations(self):
+        agg = calculate_province_aggregates(self.province, 2024)
+
+        # The seed exercises the filters: active wells inside, this year's rows
+        self.assertEqual(agg['extraction_m3_d'], 0.75 * 86400)
+        self.assertEqual(agg['drought'], {'total_area_km2': 3.75, 'max_sensibility': 3})
+        self.assertEqual(agg['opex_recovery']['total_opex_EUR'], 20000.0)
+
+        self.assertEqual(agg['consumption_capita'], _get_consumption_capita(self.province, 2024))
+        self.assertEqual(agg['supply_security'], calculate_supply_security(self.province))
+        self.assertEqual(agg['extraction_m3_d'], calculate_total_extraction(self.province))
+        self.assertEqual(agg['energy_kwh_day'], calculate_energy_consumption(self.province))
+        self.assertEqual(agg['co2_kg_day'], calculate_co2_emission(self.province))
+        self.assertEqual(agg['water_quality'], calculate_water_quality(2024))
+        self.assertEqual(agg['collection_ratio'], calculate_collection_ratio(self.province))
+        self.assertEqual(agg['opex_recovery'], calculate_opex_recovery(2024, self.province))
+        self.assertEqual(agg['coverage'], calculate_coverage(self.province))
+        self.assertEqual(agg['nrw'], calculate_nrw(2024))
+        self.assertEqual(agg['available_freshwater'], calculate_available_freshwater(self.province))
+        self.assertEqual(agg['drought'], calculate_drought_area(self.province, 2024))
@@ -0,0 +1,85 @@
+# water/tests/test_coverage.py
+from django.contrib.gis.geos import MultiPolygon, Polygon
+from django.test import TestCase
+
+from .factories import (
+    make_province, make_city, make_district, make_neighborhood,
+    make_users_location, make_pipe,
+)
+from watersupply.models import (
+    CoverageWaterSupply, NeighborhoodCoverage, PipeBuffer, UsersLocation,
+)
+
+
+def box(x0, y0, x1, y1):
+    return MultiPolygon(Polygon(((x0, y0), (x1, y0), (x1, y1), (x0, y1), (x0, y0))), srid=4326)
+
+
+class TestCityCoverage(TestCase):
+    """
+    Two adjacent cities; a pipe in the west city ends ~70 m short of the
+    border, so its 500 m buffer reaches into the east city.
+    """
+
+    def setUp(self):
+        province = make_province()
+        self.west = make_city(province=province, cityName="West", geom=box(4.9, 51.9, 5.1, 52.1))
+        self.east = make_city(province=province, cityName="East", geom=box(5.1, 51.9, 5.3, 52.1))
+        self.west_district = make_district(city=self.west, geom=box(4.9, 51.9, 5.1, 52.1))
+        east_district = make_district(city=self.east, geom=box(5.1, 51.9, 5.3, 52.1))
+
+        self.border_west = make_neighborhood(district=self.west_district, geom=box(5.09, 52.0, 5.1, 52.01))
+        self.border_east = make_neighborhood(district=east_district, geom=box(5.1, 52.0, 5.11, 52.01))
+        self.far_east = make_neighborhood(district=east_district, geom=box(5.25, 52.0, 5.26, 52.01))
+        self.users_west = make_users_location(neighborhood=self.border_west, usersTotal=100)
+        make_users_location(neighborhood=self.border_east, usersTotal=50)
+        self.users_far = make_users_location(neighborhood=self.far_east, usersTotal=30)
+
+        make_pipe((5.0, 52.005), (5.099, 52.005))
+
+    def record(self, city):
+        return CoverageWaterSupply.objects.create(city=city, year=2024, coveredArea_km2=0, coveragePCT=0)
+
+    def counts(self, record):
+        record.refresh_from_db()
+        return record.households_covered, record.households_total
+
+    def test_only_the_citys_own_pipes_cover_it(self):
+        self.assertEqual(self.counts(self.record(self.west)), (100, 100))
+        self.assertEqual(self.counts(self.record(self.east)), (0, 80))
+        self.assertFalse(NeighborhoodCoverage.objects.get(neighborhood=self.border_east, buffer_m=500).covered)
+
+    def test_flags_are_refreshed_when_buffers_are_first_stored(self):
+        # Neighbourhood rows computed before any buffer existed
+        PipeBuffer.objects.all().delete()
+        NeighborhoodCoverage.objects.update(covered=False)
+
+        self.assertEqual(self.counts(self.record(self.west)), (100, 100))
+
+    def test_moving_users_updates_the_old_neighbourhood(self):
+        west, east = self.record(self.west), self.record(self.east)
+
+        self.users_west.neighborhood = self.far_east
+        self.users_west.save()
+
+        self.assertEqual(self.counts(west), (0, 0))
+        self.assertEqual(self.counts(east), (0, 180))
+        self.assertEqual(NeighborhoodCoverage.objects.get(neighborhood=self.border_west, buffer_m=500).households, 0)
+
+    def test_moving_a_neighbourhood_updates_the_old_city(self):
+        west, east = self.record(self.west), self.record(self.east)
+
+        self.far_east.district = self.west_district
+        self.far_east.save()
+
+        self.assertEqual(self.counts(west), (100, 130))
+        self.assertEqual(self.counts(east), (0, 50))
+
+    def test_deleting_a_neighbourhood_updates_its_city(self):
+        east = self.record(self.east)
+        # Re-point its users without signals, so only the delete changes the counts
+        UsersLocation.objects.filter(pk=self.users_far.pk).update(neighborhood=self.border_west)
+
+        self.far_east.delete()
+
+        self.assertEqual(self.counts(east), (0, 50))
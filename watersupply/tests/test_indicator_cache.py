@@ -0,0 +1,104 @@
+# water/tests/test_indicator_cache.py
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .factories import make_province, make_city
+from watersupply import cache as bundle_cache
+
+
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM)
+class TestIndicatorBundleCache(TestCase):
+
+    def setUp(self):
+        self.province = make_province()
+        with self.captureOnCommitCallbacks(execute=True):
+            bundle_cache.invalidate()
+        self.builds = []
+
+    def build(self, location, year):
+        self.builds.append((location, year))
+        return {'province': location, 'year': year}
+
+    def test_repeated_loads_are_served_from_cache(self):
+        first = bundle_cache.get_or_build("Test Province", 2024, self.build)
+        with self.assertNumQueries(0):
+            second = bundle_cache.get_or_build("Test Province", 2024, self.build)
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.builds), 1)
+
+    def test_bundles_are_keyed_by_year(self):
+        bundle_cache.get_or_build("Test Province", 2024, self.build)
+        bundle_cache.get_or_build("Test Province", 2025, self.build)
+        self.assertEqual(len(self.builds), 2)
+
+    def test_saving_a_source_model_invalidates(self):
+        bundle_cache.get_or_build("Test Province", 2024, self.build)
+        with self.captureOnCommitCallbacks(execute=True):
+            make_city(province=self.province)
+        bundle_cache.get_or_build("Test Province", 2024, self.build)
+        self.assertEqual(len(self.builds), 2)
+
+    def test_invalidation_waits_for_commit(self):
+        bundle_cache.get_or_build("Test Province", 2024, self.build)
+        with self.captureOnCommitCallbacks() as callbacks:
+            make_city(province=self.province)
+            bundle_cache.get_or_build("Test Province", 2024, self.build)
+            self.assertEqual(len(self.builds), 1)
+        for callback in callbacks:
+            callback()
+        bundle_cache.get_or_build("Test Province", 2024, self.build)
+        self.assertEqual(len(self.builds), 2)
+
+    def test_unknown_province_is_not_cached(self):
+        bundle_cache.get_or_build("Nowhere", 2024, lambda location, year: None)
+        bundle_cache.get_or_build("Nowhere", 2024, self.build)
+        self.assertEqual(self.builds, [("Nowhere", 2024)])
+
+
+@override_settings(CACHES=LOCMEM)
+class TestScenarioSession(TestCase):
+
+    def setUp(self):
+        self.data = {
+            'population': 100_000, 'supply_m3_d': 15_000,
+            'available_water_Mm3': 10, 'consumption_capita': 120,
+        }
+        self.token = bundle_cache.open_scenario("Test Province", 2024, self.data)
+
+    def test_snapshot_round_trip(self):
+        self.assertEqual(bundle_cache.get_scenario("Test Province", 2024, self.token), self.data)
+        self.assertIsNone(bundle_cache.get_scenario("Test Province", 2024, "unknown"))
+        self.assertIsNone(bundle_cache.get_scenario("Test Province", 2024, None))
+
+    def test_tokens_are_unique_per_render(self):
+        other = bundle_cache.open_scenario("Test Province", 2024, {**self.data, 'population': 1})
+        self.assertNotEqual(other, self.token)
+        self.assertEqual(bundle_cache.get_scenario("Test Province", 2024, self.token), self.data)
+
+    def test_snapshot_outlives_invalidation(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            bundle_cache.invalidate()
+        self.assertEqual(bundle_cache.get_scenario("Test Province", 2024, self.token), self.data)
+
+    def test_token_is_bound_to_location_and_year(self):
+        self.assertIsNone(bundle_cache.get_scenario("Test Province", 2025, self.token))
+        self.assertIsNone(bundle_cache.get_scenario("Other Province", 2024, self.token))
+
+    def test_curve_is_computed_from_snapshot(self):
+        url = reverse('watersupply:indicator_curve', args=["Test Province", 2024])
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {'token': self.token, 'consumption': '100,200'})
+        self.assertEqual(response.status_code, 200)
+        indicators = response.json()['indicators']
+        # 100 L/day * 100 000 people = 10 000 m3/day <= supply; 200 → 20 000 m3/day
+        self.assertEqual(indicators['service_time'], [24, 18.0])
+        self.assertAlmostEqual(indicators['supply_security'][1], 75.0)
+        self.assertEqual(indicators['total_demand_Mm3'], [3.65, 7.3])
+
+    def test_curve_requires_consumption(self):
+        url = reverse('watersupply:indicator_curve', args=["Test Province", 2024])
+        response = self.client.get(url, {'token': self.token})
+        self.assertEqual(response.status_code, 400)
@@ -2,16 +2,17 @@
 from django.test import TestCase
 from unittest.mock import patch, MagicMock
 from .factories import (
-    make_city, make_neighborhood, make_users_location,
+    make_city, make_district, make_neighborhood, make_users_location,
     make_consumption_capita, make_metered_residential
 )
 from watersupply.models import MeteredResidential
+from watersupply.metering import recompute_metered_residential
 
 class TestMeteredResidentialRecovery(TestCase):
     
     def setUp(self):
         self.city = make_city()
-        self.neighborhood = make_neighborhood(city=self.city)
+        self.neighborhood = make_neighborhood(district=make_district(city=self.city))
         self.user_location = make_users_location(
             neighborhood=self.neighborhood,
             populationServed=1200
@@ -49,7 +50,7 @@ class TestMeteredResidentialRecovery(TestCase):
     def test_recovery_none_when_no_consumption_record(self):
         """No ConsumptionCapita for this city → Recovery_EUR stays None."""
         empty_city = make_city()  # city with no ConsumptionCapita
-        neighborhood = make_neighborhood(city=empty_city)
+        neighborhood = make_neighborhood(district=make_district(city=empty_city))
         user_location = make_users_location(neighborhood=neighborhood)
         
         mr = make_metered_residential(user_location=user_location)
@@ -63,4 +64,51 @@ class TestMeteredResidentialRecovery(TestCase):
         )
         mr = make_metered_residential(user_location=user_location)
         mr.save()
-        self.assertIsNone(mr.Recovery_EUR)
\ No newline at end of file
+        self.assertIsNone(mr.Recovery_EUR)
+
+
+class TestMeteredResidentialBulkRecompute(TestCase):
+
+    def setUp(self):
+        self.city = make_city()
+        self.user_location = make_users_location(
+            neighborhood=make_neighborhood(district=make_district(city=self.city)),
+            populationServed=1200
+        )
+        make_consumption_capita(city=self.city, consumption_capita_L_d=120.0, year=2024)
+
+    def test_bulk_recompute_matches_save(self):
+        mr = make_metered_residential(user_location=self.user_location)
+        mr.save()
+        expected = (mr.consumption_m3_yr, mr.Recovery_EUR)
+
+        MeteredResidential.objects.filter(pk=mr.pk).update(consumption_m3_yr=None, Recovery_EUR=None)
+        self.assertEqual(recompute_metered_residential(), 1)
+
+        mr.refresh_from_db()
+        self.assertAlmostEqual(mr.consumption_m3_yr, expected[0], places=6)
+        self.assertAlmostEqual(mr.Recovery_EUR, expected[1], places=6)
+
+    def test_latest_consumption_change_updates_meters(self):
+        mr = make_metered_residential(user_location=self.user_location)
+        mr.save()
+
+        make_consumption_capita(city=self.city, consumption_capita_L_d=150.0, year=2025)
+
+        mr.refresh_from_db()
+        consumption = 150.0 / 1000 * 365 * 1200 * (350 / 400)
+        self.assertAlmostEqual(mr.Recovery_EUR, consumption * 0.50, places=2)
+
+    def test_city_filter_and_missing_data_are_skipped(self):
+        other_location = make_users_location(
+            neighborhood=make_neighborhood(district=make_district(city=make_city()))
+        )
+        no_population = make_users_location(
+            neighborhood=self.user_location.neighborhood,
+            populationServed=None
+        )
+        for location in (self.user_location, other_location, no_population):
+            make_metered_residential(user_location=location).save()
+
+        self.assertEqual(recompute_metered_residential(city=self.city), 1)
+        self.assertEqual(recompute_metered_residential(), 1)
@@ -0,0 +1,84 @@
+# water/tests/test_nrw_totals.py
+import pandas as pd
+from django.test import TestCase
+
+from watersupply.models import NonRevenueWater, NonRevenueWaterYear
+from watersupply.nrw import prepare_loss_events, load_loss_events, simulate_loss_events, simulate_and_load
+
+
+def make_loss(specific, quantity, unavoidable_pct, year=2024):
+    event = NonRevenueWater(
+        year=year,
+        specificLoss=specific,
+        loss_Quantity_m3=quantity,
+        WaterCost_EUR_day=quantity * 0.5,
+        UnavoidableLossses_PCT=unavoidable_pct,
+    )
+    event.save()
+    return event
+
+
+class TestNonRevenueWaterYearTotals(TestCase):
+
+    def test_ili_from_running_totals(self):
+        make_loss('LP', 1000, 25)          # UARL 250
+        make_loss('LS', 500, 20)           # UARL 100
+        last = make_loss('CM', 100, 60)    # apparent, not in CARL
+
+        totals = NonRevenueWaterYear.objects.get(year=2024)
+        self.assertEqual(totals.events, 3)
+        self.assertAlmostEqual(totals.carl_m3_d, 1500)
+        self.assertAlmostEqual(totals.uarl_m3_d, 350)
+        self.assertAlmostEqual(totals.apparent_m3_d, 100)
+        self.assertEqual(totals.ILI, round(1500 / 350, 2))
+        self.assertIsNone(last.ILI)
+
+    def test_update_and_delete_adjust_totals(self):
+        leak = make_loss('LP', 1000, 25)
+        other = make_loss('LS', 500, 20)
+
+        leak.loss_Quantity_m3 = 2000
+        leak.save()
+        other.delete()
+
+        totals = NonRevenueWaterYear.objects.get(year=2024)
+        self.assertEqual(totals.events, 1)
+        self.assertAlmostEqual(totals.carl_m3_d, 2000)
+        self.assertAlmostEqual(totals.uarl_m3_d, 500)
+        self.assertEqual(totals.ILI, 4.0)
+
+    def test_bulk_load_matches_per_row_saves(self):
+        make_loss('LP', 1000, 25)
+        clean, rejected = prepare_loss_events(pd.DataFrame({
+            'year': [2024, 2024, 2024],
+            'specificLoss': ['LS', 'UA', 'XX'],
+            'loss_Quantity_m3': [500, 80, 10],
+            'WaterCost_EUR_day': [250, 40, 5],
+            'UnavoidableLossses_PCT': [20, 10, 10],
+        }))
+        self.assertEqual(len(rejected), 1)
+        self.assertEqual(load_loss_events(clean), 2)
+
+        totals = NonRevenueWaterYear.objects.get(year=2024)
+        self.assertEqual(totals.events, 3)
+        self.assertEqual(totals.ILI, round(1500 / 350, 2))
+        self.assertEqual(
+            set(NonRevenueWater.objects.filter(type='R').values_list('ILI', flat=True)),
+            {totals.ILI},
+        )
+
+    def test_simulation_is_reproducible_and_loads_once(self):
+        first = simulate_loss_events([2024, 2025], 200, seed=7)
+        self.assertTrue(first.equals(simulate_loss_events([2024, 2025], 200, seed=7)))
+        for code, (low, high, unavoidable) in NonRevenueWater.LOSS_PROFILES.items():
+            events = first[first.specificLoss == code]
+            self.assertTrue(events.loss_Quantity_m3.between(low, high).all())
+            self.assertTrue((events.UnavoidableLossses_PCT == unavoidable).all())
+
+        self.assertEqual(simulate_and_load([2024], 500, seed=7), 500)
+        totals = NonRevenueWaterYear.objects.get(year=2024)
+        self.assertEqual(totals.events, 500)
+        self.assertEqual(
+            set(NonRevenueWater.objects.filter(type='R').values_list('ILI', flat=True)),
+            {totals.ILI},
+        )
@@ -0,0 +1,95 @@
+# water/tests/test_scenarios.py
+import numpy as np
+from django.test import SimpleTestCase, TestCase
+
+from .factories import make_province, make_source, make_well
+from watersupply.models import ExtractionWater
+from watersupply.scenarios import WellNetwork, SECONDS_PER_DAY, _FIELDS
+
+
+def make_network():
+    """Three wells; the third is off and has no known maximum flow."""
+    arrays = {attr: np.zeros(3) for attr in _FIELDS}
+    arrays.update(
+        flow_m3_s=[0.5, 0.25, 1.0],
+        max_flow_m3_s=[1.0, 0.25, 0.0],
+        hours_day=[10.0, 20.0, 24.0],
+        energy_kwh_h=[5.0, 4.0, 2.0],
+        emission_kg_kwh=[0.5, 0.5, 0.5],
+        opex_EUR_m3=[0.25, 0.5, 1.0],
+    )
+    return WellNetwork([11, 12, 13], ["A", "B", "C"], [True, True, False], **arrays)
+
+
+class TestEvaluate(SimpleTestCase):
+
+    def test_current_state(self):
+        result = make_network().evaluate()
+        np.testing.assert_array_equal(result['production_m3_d'], [0.75 * SECONDS_PER_DAY])
+        np.testing.assert_array_equal(result['energy_kwh_day'], [5.0 * 10 + 4.0 * 20])
+        np.testing.assert_array_equal(result['co2_kg_day'], [65.0])
+        np.testing.assert_array_equal(result['opex_EUR_day'], [(0.5 * 0.25 + 0.25 * 0.5) * SECONDS_PER_DAY])
+        np.testing.assert_array_equal(result['active_wells'], [2])
+
+    def test_flows_are_clipped_to_the_pump_maximum(self):
+        network = make_network()
+        result = network.evaluate(active=[True, True, True], flow_m3_s=[2.0, 1.0, 3.0])
+        # 1.0 and 0.25 are the maxima; the third well has none and keeps 3.0
+        np.testing.assert_array_equal(result['production_m3_d'], [4.25 * SECONDS_PER_DAY])
+        # pump energy scales with the clipped flow over the current flow
+        np.testing.assert_array_equal(result['energy_kwh_day'], [5.0 * 10 * 2 + 4.0 * 20 + 2.0 * 24 * 3])
+
+    def test_batch_of_scenarios(self):
+        network = make_network()
+        active, flow = network.scenario(off=[11], on=[13])
+        result = network.evaluate(np.stack([network.active, active]), flow)
+        np.testing.assert_array_equal(result['production_m3_d'], [0.75 * SECONDS_PER_DAY, 1.25 * SECONDS_PER_DAY])
+        np.testing.assert_array_equal(result['active_wells'], [2, 2])
+
+
+class TestSingleOutages(SimpleTestCase):
+
+    def test_each_row_switches_one_well_off(self):
+        network = make_network()
+        outages = network.single_outages()
+        np.testing.assert_array_equal(outages, [
+            [False, True, False],
+            [True, False, False],
+            [True, True, False],
+        ])
+        result = network.evaluate(outages)
+        np.testing.assert_array_equal(
+            result['production_m3_d'],
+            [0.25 * SECONDS_PER_DAY, 0.5 * SECONDS_PER_DAY, 0.75 * SECONDS_PER_DAY],
+        )
+        np.testing.assert_array_equal(result['active_wells'], [1, 1, 2])
+
+
+class TestCommit(TestCase):
+
+    def setUp(self):
+        self.province = make_province()
+        source = make_source()
+        self.first = make_well(source, stationName="First", pumpflow_m3_s=0.25, pumpMaxFlow_m3_s=0.5)
+        self.second = make_well(source, x=5.05, stationName="Second", pumpflow_m3_s=0.25, pumpMaxFlow_m3_s=0.5)
+        self.network = WellNetwork.for_province(self.province)
+
+    def test_only_changed_wells_are_written(self):
+        active, flow = self.network.scenario(off=[self.second.pk])
+        stamp = ExtractionWater.objects.get(pk=self.first.pk).last_updated
+
+        self.assertEqual(self.network.commit(active, flow), 1)
+
+        self.assertFalse(ExtractionWater.objects.get(pk=self.second.pk).is_active)
+        self.assertEqual(ExtractionWater.objects.get(pk=self.first.pk).last_updated, stamp)
+        self.assertEqual(self.network.commit(active, flow), 0)
+
+    def test_flows_are_clipped_as_in_evaluate(self):
+        active, flow = self.network.scenario(flow_m3_s={self.first.pk: 2.0})
+        expected = self.network.evaluate(active, flow)['production_m3_d'][0]
+
+        self.network.commit(active, flow)
+
+        self.assertEqual(ExtractionWater.objects.get(pk=self.first.pk).pumpflow_m3_s, 0.5)
+        reloaded = WellNetwork.for_province(self.province)
+        self.assertEqual(reloaded.evaluate()['production_m3_d'][0], expected)
@@ -8,4 +8,8 @@ urlpatterns = [
     path('indicators/<str:location>/<int:year>/recalculate/', 
          views.recalculate_indicators, 
          name='recalculate_indicators'),
+    path('indicators/<str:location>/<int:year>/curve/',
+         views.indicator_curve,
+         name='indicator_curve'),
+    path('wells/<str:location>/scenarios/', views.well_scenarios, name='well_scenarios'),
 ]
\ No newline at end of file
@@ -5,8 +5,13 @@ from django.contrib.gis.db import models as gis_models
 from django.db import connection
 from django.db.models import Sum, Avg
 from django.apps import apps
+from django.views.decorators.http import require_POST
+import json
+import numpy as np
 
 from .models import *
+from . import cache as bundle_cache
+from .scenarios import WellNetwork
 from common.models import Province as PM
 from .calculations import (
     _get_consumption_capita,
@@ -22,6 +27,7 @@ from .calculations import (
     calculate_nrw,
     calculate_available_freshwater,
     calculate_drought_area,
+    calculate_province_aggregates,
 )
 from django.contrib.gis.db.models.functions import Intersection, Length
 from django.contrib.gis.measure import D
@@ -30,89 +36,54 @@ from django.contrib.gis.measure import D
 SERVICE_HOURS_MAX = 24
 MAX_OPEX_EUR      = 10_000_000
 MAX_CONSUMPTION   = 300
+MAX_CURVE_POINTS  = 10_000
+MAX_SCENARIOS     = 10_000
 
 # ── shared helper ─────────────────────────────────────────────────────
 def _get_province_data(location, year):
-    """Fetch all fixed DB values for a province/year. Returns a dict."""
+    """Fetch all fixed DB values for a province/year. Returns a dict.
+
+    Two queries: the province, then every aggregate in one statement
+    (see calculations.calculate_province_aggregates).
+    """
     try:
         province = PM.objects.get(ProvinceName=location)
     except PM.DoesNotExist:
         return None
 
-    imported_water_m3_yr = (
-        ImportedWater.objects.filter(is_active=True)
-        .aggregate(total=Sum('quantity_m3_d'))['total'] or 0
-    ) * 365
-
-    available_water_Mm3 = calculate_available_freshwater(province)
-
-    network_length = (
-        PipeNetwork.objects
-        .filter(geom__intersects=province.geom)
-        .annotate(clipped=Intersection('geom', province.geom))
-        .annotate(clipped_length=Length('clipped'))
-        .aggregate(total=Sum('clipped_length'))['total']
-    )
-
-    demand_m3_d, supply_m3_d, supply_security = calculate_supply_security(province)
+    agg = calculate_province_aggregates(province, year)
+    demand_m3_d, supply_m3_d, supply_security = agg['supply_security']
 
     # OPEX: average across active wells
-    avg_opex_m3 = (
-        ExtractionWater.objects.filter(is_active=True, opex_EUR_m3__isnull=False)
-        .aggregate(avg=Avg('opex_EUR_m3'))['avg'] or 0
-    )
     supply_m3_yr = (supply_m3_d or 0) * 365
-    opex_total = supply_m3_yr * avg_opex_m3
-
-    # NRW breakdown
-    nrw = calculate_nrw(year)
-
-    # Energy & emissions (DAG: Total_Extraction → Energy_Consumption, CO2_Emission)
-    energy_kwh_day = calculate_energy_consumption(province)
-    co2_kg_day = calculate_co2_emission(province)
-
-    # Water quality (DAG: Samples_Taken → Samples_WQ → User_Acceptance_WS)
-    water_quality = calculate_water_quality(year)
-
-    # Collection ratio (DAG: Metered_Res_Water → CollectionRatio)
-    collection_ratio = calculate_collection_ratio(province)
+    opex_total = supply_m3_yr * agg['avg_opex_m3']
 
-    # OPEX recovery (DAG: OPEX → OPEX_Recovery)
-    opex_recovery = calculate_opex_recovery(year, province)
-
-    # Coverage (DAG: Network → Coverage_WS_Area → NumberUsers → Coverage_WS)
-    coverage = calculate_coverage(province)
-
-    # Drought (DAG: Total_Extraction → Area_Drought)
-    drought = calculate_drought_area(province, year)
-
-    # Total extraction (DAG: Available_FW → Total_Extraction)
-    extraction_m3_d = calculate_total_extraction(province)
+    nrw = agg['nrw']
 
     return {
         'province':             province,
         'population':           province.currentPopulation,
-        'consumption_capita':   _get_consumption_capita(province, year),
+        'consumption_capita':   agg['consumption_capita'],
         'demand_m3_d':          demand_m3_d,
         'supply_m3_d':          supply_m3_d,
         'supply_security':      supply_security,
-        'imported_water_m3_yr': imported_water_m3_yr,
-        'available_water_Mm3':  available_water_Mm3,
+        'imported_water_m3_yr': agg['imported_m3_d'] * 365,
+        'available_water_Mm3':  agg['available_freshwater'],
         'opex_total':           opex_total,
-        'network_length':       network_length.km if network_length else 0,
+        'network_length':       agg['network_length_m'] / 1000,
         'nrw_m3_d':             nrw['total_nrw_m3_d'],
         'apparent_losses_m3_d': nrw['apparent_losses_m3_d'],
         'real_losses_m3_d':     nrw['real_losses_m3_d'],
         'ili':                  nrw['ili'],
         # ── New DAG-derived fields ──
-        'extraction_m3_d':      extraction_m3_d,
-        'energy_kwh_day':       energy_kwh_day,
-        'co2_kg_day':           co2_kg_day,
-        'water_quality':        water_quality,
-        'collection_ratio':     collection_ratio,
-        'opex_recovery':        opex_recovery,
-        'coverage':             coverage,
-        'drought':              drought,
+        'extraction_m3_d':      agg['extraction_m3_d'],
+        'energy_kwh_day':       agg['energy_kwh_day'],
+        'co2_kg_day':           agg['co2_kg_day'],
+        'water_quality':        agg['water_quality'],
+        'collection_ratio':     agg['collection_ratio'],
+        'opex_recovery':        agg['opex_recovery'],
+        'coverage':             agg['coverage'],
+        'drought':              agg['drought'],
     }
 
 _MOCK_OPEX_M3 = 0.07  # EUR/m3
@@ -226,16 +197,62 @@ def _build_indicators(data, consumption_override=None):
     }
 
 
+def _build_indicator_curves(data, consumption):
+    """
+    Vectorised counterpart of _build_indicators for the indicators that
+    depend on consumption: one array per indicator, one value per entry of
+    `consumption` (L/person/day).
+    """
+    consumption = np.asarray(consumption, dtype=float)
+    demand_m3_d = consumption / 1000 * data['population']
+    supply_m3_d = data['supply_m3_d'] or 0
+    available   = data['available_water_Mm3']
+
+    demand_Mm3_yr = demand_m3_d * 365 / 1_000_000
+    supply_Mm3_yr = supply_m3_d * 365 / 1_000_000
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        service_time = np.where(
+            supply_m3_d >= demand_m3_d,
+            SERVICE_HOURS_MAX,
+            np.round(SERVICE_HOURS_MAX * supply_m3_d / demand_m3_d, 1),
+        )
+        supply_security = np.where(demand_Mm3_yr > 0, supply_Mm3_yr / demand_Mm3_yr * 100, 0)
+
+    return {
+        'consumption_capita':   consumption,
+        'consumption_percent':  np.minimum(consumption / MAX_CONSUMPTION * 100, 100),
+        'total_demand_Mm3':     np.round(demand_Mm3_yr, 2),
+        'total_demand_percent': (
+            np.round(np.minimum(demand_Mm3_yr / available * 100, 100), 1) if available
+            else np.zeros_like(consumption)
+        ),
+        'supply_security':      supply_security,
+        'service_time':         service_time,
+        'service_time_percent': np.round(service_time / SERVICE_HOURS_MAX * 100, 1),
+    }
+
+
+def _scenario_data(request, location, year):
+    """Snapshot of the scenario token if still cached, else the (cached) bundle."""
+    data = bundle_cache.get_scenario(location, year, request.GET.get('token'))
+    if data is None:
+        data = bundle_cache.get_or_build(location, year, _get_province_data)
+    return data if data is not None else MOCK_DATA
+
+
 # ── views ─────────────────────────────────────────────────────────────
 def water_indicators(request, location, year):
-    data = _get_province_data(location, year)
+    data = bundle_cache.get_or_build(location, year, _get_province_data)
     if data is None:
         data = MOCK_DATA
 
     context = {
-        'Province':   data['province'],
-        'year':       year,
-        'indicators': _build_indicators(data),
+        'Province':       data['province'],
+        'year':           year,
+        'indicators':     _build_indicators(data),
+        # Slider recalculations reuse this snapshot instead of querying again
+        'scenario_token': bundle_cache.open_scenario(location, year, data) if data is not MOCK_DATA else None,
     }
 
     if request.headers.get('HX-Request'):
@@ -245,10 +262,91 @@ def water_indicators(request, location, year):
 
 def recalculate_indicators(request, location, year):
     consumption = float(request.GET.get('consumption', 120))
-    data = _get_province_data(location, year)
-    if data is None:
-        data = MOCK_DATA
+    data = _scenario_data(request, location, year)
 
     indicators = _build_indicators(data, consumption_override=consumption)
 
     return render(request, 'watersupply/partials/indicators_grid.html', {'indicators': indicators})
+
+
+def indicator_curve(request, location, year):
+    """
+    Consumption-dependent indicators for a whole vector of consumption values
+    in one call, e.g. ?token=...&consumption=80,100,120 (or repeated
+    consumption parameters).
+    """
+    try:
+        consumption = [
+            float(value)
+            for param in request.GET.getlist('consumption')
+            for value in param.split(',') if value.strip()
+        ]
+    except ValueError:
+        return JsonResponse({"error": "consumption must be numeric"}, status=400)
+    if not consumption:
+        return JsonResponse({"error": "consumption is required"}, status=400)
+    if len(consumption) > MAX_CURVE_POINTS:
+        return JsonResponse({"error": f"At most {MAX_CURVE_POINTS} consumption values"}, status=400)
+
+    data = _scenario_data(request, location, year)
+    curves = _build_indicator_curves(data, consumption)
+
+    return JsonResponse({
+        'location':   location,
+        'year':       year,
+        'indicators': {name: values.tolist() for name, values in curves.items()},
+    })
+
+
+@require_POST
+def well_scenarios(request, location):
+    """
+    Evaluate well on/off and flow scenarios for a province in memory.
+
+    POST JSON: scenarios (list of {"off": [well ids], "on": [well ids],
+    "flow_m3_s": {well id: m3/s}}) and/or single_outages (true: one scenario
+    per well switched off). Nothing is written to the database.
+    """
+    try:
+        body = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON"}, status=400)
+
+    try:
+        province = PM.objects.get(ProvinceName=location)
+    except PM.DoesNotExist:
+        return JsonResponse({"error": f"Province '{location}' not found"}, status=404)
+
+    network = WellNetwork.for_province(province)
+    try:
+        pairs = [
+            network.scenario(
+                off=s.get('off', []),
+                on=s.get('on', []),
+                flow_m3_s={int(k): float(v) for k, v in s.get('flow_m3_s', {}).items()},
+            )
+            for s in body.get('scenarios', [])
+        ]
+    except (KeyError, TypeError, ValueError, AttributeError) as e:
+        return JsonResponse({"error": f"Invalid scenario: {e}"}, status=400)
+
+    active = [a for a, _ in pairs]
+    flow = [f for _, f in pairs]
+    if body.get('single_outages'):
+        outages = network.single_outages()
+        active.extend(outages)
+        flow.extend([network.flow_m3_s] * len(outages))
+    if not active:
+        return JsonResponse({"error": "No scenarios given"}, status=400)
+    if len(active) > MAX_SCENARIOS:
+        return JsonResponse({"error": f"At most {MAX_SCENARIOS} scenarios"}, status=400)
+
+    baseline = network.evaluate()
+    results = network.evaluate(np.array(active), np.array(flow))
+
+    return JsonResponse({
+        'location': location,
+        'wells':    [{'id': int(i), 'name': n} for i, n in zip(network.ids, network.names)],
+        'baseline': {name: values[0].item() for name, values in baseline.items()},
+        'results':  {name: values.tolist() for name, values in results.items()},
+    })
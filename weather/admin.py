@@ -5,7 +5,11 @@ from weather.models import *
 # Register your models here.
 admin.site.register(WeatherStation)
 admin.site.register(Meteorology)
+admin.site.register(MeteorologyRollup)
+admin.site.register(MeteorologyLatest)
 admin.site.register(PrecipitationRaster)
 admin.site.register(TemperatureRaster)
 admin.site.register(WindSpeedRaster)
 admin.site.register(HumidityRaster)
+admin.site.register(WeatherCube)
+admin.site.register(RasterGenerationJob)
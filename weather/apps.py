@@ -4,7 +4,3 @@ from django.apps import AppConfig
 class WeatherConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "weather"
-    
-    def ready(self):
-        import weather.signals
-        return super().ready()
@@ -0,0 +1,308 @@
+"""
+Batch generation of interpolated weather rasters over a time range.
+
+All Meteorology rows needed for the whole range are fetched in one query and
+sliced per timestep in memory; the interpolation itself runs in a process
+pool (pure numpy / rasterio, no DB access in the workers), one job per
+timestep covering every variable of that hour. Records are
+created in the parent process as results come back.
+"""
+from concurrent.futures import as_completed
+from datetime import datetime, timedelta
+
+import numpy as np
+from django.db import connections, transaction
+from django.utils import timezone
+
+from core.crossValidation import select_method, points_sample
+from core.rasterOperations import interpolate_rasters_windowed
+from weather.models import (
+    Meteorology, TemperatureRaster, PrecipitationRaster,
+    HumidityRaster, WindSpeedRaster, RasterGenerationJob,
+)
+from weather.workers import worker_pool
+
+
+RASTER_MODELS = {
+    'TemperatureRaster': TemperatureRaster,
+    'PrecipitationRaster': PrecipitationRaster,
+    'HumidityRaster': HumidityRaster,
+    'WindSpeedRaster': WindSpeedRaster,
+}
+
+STEPS = {
+    'hourly': timedelta(hours=1),
+    'daily': timedelta(days=1),
+}
+
+
+def timesteps(start, end, step='hourly'):
+    """Datetimes from start to end (inclusive) every step."""
+    delta = STEPS[step]
+    current = start
+    while current <= end:
+        yield current
+        current += delta
+
+
+def count_timesteps(start, end, step='hourly'):
+    """Number of datetimes timesteps() yields, without walking the range."""
+    if end < start:
+        return 0
+    return (end - start) // STEPS[step] + 1
+
+
+def fetch_measurements(start, end, time_window_hours, fields):
+    """
+    One query for every active-station measurement between
+    ``start - window`` and ``end + window``.
+
+    Returns:
+        dict of numpy arrays sorted by time: 'station', 'x', 'y', 'ts'
+        (POSIX seconds) and one float array per field (NaN for nulls).
+    """
+    window = timedelta(hours=time_window_hours)
+    rows = list(
+        Meteorology.objects
+        .filter(
+            date__gte=start - window,
+            date__lte=end + window,
+            station__is_active=True,
+        )
+        .order_by('date')
+        .values_list('station_id', 'station__geom', 'date', *fields)
+    )
+
+    data = {
+        'station': np.array([r[0] for r in rows], dtype=np.int64),
+        'x': np.array([r[1].x for r in rows], dtype=float),
+        'y': np.array([r[1].y for r in rows], dtype=float),
+        'ts': np.array([r[2].timestamp() for r in rows], dtype=float),
+    }
+    for i, field in enumerate(fields, start=3):
+        data[field] = np.array([np.nan if r[i] is None else r[i] for r in rows], dtype=float)
+    return data
+
+
+def reduce_by_station(station, x, y, values, aggregation='mean'):
+    """
+    Collapse time-sorted readings to one value per station.
+
+    Mirrors the SQL reductions of Meteorology.station_window_values:
+    'mean', 'sum' or 'last' (latest reading).
+
+    Returns:
+        tuple of arrays: (station ids, x, y, values)
+    """
+    ids, first, inverse = np.unique(station, return_index=True, return_inverse=True)
+    if aggregation == 'mean':
+        reduced = np.bincount(inverse, weights=values) / np.bincount(inverse)
+    elif aggregation == 'sum':
+        reduced = np.bincount(inverse, weights=values, minlength=len(ids))
+    elif aggregation == 'last':
+        last = np.zeros(len(ids), dtype=np.int64)
+        np.maximum.at(last, inverse, np.arange(len(station)))
+        reduced = values[last]
+    else:
+        raise ValueError(f"Unknown aggregation '{aggregation}'")
+    return ids, x[first], y[first], reduced
+
+
+def station_data_at(data, field, when, time_window_hours, aggregation='mean'):
+    """
+    Slice the prefetched arrays to the window around ``when`` for one field
+    and reduce them to one point per station.
+
+    Returns:
+        tuple: (station_data list of {'x', 'y', 'value'}, station ids)
+    """
+    window = time_window_hours * 3600
+    t = when.timestamp()
+    lo = np.searchsorted(data['ts'], t - window, side='left')
+    hi = np.searchsorted(data['ts'], t + window, side='right')
+
+    values = data[field][lo:hi]
+    keep = ~np.isnan(values)
+    ids, xs, ys, vs = reduce_by_station(
+        data['station'][lo:hi][keep],
+        data['x'][lo:hi][keep],
+        data['y'][lo:hi][keep],
+        values[keep],
+        aggregation,
+    )
+
+    station_data = [{'x': x, 'y': y, 'value': v} for x, y, v in zip(xs, ys, vs)]
+    return station_data, ids.tolist()
+
+
+def _interpolate_job(job):
+    """
+    Process-pool worker: interpolate the variables of one timestep that share
+    a method, one GeoTIFF (or final COG) each. Variables on the same station
+    layout share the IDW weights (see core.interpolationWeights).
+    """
+    keys, point_sets, bounds, resolution, method, method_params, cog_paths = job
+    paths = interpolate_rasters_windowed(
+        point_sets,
+        values='value',
+        bounds=bounds,
+        resolution=resolution,
+        method=method,
+        dst_paths=cog_paths,
+        cog=cog_paths[0] is not None,
+        **method_params,
+        **({'cache_weights': True} if method == 'idw' else {})
+    )
+    return list(zip(keys, paths))
+
+
+def generate_range(model_names, province, start, end, step='hourly',
+                   resolution=10, method='idw', time_window_hours=1,
+                   workers=None, cog_only=False, log=print):
+    """
+    Generate rasters for every model in ``model_names`` and every timestep.
+
+    Args:
+        model_names: keys of RASTER_MODELS
+        province: common.Province used for bounds and the Province FK
+        start, end: aware datetimes (inclusive)
+        step: 'hourly' or 'daily'
+        workers: process count (default: os.cpu_count())
+        cog_only: write COGs directly and leave the raster column empty
+
+    Returns:
+        dict with 'created' (list of (model name, id)) and 'skipped'
+        (list of (model name, iso datetime, reason)).
+    """
+    models = {name: RASTER_MODELS[name] for name in model_names}
+    fields = {name: Model()._get_field_name() for name, Model in models.items()}
+    aggregations = {name: Model()._get_aggregation() for name, Model in models.items()}
+    bounds = province.geom.extent
+
+    data = fetch_measurements(start, end, time_window_hours, sorted(set(fields.values())))
+
+    groups = {}
+    context = {}
+    skipped = []
+    for when in timesteps(start, end, step):
+        for name in models:
+            station_data, station_ids = station_data_at(
+                data, fields[name], when, time_window_hours, aggregations[name]
+            )
+            if not station_data:
+                skipped.append((name, when.isoformat(), f"no {fields[name]} measurements"))
+                continue
+            key = (name, when)
+            used, params, cross_validation = select_method([points_sample(station_data)], method)
+            context[key] = (station_data, station_ids, used, cross_validation)
+            cog_path = models[name]()._cog_output_path(when) if cog_only else None
+            group = groups.setdefault((when, used, tuple(sorted(params.items()))), ([], [], []))
+            for members, item in zip(group, (key, station_data, cog_path)):
+                members.append(item)
+
+    jobs = [
+        (keys, point_sets, bounds, resolution, used, dict(params), cog_paths)
+        for (_, used, params), (keys, point_sets, cog_paths) in groups.items()
+    ]
+    created = []
+    if not jobs:
+        return {'created': created, 'skipped': skipped}
+
+    # Forked workers must not inherit the parent's DB sockets
+    connections.close_all()
+
+    with worker_pool(workers) as pool:
+        futures = {pool.submit(_interpolate_job, job): job[0] for job in jobs}
+        for future in as_completed(futures):
+            try:
+                results = future.result()
+            except Exception as e:
+                for name, when in futures[future]:
+                    skipped.append((name, when.isoformat(), f"interpolation failed: {e}"))
+                log(f"  ✗ interpolation failed ({len(futures[future])} rasters): {e}")
+                continue
+
+            for (name, when), path in results:
+                station_data, station_ids, used, cross_validation = context[(name, when)]
+                Model = models[name]
+                raster = Model(
+                    name=f"{Model._meta.verbose_name} - {province.ProvinceName}",
+                    date=when,
+                    Province=province,
+                )
+                try:
+                    raster._store_interpolated_raster(
+                        path, station_data, station_ids,
+                        when, bounds, resolution, used,
+                        cog_only=cog_only, cross_validation=cross_validation,
+                    )
+                except Exception as e:
+                    skipped.append((name, when.isoformat(), str(e)))
+                    log(f"  ✗ {name} {when.isoformat()}: {e}")
+                    continue
+
+                created.append((name, raster.id))
+                log(f"  ✓ {name} {when.isoformat()} → id={raster.id}")
+
+    return {'created': created, 'skipped': skipped}
+
+
+def _result_json(result):
+    return {
+        "created": [{"model": name, "id": pk} for name, pk in result['created']],
+        "skipped": [{"model": name, "datetime": when, "reason": reason} for name, when, reason in result['skipped']],
+    }
+
+
+def run_queued_jobs(workers=None, log=print):
+    """
+    Run the RasterGenerationJobs queued through the API, oldest first.
+
+    Each job is claimed with SELECT ... FOR UPDATE SKIP LOCKED, so several
+    runners can drain the queue side by side.
+
+    Returns:
+        Number of jobs run.
+    """
+    ran = 0
+    while True:
+        with transaction.atomic():
+            job = (
+                RasterGenerationJob.objects.select_for_update(skip_locked=True)
+                .filter(status=RasterGenerationJob.Status.QUEUED)
+                .select_related('Province')
+                .order_by('requested_at', 'id')
+                .first()
+            )
+            if job is None:
+                return ran
+            job.status = RasterGenerationJob.Status.RUNNING
+            job.started_at = timezone.now()
+            job.save(update_fields=['status', 'started_at'])
+
+        params = job.params
+        log(f"Job {job.id}: {params['start']} → {params['end']} ({job.Province.ProvinceName})")
+        try:
+            result = generate_range(
+                params['models'],
+                job.Province,
+                datetime.fromisoformat(params['start']),
+                datetime.fromisoformat(params['end']),
+                step=params['step'],
+                resolution=params['resolution'],
+                method=params['method'],
+                time_window_hours=params['window_hours'],
+                workers=workers,
+                cog_only=params['cog_only'],
+                log=log,
+            )
+        except Exception as e:
+            job.status = RasterGenerationJob.Status.FAILED
+            job.error = str(e)
+            log(f"  ✗ job {job.id} failed: {e}")
+        else:
+            job.status = RasterGenerationJob.Status.DONE
+            job.result = _result_json(result)
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'error', 'result', 'finished_at'])
+        ran += 1
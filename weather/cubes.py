@@ -0,0 +1,162 @@
+"""
+Weather cubes: one period (a day by default) of an interpolated variable
+packed into a single multi-band COG, one band per timestep.
+
+Measurements for the whole range are fetched once (see weather.batch); each
+cube is interpolated band by band into one file inside a process pool, and
+the per-pixel period aggregates (min / max / mean / sum) are computed in a
+single pass over the finished cube.
+"""
+import os
+from concurrent.futures import as_completed
+from datetime import timedelta
+
+from django.db import connections
+
+from core.crossValidation import select_method, points_sample
+from core.rasterOperations import (
+    COG_DIRECTORY, BAND_AGGREGATES, interpolate_cube_windowed, band_aggregates,
+)
+from weather.batch import RASTER_MODELS, STEPS, timesteps, fetch_measurements, station_data_at
+from weather.models import WeatherCube
+from weather.workers import worker_pool
+
+
+def cube_paths(model_name, province, period_start):
+    """(cube path, aggregate path) under cogs/weather/cubes/."""
+    cube_dir = os.path.join(COG_DIRECTORY, 'weather', 'cubes')
+    os.makedirs(cube_dir, exist_ok=True)
+    stem = f"{model_name}_{province.pk}_{period_start:%Y%m%dT%H%M}"
+    return (
+        os.path.join(cube_dir, f"{stem}.tif"),
+        os.path.join(cube_dir, f"{stem}_aggregates.tif"),
+    )
+
+
+def periods(start, end, period_hours=24):
+    """Period start datetimes from start up to end (exclusive)."""
+    delta = timedelta(hours=period_hours)
+    current = start
+    while current < end:
+        yield current
+        current += delta
+
+
+def _build_cube_job(job):
+    """Process-pool worker: write one cube COG and its aggregates COG."""
+    key, band_points, band_times, bounds, resolution, method, method_params, cube_path, aggregate_path = job
+    interpolate_cube_windowed(
+        band_points,
+        values='value',
+        bounds=bounds,
+        resolution=resolution,
+        method=method,
+        dst_path=cube_path,
+        cog=True,
+        band_descriptions=band_times,
+        **method_params
+    )
+    _, band_stats = band_aggregates(cube_path, aggregate_path, cog=True)
+    return key, band_stats
+
+
+def build_cubes(model_names, province, start, end, period_hours=24, step='hourly',
+                resolution=10, method='idw', time_window_hours=1,
+                workers=None, log=print):
+    """
+    Build one WeatherCube per model and period between start and end.
+
+    Timesteps without measurements are left out of the cube; a period
+    without any measurement is skipped. Existing cubes for the same
+    (model, province, period start) are replaced.
+
+    Returns:
+        dict with 'created' (list of (model name, id)) and 'skipped'
+        (list of (model name, iso datetime, reason)).
+    """
+    models = {name: RASTER_MODELS[name]() for name in model_names}
+    fields = {name: raster._get_field_name() for name, raster in models.items()}
+    period = timedelta(hours=period_hours)
+    bounds = province.geom.extent
+
+    starts = list(periods(start, end, period_hours))
+    if not starts:
+        return {'created': [], 'skipped': []}
+    last_step = starts[-1] + period - STEPS[step]
+    data = fetch_measurements(start, last_step, time_window_hours, sorted(set(fields.values())))
+
+    jobs = []
+    context = {}
+    skipped = []
+    for period_start in starts:
+        for name, raster in models.items():
+            band_points, band_times, station_ids = [], [], set()
+            for when in timesteps(period_start, period_start + period - STEPS[step], step):
+                station_data, ids = station_data_at(
+                    data, fields[name], when, time_window_hours, raster._get_aggregation()
+                )
+                if station_data:
+                    band_points.append(station_data)
+                    band_times.append(when.isoformat())
+                    station_ids.update(ids)
+            if not band_points:
+                skipped.append((name, period_start.isoformat(), f"no {fields[name]} measurements"))
+                continue
+            key = (name, period_start)
+            # One method for the whole cube, scored over all its timesteps
+            used, params, cross_validation = select_method(
+                [points_sample(points) for points in band_points], method
+            )
+            cube_path, aggregate_path = cube_paths(name, province, period_start)
+            context[key] = (band_times, sorted(station_ids), cube_path, aggregate_path, used, cross_validation)
+            jobs.append((key, band_points, band_times, bounds, resolution, used, params, cube_path, aggregate_path))
+
+    created = []
+    if not jobs:
+        return {'created': created, 'skipped': skipped}
+
+    # Forked workers must not inherit the parent's DB sockets
+    connections.close_all()
+
+    with worker_pool(workers) as pool:
+        futures = {pool.submit(_build_cube_job, job): job[0] for job in jobs}
+        for future in as_completed(futures):
+            try:
+                (name, period_start), band_stats = future.result()
+            except Exception as e:
+                name, period_start = futures[future]
+                skipped.append((name, period_start.isoformat(), f"cube build failed: {e}"))
+                log(f"  ✗ {name} cube {period_start.isoformat()} failed: {e}")
+                continue
+
+            band_times, station_ids, cube_path, aggregate_path, used, cross_validation = context[(name, period_start)]
+            valid = [s for s in band_stats if s['mean'] is not None]
+            cube, _ = WeatherCube.objects.update_or_create(
+                raster_model=name,
+                Province=province,
+                period_start=period_start,
+                defaults={
+                    'variable': fields[name],
+                    'period_end': period_start + period,
+                    'band_times': band_times,
+                    'cog_path': cube_path.replace("\\", "/"),
+                    'aggregate_path': aggregate_path.replace("\\", "/"),
+                    'bounds': models[name]._bounds_to_polygon(bounds),
+                    'resolution_m': resolution,
+                    'interpolation_method': used,
+                    'metadata': {
+                        'unit': models[name]._get_metadata_keys()[3],
+                        'num_stations': len(station_ids),
+                        'aggregate_bands': list(BAND_AGGREGATES),
+                        'bands': [{'time': t, **s} for t, s in zip(band_times, band_stats)],
+                        'min': min((s['min'] for s in valid), default=None),
+                        'max': max((s['max'] for s in valid), default=None),
+                        'mean': sum(s['mean'] for s in valid) / len(valid) if valid else None,
+                        'cross_validation': cross_validation,
+                    },
+                },
+            )
+            created.append((name, cube.id))
+            log(f"  ✓ {name} cube {period_start.isoformat()} ({len(band_times)} bands) → id={cube.id}")
+
+    return {'created': created, 'skipped': skipped}
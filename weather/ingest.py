@@ -0,0 +1,157 @@
+"""
+Bulk ingest of Meteorology observations.
+
+Observations arrive as DataFrames (from CSV / Parquet files or HTTP
+batches), are validated column-wise with pandas and written with
+PostgreSQL COPY into the partitioned weather_meteorology table. The hourly
+and daily rollups and the latest-value table are updated in the same
+statement (see weather/rollups.py).
+"""
+import pandas as pd
+from django.db import connection
+from django.utils import timezone
+
+from core.bulk import stage_dataframe
+from weather.models import Meteorology, WeatherStation
+from weather.rollups import ROLLUP_FIELDS, rollup_sql
+
+
+MEASUREMENT_FIELDS = [
+    'precipitation_mm',
+    'wind_speed_m_s',
+    'temperature_C',
+    'solar_radiation_W_m2',
+    'humidity_percent',
+    'vapor_pressure_hPa',
+]
+
+# Physically plausible bounds; values outside are rejected
+VALID_RANGES = {
+    'precipitation_mm': (0, 500),
+    'wind_speed_m_s': (0, 100),
+    'temperature_C': (-60, 60),
+    'solar_radiation_W_m2': (0, 1500),
+    'humidity_percent': (0, 100),
+    'vapor_pressure_hPa': (0, 100),
+}
+
+COPY_COLUMNS = ['station_id', 'date', *MEASUREMENT_FIELDS, 'created_at']
+
+
+def read_observations(path, chunksize=100_000):
+    """
+    Yield DataFrames from a CSV or Parquet file.
+
+    CSV files are streamed in ``chunksize`` rows; Parquet needs pyarrow or
+    fastparquet installed and is read whole.
+    """
+    if str(path).lower().endswith(('.parquet', '.pq')):
+        yield pd.read_parquet(path)
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+def station_lookup():
+    """Map station names and string ids to station ids."""
+    lookup = {}
+    for pk, name in WeatherStation.objects.values_list('id', 'name'):
+        lookup[str(pk)] = pk
+        lookup[name] = pk
+    return lookup
+
+
+def _station_keys(column):
+    """
+    station_lookup keys for a station column. Numeric ids are normalised
+    first: a column with gaps is read as float, and 12.0 must match '12'.
+    """
+    keys = column.astype(str).str.strip()
+    numeric = pd.to_numeric(column, errors='coerce')
+    whole = numeric.notna() & (numeric % 1 == 0)
+    keys[whole] = numeric[whole].astype('Int64').astype(str)
+    return keys
+
+
+def prepare_observations(df, lookup=None):
+    """
+    Validate and normalise a batch of observations.
+
+    Accepts either a ``station_id`` or a ``station`` (name or id) column,
+    a ``date`` column and any of MEASUREMENT_FIELDS.
+
+    Returns:
+        tuple: (clean DataFrame with COPY_COLUMNS, rejected DataFrame with a
+        ``reason`` column)
+    """
+    df = df.copy()
+    rejected = []
+
+    station_col = 'station_id' if 'station_id' in df.columns else 'station'
+    if station_col not in df.columns or 'date' not in df.columns:
+        raise ValueError("Observations need a 'station_id' (or 'station') and a 'date' column")
+
+    if lookup is None:
+        lookup = station_lookup()
+    df['station_id'] = _station_keys(df[station_col]).map(lookup)
+    bad = df['station_id'].isna()
+    rejected.append(df[bad].assign(reason='unknown station'))
+    df = df[~bad]
+
+    df['date'] = pd.to_datetime(df['date'], utc=True, errors='coerce')
+    bad = df['date'].isna()
+    rejected.append(df[bad].assign(reason='invalid date'))
+    df = df[~bad]
+
+    for field in MEASUREMENT_FIELDS:
+        if field not in df.columns:
+            df[field] = float('nan')
+        df[field] = pd.to_numeric(df[field], errors='coerce')
+
+    out_of_range = pd.Series(False, index=df.index)
+    for field, (lo, hi) in VALID_RANGES.items():
+        out_of_range |= (df[field] < lo) | (df[field] > hi)
+    rejected.append(df[out_of_range].assign(reason='value out of range'))
+    df = df[~out_of_range]
+
+    empty = df[MEASUREMENT_FIELDS].isna().all(axis=1)
+    rejected.append(df[empty].assign(reason='no measurements'))
+    df = df[~empty]
+
+    # Keep the last reading when a batch repeats (station, date)
+    df = df.drop_duplicates(subset=['station_id', 'date'], keep='last')
+
+    df['station_id'] = df['station_id'].astype('int64')
+    df['created_at'] = timezone.now()
+
+    rejected = pd.concat(rejected) if rejected else pd.DataFrame()
+    return df[COPY_COLUMNS], rejected
+
+
+def load_observations(df, skip_duplicates=True):
+    """
+    COPY a prepared batch into Meteorology, creating partitions as needed,
+    and fold the inserted rows into the rollup tables.
+
+    Returns:
+        Number of rows inserted.
+    """
+    if df.empty:
+        return 0
+
+    Meteorology.ensure_partitions(df['date'].min(), df['date'].max())
+
+    table = connection.ops.quote_name(Meteorology._meta.db_table)
+    column_sql = ', '.join(connection.ops.quote_name(c) for c in COPY_COLUMNS)
+    returning = ', '.join(connection.ops.quote_name(c) for c in ['station_id', 'date', *ROLLUP_FIELDS])
+    on_conflict = "ON CONFLICT (station_id, date) DO NOTHING" if skip_duplicates else ""
+
+    with connection.cursor() as cursor:
+        staging = stage_dataframe(cursor, Meteorology._meta.db_table, df, COPY_COLUMNS)
+        cursor.execute(rollup_sql(
+            f"INSERT INTO {table} ({column_sql}) "
+            f"SELECT {column_sql} FROM {connection.ops.quote_name(staging)} "
+            f"{on_conflict} RETURNING {returning}"
+        ))
+        inserted = cursor.fetchone()[0]
+        cursor.execute(f"DROP TABLE {connection.ops.quote_name(staging)}")
+    return inserted
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from common.models import Province
+from weather.batch import RASTER_MODELS, STEPS
+from weather.cubes import build_cubes
+from weather.management.commands.generate_weather_rasters import _parse_datetime
+
+
+class Command(BaseCommand):
+    help = 'Build multi-band weather cubes (one COG per variable and period) in a process pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--province', type=str, required=True, help='Province name (common.Province.ProvinceName)')
+        parser.add_argument('--start', type=str, required=True, help='Start of the first period, ISO format')
+        parser.add_argument('--end', type=str, required=True, help='End of the range (exclusive), ISO format')
+        parser.add_argument('--period-hours', type=int, default=24, help='Hours packed into one cube')
+        parser.add_argument('--step', choices=list(STEPS), default='hourly', help='Time between bands')
+        parser.add_argument(
+            '--model',
+            action='append',
+            choices=list(RASTER_MODELS),
+            help='Raster model to build; repeat for several (default: all)'
+        )
+        parser.add_argument('--resolution', type=float, default=10, help='Cell size in meters')
+        parser.add_argument('--method', type=str, default='idw', help='Interpolation method')
+        parser.add_argument('--window', type=float, default=1, help='Time window in hours around each step')
+        parser.add_argument('--workers', type=int, default=None, help='Number of worker processes')
+
+    def handle(self, *args, **options):
+        try:
+            province = Province.objects.get(ProvinceName=options['province'])
+        except Province.DoesNotExist:
+            raise CommandError(f"Province '{options['province']}' not found")
+
+        start = _parse_datetime(options['start'])
+        end = _parse_datetime(options['end'])
+        if end <= start:
+            raise CommandError("--end must be after --start")
+
+        result = build_cubes(
+            options['model'] or list(RASTER_MODELS),
+            province,
+            start,
+            end,
+            period_hours=options['period_hours'],
+            step=options['step'],
+            resolution=options['resolution'],
+            method=options['method'],
+            time_window_hours=options['window'],
+            workers=options['workers'],
+            log=self.stdout.write,
+        )
+
+        for name, when, reason in result['skipped']:
+            self.stderr.write(f"  - skipped {name} {when}: {reason}")
+        self.stdout.write(self.style.SUCCESS(
+            f"\nDone! {len(result['created'])} cubes built, {len(result['skipped'])} skipped."
+        ))
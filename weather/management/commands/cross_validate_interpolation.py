@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.crossValidation import cross_validate, points_sample
+from weather.batch import RASTER_MODELS, STEPS, timesteps, fetch_measurements, station_data_at
+from weather.management.commands.generate_weather_rasters import _parse_datetime
+
+
+class Command(BaseCommand):
+    help = 'Rank interpolation methods per weather variable by leave-one-out RMSE / MAE'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=str, required=True, help='First timestep, ISO format')
+        parser.add_argument('--end', type=str, required=True, help='Last timestep, ISO format')
+        parser.add_argument('--step', choices=list(STEPS), default='hourly', help='Time between samples')
+        parser.add_argument(
+            '--model',
+            action='append',
+            choices=list(RASTER_MODELS),
+            help='Raster model to score; repeat for several (default: all)'
+        )
+        parser.add_argument('--window', type=float, default=1, help='Time window in hours around each step')
+
+    def handle(self, *args, **options):
+        start = _parse_datetime(options['start'])
+        end = _parse_datetime(options['end'])
+        if end < start:
+            raise CommandError("--end must not be before --start")
+
+        models = {name: RASTER_MODELS[name]() for name in options['model'] or list(RASTER_MODELS)}
+        fields = {name: raster._get_field_name() for name, raster in models.items()}
+        data = fetch_measurements(start, end, options['window'], sorted(set(fields.values())))
+        whens = list(timesteps(start, end, options['step']))
+
+        for name, raster in models.items():
+            samples = []
+            for when in whens:
+                station_data, _ = station_data_at(
+                    data, fields[name], when, options['window'], raster._get_aggregation()
+                )
+                if station_data:
+                    samples.append(points_sample(station_data))
+
+            self.stdout.write(f"\n{name} ({len(samples)} timesteps)")
+            scores = cross_validate(samples)
+            if scores[0]['rmse'] is None:
+                self.stdout.write("  ⚠️ not enough stations to cross-validate")
+                continue
+            for score in scores:
+                params = ', '.join(f"{k}={v}" for k, v in score['params'].items())
+                label = f"{score['method']}({params})" if params else score['method']
+                if score['rmse'] is None:
+                    self.stdout.write(f"    {label:<32} -")
+                else:
+                    self.stdout.write(
+                        f"    {label:<32} RMSE {score['rmse']:.4f}  MAE {score['mae']:.4f}  n={score['n']}"
+                    )
+            self.stdout.write(f"  ✓ best: {scores[0]['method']}")
+
+        self.stdout.write(self.style.SUCCESS("\nDone!"))
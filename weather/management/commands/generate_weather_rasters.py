@@ -0,0 +1,87 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from common.models import Province
+from weather.batch import RASTER_MODELS, STEPS, generate_range, run_queued_jobs
+
+
+def _parse_datetime(value):
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f"Invalid datetime '{value}', use ISO format (e.g. 2025-07-01T00:00)")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+class Command(BaseCommand):
+    help = 'Generate interpolated weather rasters for a date range in a process pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--province', type=str, help='Province name (common.Province.ProvinceName)')
+        parser.add_argument('--start', type=str, help='Start datetime, ISO format')
+        parser.add_argument('--end', type=str, help='End datetime (inclusive), ISO format')
+        parser.add_argument('--step', choices=list(STEPS), default='hourly')
+        parser.add_argument(
+            '--model',
+            action='append',
+            choices=list(RASTER_MODELS),
+            help='Raster model to generate; repeat for several (default: all)'
+        )
+        parser.add_argument('--resolution', type=float, default=10, help='Cell size in meters')
+        parser.add_argument('--method', type=str, default='idw', help='Interpolation method')
+        parser.add_argument('--window', type=float, default=1, help='Time window in hours around each step')
+        parser.add_argument('--workers', type=int, default=None, help='Number of worker processes')
+        parser.add_argument(
+            '--cog-only',
+            action='store_true',
+            help='Write COGs directly and store only metadata (no PostGIS raster)'
+        )
+        parser.add_argument(
+            '--queued',
+            action='store_true',
+            help='Run the jobs queued through the rasters/generate API instead of a range'
+        )
+
+    def handle(self, *args, **options):
+        if options['queued']:
+            ran = run_queued_jobs(workers=options['workers'], log=self.stdout.write)
+            self.stdout.write(self.style.SUCCESS(f"\nDone! {ran} queued jobs run."))
+            return
+
+        missing = [f"--{name}" for name in ('province', 'start', 'end') if not options[name]]
+        if missing:
+            raise CommandError(f"{', '.join(missing)} required unless --queued is given")
+
+        try:
+            province = Province.objects.get(ProvinceName=options['province'])
+        except Province.DoesNotExist:
+            raise CommandError(f"Province '{options['province']}' not found")
+
+        start = _parse_datetime(options['start'])
+        end = _parse_datetime(options['end'])
+        if end < start:
+            raise CommandError("--end must not be before --start")
+
+        result = generate_range(
+            options['model'] or list(RASTER_MODELS),
+            province,
+            start,
+            end,
+            step=options['step'],
+            resolution=options['resolution'],
+            method=options['method'],
+            time_window_hours=options['window'],
+            workers=options['workers'],
+            cog_only=options['cog_only'],
+            log=self.stdout.write,
+        )
+
+        for name, when, reason in result['skipped']:
+            self.stderr.write(f"  - skipped {name} {when}: {reason}")
+        self.stdout.write(self.style.SUCCESS(
+            f"\nDone! {len(result['created'])} rasters created, {len(result['skipped'])} skipped."
+        ))
@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from weather.ingest import read_observations, prepare_observations, load_observations, station_lookup
+
+
+class Command(BaseCommand):
+    help = 'Bulk-load Meteorology observations from CSV or Parquet files via PostgreSQL COPY'
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help='CSV or Parquet files')
+        parser.add_argument('--chunksize', type=int, default=100_000, help='CSV rows per COPY batch')
+        parser.add_argument(
+            '--fail-on-duplicates',
+            action='store_true',
+            help='Abort when a (station, date) already exists instead of skipping it'
+        )
+
+    def handle(self, *args, **options):
+        lookup = station_lookup()
+        total_inserted = total_rejected = 0
+        started = time.perf_counter()
+
+        for path in options['paths']:
+            self.stdout.write(f"\nLoading {path}...")
+            try:
+                chunks = read_observations(path, chunksize=options['chunksize'])
+                for chunk in chunks:
+                    clean, rejected = prepare_observations(chunk, lookup=lookup)
+                    with transaction.atomic():
+                        inserted = load_observations(clean, skip_duplicates=not options['fail_on_duplicates'])
+                    total_inserted += inserted
+                    total_rejected += len(rejected)
+                    for reason, count in rejected['reason'].value_counts().items() if len(rejected) else []:
+                        self.stderr.write(f"  - {count} rows rejected: {reason}")
+                    self.stdout.write(f"  ✓ {inserted} rows")
+            except (OSError, ValueError, ImportError) as e:
+                raise CommandError(f"{path}: {e}")
+
+        elapsed = time.perf_counter() - started
+        rate = total_inserted / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"\nDone! {total_inserted} rows inserted, {total_rejected} rejected "
+            f"in {elapsed:.1f} s ({rate:,.0f} rows/s)"
+        ))
@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from weather.rollups import rebuild_rollups, downsample_raw
+
+
+class Command(BaseCommand):
+    help = 'Rebuild Meteorology hourly/daily rollups and drop raw rows past the retention period'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='Rebuild from this ISO date/datetime (default: first raw row)')
+        parser.add_argument('--end', help='Rebuild up to this ISO date/datetime (default: last raw row)')
+        parser.add_argument(
+            '--downsample',
+            action='store_true',
+            help='Drop raw rows older than the retention period after rolling them up'
+        )
+        parser.add_argument(
+            '--retention-days',
+            type=int,
+            default=getattr(settings, 'METEOROLOGY_RAW_RETENTION_DAYS', 365),
+            help='Days of raw observations to keep when downsampling (default: 365)'
+        )
+
+    def _parse(self, value):
+        if not value:
+            return None
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            raise CommandError(f"Invalid date: {value}")
+        return parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed)
+
+    def handle(self, *args, **options):
+        start, end = self._parse(options['start']), self._parse(options['end'])
+
+        with transaction.atomic():
+            rows = rebuild_rollups(start, end)
+        self.stdout.write(f"  ✓ Rolled up {rows} raw rows")
+
+        if options['downsample']:
+            before = timezone.now() - timedelta(days=options['retention_days'])
+            with transaction.atomic():
+                result = downsample_raw(before)
+            for name in result['partitions_dropped']:
+                self.stdout.write(f"  - dropped partition {name}")
+            self.stdout.write(
+                f"  ✓ Deleted {result['rows_deleted']} raw rows older than {before:%Y-%m-%d}"
+            )
+
+        self.stdout.write(self.style.SUCCESS("\nDone!"))
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.12 on 2026-10-19 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("weather", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="humidityraster",
+            name="interpolation_method",
+            field=models.CharField(
+                choices=[
+                    ("idw", "Inverse Distance Weighting"),
+                    ("linear", "Local Linear RBF"),
+                    ("kriging", "Ordinary Kriging"),
+                    ("spline", "Local Thin-Plate Spline"),
+                ],
+                default="idw",
+                help_text="Spatial interpolation method used",
+                max_length=50,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="precipitationraster",
+            name="interpolation_method",
+            field=models.CharField(
+                choices=[
+                    ("idw", "Inverse Distance Weighting"),
+                    ("linear", "Local Linear RBF"),
+                    ("kriging", "Ordinary Kriging"),
+                    ("spline", "Local Thin-Plate Spline"),
+                ],
+                default="idw",
+                help_text="Spatial interpolation method used",
+                max_length=50,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="temperatureraster",
+            name="interpolation_method",
+            field=models.CharField(
+                choices=[
+                    ("idw", "Inverse Distance Weighting"),
+                    ("linear", "Local Linear RBF"),
+                    ("kriging", "Ordinary Kriging"),
+                    ("spline", "Local Thin-Plate Spline"),
+                ],
+                default="idw",
+                help_text="Spatial interpolation method used",
+                max_length=50,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="windspeedraster",
+            name="interpolation_method",
+            field=models.CharField(
+                choices=[
+                    ("idw", "Inverse Distance Weighting"),
+                    ("linear", "Local Linear RBF"),
+                    ("kriging", "Ordinary Kriging"),
+                    ("spline", "Local Thin-Plate Spline"),
+                ],
+                default="idw",
+                help_text="Spatial interpolation method used",
+                max_length=50,
+            ),
+        ),
+    ]
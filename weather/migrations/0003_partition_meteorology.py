@@ -0,0 +1,175 @@
+# Converts weather_meteorology into a monthly range-partitioned table on
+# `date` with a BRIN index, so time-window queries only scan the relevant
+# partitions. Django keeps treating `id` as the primary key; in the database
+# the key is (id, date) because PostgreSQL requires the partition key in it.
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+FORWARD_SQL = r"""
+ALTER TABLE weather_meteorology RENAME TO weather_meteorology_unpartitioned;
+
+CREATE SEQUENCE weather_meteorology_part_id_seq AS bigint;
+
+CREATE TABLE weather_meteorology (
+    id bigint NOT NULL DEFAULT nextval('weather_meteorology_part_id_seq'),
+    date timestamp with time zone NOT NULL,
+    precipitation_mm double precision NULL,
+    wind_speed_m_s double precision NULL,
+    "temperature_C" double precision NULL,
+    "solar_radiation_W_m2" double precision NULL,
+    humidity_percent double precision NULL,
+    "vapor_pressure_hPa" double precision NULL,
+    created_at timestamp with time zone NOT NULL,
+    station_id integer NOT NULL
+        REFERENCES weather_weatherstation (id) DEFERRABLE INITIALLY DEFERRED,
+    PRIMARY KEY (id, date),
+    CONSTRAINT weather_meteorology_station_id_date_uniq UNIQUE (station_id, date)
+) PARTITION BY RANGE (date);
+
+ALTER SEQUENCE weather_meteorology_part_id_seq OWNED BY weather_meteorology.id;
+
+-- Catch-all for rows outside any monthly partition
+CREATE TABLE weather_meteorology_default PARTITION OF weather_meteorology DEFAULT;
+
+CREATE INDEX weather_met_date_brin ON weather_meteorology
+    USING brin (date) WITH (pages_per_range = 32);
+CREATE INDEX weather_meteorology_station_id_idx ON weather_meteorology (station_id);
+
+-- Create the monthly partition holding `ts` if it does not exist yet.
+-- Rows already parked in the default partition for that month are moved in.
+CREATE OR REPLACE FUNCTION weather_meteorology_ensure_partition(ts timestamptz)
+RETURNS text LANGUAGE plpgsql AS $$
+DECLARE
+    month_start timestamptz := date_trunc('month', ts AT TIME ZONE 'UTC') AT TIME ZONE 'UTC';
+    month_end   timestamptz := month_start + interval '1 month';
+    part_name   text := 'weather_meteorology_' || to_char(month_start AT TIME ZONE 'UTC', 'YYYYMM');
+BEGIN
+    IF to_regclass(part_name) IS NOT NULL THEN
+        RETURN part_name;
+    END IF;
+
+    DROP TABLE IF EXISTS pg_temp.weather_meteorology_moved;
+    CREATE TEMP TABLE weather_meteorology_moved AS
+        SELECT * FROM weather_meteorology_default
+        WHERE date >= month_start AND date < month_end;
+    DELETE FROM weather_meteorology_default
+        WHERE date >= month_start AND date < month_end;
+
+    EXECUTE format(
+        'CREATE TABLE %I PARTITION OF weather_meteorology FOR VALUES FROM (%L) TO (%L)',
+        part_name, month_start, month_end
+    );
+
+    INSERT INTO weather_meteorology SELECT * FROM pg_temp.weather_meteorology_moved;
+    DROP TABLE pg_temp.weather_meteorology_moved;
+    RETURN part_name;
+END $$;
+
+-- Partitions for every month with data, plus the next two years
+SELECT weather_meteorology_ensure_partition(m)
+FROM (
+    SELECT DISTINCT date_trunc('month', date AT TIME ZONE 'UTC') AT TIME ZONE 'UTC' AS m
+    FROM weather_meteorology_unpartitioned
+    UNION
+    SELECT generate_series(
+        date_trunc('month', now()),
+        date_trunc('month', now()) + interval '24 months',
+        interval '1 month'
+    )
+) months;
+
+INSERT INTO weather_meteorology (
+    id, date, precipitation_mm, wind_speed_m_s, "temperature_C",
+    "solar_radiation_W_m2", humidity_percent, "vapor_pressure_hPa",
+    created_at, station_id
+)
+SELECT
+    id, date, precipitation_mm, wind_speed_m_s, "temperature_C",
+    "solar_radiation_W_m2", humidity_percent, "vapor_pressure_hPa",
+    created_at, station_id
+FROM weather_meteorology_unpartitioned;
+
+SELECT setval(
+    'weather_meteorology_part_id_seq',
+    COALESCE((SELECT max(id) FROM weather_meteorology), 0) + 1,
+    false
+);
+
+DROP TABLE weather_meteorology_unpartitioned;
+"""
+
+REVERSE_SQL = r"""
+CREATE TABLE weather_meteorology_plain (
+    id bigint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    date timestamp with time zone NOT NULL,
+    precipitation_mm double precision NULL,
+    wind_speed_m_s double precision NULL,
+    "temperature_C" double precision NULL,
+    "solar_radiation_W_m2" double precision NULL,
+    humidity_percent double precision NULL,
+    "vapor_pressure_hPa" double precision NULL,
+    created_at timestamp with time zone NOT NULL,
+    station_id integer NOT NULL
+        REFERENCES weather_weatherstation (id) DEFERRABLE INITIALLY DEFERRED,
+    CONSTRAINT weather_meteorology_plain_station_id_date_uniq UNIQUE (station_id, date)
+);
+
+INSERT INTO weather_meteorology_plain OVERRIDING SYSTEM VALUE
+SELECT
+    id, date, precipitation_mm, wind_speed_m_s, "temperature_C",
+    "solar_radiation_W_m2", humidity_percent, "vapor_pressure_hPa",
+    created_at, station_id
+FROM weather_meteorology;
+
+SELECT setval(
+    pg_get_serial_sequence('weather_meteorology_plain', 'id'),
+    COALESCE((SELECT max(id) FROM weather_meteorology_plain), 0) + 1,
+    false
+);
+
+DROP TABLE weather_meteorology CASCADE;
+DROP FUNCTION IF EXISTS weather_meteorology_ensure_partition(timestamptz);
+ALTER TABLE weather_meteorology_plain RENAME TO weather_meteorology;
+
+CREATE INDEX weather_meteorology_date_idx ON weather_meteorology (date);
+CREATE INDEX weather_met_date_ed8888_idx ON weather_meteorology (date, station_id);
+CREATE INDEX weather_meteorology_station_id_idx ON weather_meteorology (station_id);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("weather", "0002_alter_interpolation_method"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(FORWARD_SQL, REVERSE_SQL),
+            ],
+            state_operations=[
+                migrations.RemoveIndex(
+                    model_name="meteorology",
+                    name="weather_met_date_ed8888_idx",
+                ),
+                migrations.AlterField(
+                    model_name="meteorology",
+                    name="date",
+                    field=models.DateTimeField(
+                        help_text="Date and time of the weather data"
+                    ),
+                ),
+                migrations.AddIndex(
+                    model_name="meteorology",
+                    index=django.contrib.postgres.indexes.BrinIndex(
+                        fields=["date"],
+                        name="weather_met_date_brin",
+                        pages_per_range=32,
+                    ),
+                ),
+            ],
+        ),
+    ]
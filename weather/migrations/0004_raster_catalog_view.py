@@ -0,0 +1,78 @@
+# Replaces the per-raster views that weather.signals used to create on every
+# save (view_<model>_<id> and view_<model>_latest) with two static views over
+# all interpolated raster tables. Nothing has to run per insert any more.
+
+from django.db import migrations
+
+
+RASTER_TABLES = {
+    "TemperatureRaster": "weather_temperatureraster",
+    "PrecipitationRaster": "weather_precipitationraster",
+    "HumidityRaster": "weather_humidityraster",
+    "WindSpeedRaster": "weather_windspeedraster",
+}
+
+_CATALOG_SELECT = """
+    SELECT
+        '{layer}'::varchar AS layer,
+        id AS raster_id,
+        name || ' (' || coalesce(date::text, '') || ')' AS display_name,
+        name,
+        date,
+        raster,
+        bounds,
+        resolution_m,
+        interpolation_method,
+        cog_path,
+        "Province_id" AS province_id,
+        created_at
+    FROM {table}
+"""
+
+FORWARD_SQL = r"""
+-- Drop the legacy one-view-per-raster objects
+DO $$
+DECLARE v record;
+BEGIN
+    FOR v IN
+        SELECT viewname FROM pg_views
+        WHERE schemaname = current_schema()
+          AND viewname ~ '^view_(temperature|precipitation|humidity|windspeed)raster_'
+    LOOP
+        EXECUTE format('DROP VIEW IF EXISTS %I', v.viewname);
+    END LOOP;
+END $$;
+
+CREATE VIEW weather_raster_catalog AS
+""" + "\n    UNION ALL\n".join(
+    _CATALOG_SELECT.format(layer=layer, table=table)
+    for layer, table in RASTER_TABLES.items()
+) + r""";
+
+COMMENT ON VIEW weather_raster_catalog IS
+    'Every interpolated weather raster, one row per (layer, raster_id)';
+
+CREATE VIEW weather_raster_latest AS
+SELECT DISTINCT ON (layer) *
+FROM weather_raster_catalog
+ORDER BY layer, date DESC NULLS LAST, created_at DESC;
+
+COMMENT ON VIEW weather_raster_latest IS
+    'Most recent interpolated weather raster per layer';
+"""
+
+REVERSE_SQL = r"""
+DROP VIEW IF EXISTS weather_raster_latest;
+DROP VIEW IF EXISTS weather_raster_catalog;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("weather", "0003_partition_meteorology"),
+    ]
+
+    operations = [
+        migrations.RunSQL(FORWARD_SQL, REVERSE_SQL),
+    ]
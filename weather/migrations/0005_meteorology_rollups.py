@@ -0,0 +1,109 @@
+# Generated by Django 5.2.12 on 2026-10-19 12:00
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("weather", "0004_raster_catalog_view"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MeteorologyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "period",
+                    models.CharField(
+                        choices=[("hour", "Hourly"), ("day", "Daily")], max_length=4
+                    ),
+                ),
+                (
+                    "bucket",
+                    models.DateTimeField(help_text="Start of the hour or day (UTC)"),
+                ),
+                (
+                    "variable",
+                    models.CharField(
+                        help_text="Meteorology field name, e.g. 'temperature_C'",
+                        max_length=50,
+                    ),
+                ),
+                ("count", models.IntegerField()),
+                ("min", models.FloatField()),
+                ("max", models.FloatField()),
+                ("sum", models.FloatField()),
+                ("mean", models.FloatField()),
+                (
+                    "station",
+                    models.ForeignKey(
+                        help_text="Weather station the aggregate belongs to",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="rollups",
+                        to="weather.weatherstation",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Weather Rollup",
+                "verbose_name_plural": "Weather Rollups",
+                "indexes": [
+                    models.Index(
+                        fields=["period", "variable", "bucket"],
+                        name="weather_rollup_series_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("station", "period", "variable", "bucket"),
+                        name="unique_meteorology_rollup",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="MeteorologyLatest",
+            fields=[
+                (
+                    "station",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="latest_observation",
+                        serialize=False,
+                        to="weather.weatherstation",
+                    ),
+                ),
+                (
+                    "date",
+                    models.DateTimeField(help_text="Date and time of the observation"),
+                ),
+                ("precipitation_mm", models.FloatField(blank=True, null=True)),
+                ("wind_speed_m_s", models.FloatField(blank=True, null=True)),
+                ("temperature_C", models.FloatField(blank=True, null=True)),
+                ("solar_radiation_W_m2", models.FloatField(blank=True, null=True)),
+                ("humidity_percent", models.FloatField(blank=True, null=True)),
+                ("vapor_pressure_hPa", models.FloatField(blank=True, null=True)),
+                (
+                    "updated_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+            ],
+            options={
+                "verbose_name": "Latest Weather Measurement",
+                "verbose_name_plural": "Latest Weather Measurements",
+            },
+        ),
+    ]
@@ -0,0 +1,113 @@
+# Generated by Django 5.2.12 on 2026-10-19 14:00
+
+import django.contrib.gis.db.models.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("common", "0004_alter_district_id_alter_neighborhood_id"),
+        ("weather", "0005_meteorology_rollups"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WeatherCube",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "raster_model",
+                    models.CharField(
+                        help_text="Raster layer the bands belong to, e.g. 'TemperatureRaster'",
+                        max_length=50,
+                    ),
+                ),
+                (
+                    "variable",
+                    models.CharField(
+                        help_text="Meteorology field interpolated", max_length=50
+                    ),
+                ),
+                (
+                    "period_start",
+                    models.DateTimeField(
+                        help_text="Start of the period covered by the bands"
+                    ),
+                ),
+                (
+                    "period_end",
+                    models.DateTimeField(
+                        help_text="End of the period covered by the bands (exclusive)"
+                    ),
+                ),
+                (
+                    "band_times",
+                    models.JSONField(
+                        default=list,
+                        help_text="ISO timestamp of each band, in band order",
+                    ),
+                ),
+                ("cog_path", models.CharField(max_length=500)),
+                (
+                    "aggregate_path",
+                    models.CharField(
+                        blank=True,
+                        help_text="COG with per-pixel min / max / mean / sum bands",
+                        max_length=500,
+                        null=True,
+                    ),
+                ),
+                (
+                    "bounds",
+                    django.contrib.gis.db.models.fields.PolygonField(
+                        blank=True, null=True, srid=28992
+                    ),
+                ),
+                ("resolution_m", models.FloatField(default=10)),
+                (
+                    "interpolation_method",
+                    models.CharField(default="idw", max_length=50),
+                ),
+                (
+                    "metadata",
+                    models.JSONField(
+                        blank=True,
+                        default=dict,
+                        help_text="Per-band and period statistics",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "Province",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="Province this cube covers",
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="common.province",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Weather Cube",
+                "verbose_name_plural": "Weather Cubes",
+                "ordering": ["-period_start"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("raster_model", "Province", "period_start"),
+                        name="unique_weather_cube",
+                    )
+                ],
+            },
+        ),
+    ]
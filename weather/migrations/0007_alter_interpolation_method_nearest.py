@@ -0,0 +1,77 @@
+# Generated by Django 5.2.12 on 2026-10-19 15:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("weather", "0006_weathercube"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="humidityraster",
+            name="interpolation_method",
+            field=models.CharField(
+                choices=[
+                    ("idw", "Inverse Distance Weighting"),
+                    ("linear", "Local Linear RBF"),
+                    ("kriging", "Ordinary Kriging"),
+                    ("spline", "Local Thin-Plate Spline"),
+                    ("nearest", "Nearest Station (Thiessen)"),
+                ],
+                default="idw",
+                help_text="Spatial interpolation method used",
+                max_length=50,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="precipitationraster",
+            name="interpolation_method",
+            field=models.CharField(
+                choices=[
+                    ("idw", "Inverse Distance Weighting"),
+                    ("linear", "Local Linear RBF"),
+                    ("kriging", "Ordinary Kriging"),
+                    ("spline", "Local Thin-Plate Spline"),
+                    ("nearest", "Nearest Station (Thiessen)"),
+                ],
+                default="idw",
+                help_text="Spatial interpolation method used",
+                max_length=50,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="temperatureraster",
+            name="interpolation_method",
+            field=models.CharField(
+                choices=[
+                    ("idw", "Inverse Distance Weighting"),
+                    ("linear", "Local Linear RBF"),
+                    ("kriging", "Ordinary Kriging"),
+                    ("spline", "Local Thin-Plate Spline"),
+                    ("nearest", "Nearest Station (Thiessen)"),
+                ],
+                default="idw",
+                help_text="Spatial interpolation method used",
+                max_length=50,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="windspeedraster",
+            name="interpolation_method",
+            field=models.CharField(
+                choices=[
+                    ("idw", "Inverse Distance Weighting"),
+                    ("linear", "Local Linear RBF"),
+                    ("kriging", "Ordinary Kriging"),
+                    ("spline", "Local Thin-Plate Spline"),
+                    ("nearest", "Nearest Station (Thiessen)"),
+                ],
+                default="idw",
+                help_text="Spatial interpolation method used",
+                max_length=50,
+            ),
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.12 on 2026-10-19 16:10
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("common", "0004_alter_district_id_alter_neighborhood_id"),
+        ("weather", "0007_alter_interpolation_method_nearest"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RasterGenerationJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "params",
+                    models.JSONField(
+                        default=dict,
+                        help_text="models, start, end, step, resolution, method, window_hours, cog_only",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("queued", "Queued"),
+                            ("running", "Running"),
+                            ("done", "Done"),
+                            ("failed", "Failed"),
+                        ],
+                        default="queued",
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "result",
+                    models.JSONField(
+                        blank=True, help_text="Created and skipped rasters", null=True
+                    ),
+                ),
+                ("error", models.TextField(blank=True, default="")),
+                (
+                    "requested_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                ("started_at", models.DateTimeField(blank=True, null=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "Province",
+                    models.ForeignKey(
+                        help_text="Province whose extent is interpolated",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="common.province",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Raster Generation Job",
+                "verbose_name_plural": "Raster Generation Jobs",
+                "ordering": ["requested_at"],
+            },
+        ),
+    ]
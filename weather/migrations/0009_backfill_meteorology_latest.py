@@ -0,0 +1,38 @@
+# Fills weather_meteorologylatest from the raw observations loaded before the
+# table existed (0005). Later rows reach it through ingest and Meteorology.save.
+
+from django.db import migrations
+
+
+FORWARD_SQL = r"""
+INSERT INTO weather_meteorologylatest AS l (
+    station_id, date, precipitation_mm, wind_speed_m_s, "temperature_C",
+    "solar_radiation_W_m2", humidity_percent, "vapor_pressure_hPa", updated_at
+)
+SELECT DISTINCT ON (station_id)
+    station_id, date, precipitation_mm, wind_speed_m_s, "temperature_C",
+    "solar_radiation_W_m2", humidity_percent, "vapor_pressure_hPa", now()
+FROM weather_meteorology
+ORDER BY station_id, date DESC
+ON CONFLICT (station_id) DO UPDATE SET
+    date = EXCLUDED.date,
+    precipitation_mm = EXCLUDED.precipitation_mm,
+    wind_speed_m_s = EXCLUDED.wind_speed_m_s,
+    "temperature_C" = EXCLUDED."temperature_C",
+    "solar_radiation_W_m2" = EXCLUDED."solar_radiation_W_m2",
+    humidity_percent = EXCLUDED.humidity_percent,
+    "vapor_pressure_hPa" = EXCLUDED."vapor_pressure_hPa",
+    updated_at = EXCLUDED.updated_at
+WHERE l.date <= EXCLUDED.date;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("weather", "0008_rastergenerationjob"),
+    ]
+
+    operations = [
+        migrations.RunSQL(FORWARD_SQL, migrations.RunSQL.noop),
+    ]
@@ -1,14 +1,27 @@
 import os
+import uuid
 from django.contrib.gis.db import models
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from common.models import Province, City, Neighborhood
 from django.conf import settings
+from django.contrib.postgres.indexes import BrinIndex
+from django.db import connection
 
-from core.rasterOperations import interpolate_raster
+from core.rasterOperations import (
+    COG_DIRECTORY, interpolate_raster_windowed, raster_statistics,
+)
+from core.crossValidation import select_method, points_sample
 
 COORDINATE_SYSTEM = settings.COORDINATE_SYSTEM
 
+# SQL reductions of a station's readings inside the interpolation time window
+WINDOW_AGGREGATIONS = {
+    'mean': 'avg({column})',
+    'sum': 'sum({column})',
+    'last': '(array_agg({column} ORDER BY m.date DESC))[1]',
+}
+
 class WMSLayer(models.Model):
     name = models.CharField(max_length=200)
     display_name = models.CharField(max_length=200)
@@ -47,7 +60,11 @@ class WeatherStation(models.Model):
 
 
 class Meteorology(models.Model):
-    """Time-series weather measurements from stations"""
+    """Time-series weather measurements from stations
+
+    The table is range-partitioned by month on `date` (see migration 0003);
+    use `ensure_partitions` before bulk loads that may reach new months.
+    """
     station = models.ForeignKey(
         WeatherStation, 
         on_delete=models.CASCADE, 
@@ -55,8 +72,7 @@ class Meteorology(models.Model):
         help_text="Weather station that recorded this measurement"
     )
     date = models.DateTimeField(
-        help_text="Date and time of the weather data",
-        db_index=True
+        help_text="Date and time of the weather data"
     )
     precipitation_mm = models.FloatField(
         null=True, blank=True,
@@ -88,15 +104,197 @@ class Meteorology(models.Model):
         ordering = ['-date']
         unique_together = ['station', 'date']
         indexes = [
-            models.Index(fields=['date', 'station']),
+            BrinIndex(fields=['date'], name='weather_met_date_brin', pages_per_range=32),
         ]
         verbose_name = "Weather Measurement"
         verbose_name_plural = "Weather Measurements"
     
     def __str__(self):
         return f"{self.station.name} - {self.date.strftime('%Y-%m-%d %H:%M')}"
+
+    def save(self, *args, **kwargs):
+        # Ingest keeps the rollups and MeteorologyLatest current in SQL; ORM
+        # writes do it here (see weather/rollups.py)
+        from weather.rollups import merge_raw_row, refresh_station_days
+
+        previous = None
+        if not self._state.adding:
+            previous = Meteorology.objects.filter(pk=self.pk).values_list('station_id', 'date').first()
+        super().save(*args, **kwargs)
+        if previous is None:
+            merge_raw_row(self.pk, self.date)
+            return
+        refresh_station_days([previous, (self.station_id, self.date)])
+        MeteorologyLatest.refresh_stations({previous[0], self.station_id})
+
+    def delete(self, *args, **kwargs):
+        from weather.rollups import refresh_station_days
+
+        key = (self.station_id, self.date)
+        result = super().delete(*args, **kwargs)
+        refresh_station_days([key])
+        MeteorologyLatest.refresh_stations([key[0]])
+        return result
+    
+    @staticmethod
+    def ensure_partitions(start, end):
+        """Create the monthly partitions covering start..end (inclusive)."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT weather_meteorology_ensure_partition(m)
+                FROM generate_series(
+                    date_trunc('month', %s::timestamptz),
+                    %s::timestamptz,
+                    interval '1 month'
+                ) AS m
+                """,
+                [start, end],
+            )
     
 
+    @staticmethod
+    def station_window_values(field_name, start, end, aggregation='mean'):
+        """
+        One aggregated value per active station for readings of
+        ``field_name`` between ``start`` and ``end`` (inclusive).
+
+        The reduction and the station coordinates are done in a single
+        query, so a station reporting every 5 minutes still yields one row.
+
+        Returns:
+            list of (station_id, x, y, value) tuples
+        """
+        if aggregation not in WINDOW_AGGREGATIONS:
+            raise ValidationError(f"Unknown aggregation '{aggregation}'")
+        column_names = {f.column for f in Meteorology._meta.concrete_fields}
+        if field_name not in column_names:
+            raise ValidationError(f"Unknown measurement field '{field_name}'")
+
+        column = f"m.{connection.ops.quote_name(field_name)}"
+        value_sql = WINDOW_AGGREGATIONS[aggregation].format(column=column)
+        sql = f"""
+            SELECT s.id, ST_X(s.geom), ST_Y(s.geom), {value_sql}
+            FROM {Meteorology._meta.db_table} m
+            JOIN {WeatherStation._meta.db_table} s ON s.id = m.station_id
+            WHERE m.date BETWEEN %s AND %s
+              AND s.is_active
+              AND {column} IS NOT NULL
+            GROUP BY s.id, s.geom
+            ORDER BY s.id
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [start, end])
+            return cursor.fetchall()
+
+
+class MeteorologyRollup(models.Model):
+    """Hourly / daily aggregates of one Meteorology variable at one station
+
+    Maintained incrementally by `weather.ingest.load_observations` and
+    `Meteorology.save` / `delete`, and rebuilt with
+    `manage.py rollup_meteorology` after bulk ORM or raw SQL writes; see
+    weather/rollups.py.
+    Rollups outlive the raw rows once those are downsampled.
+    """
+    class Period(models.TextChoices):
+        HOUR = 'hour', 'Hourly'
+        DAY = 'day', 'Daily'
+
+    station = models.ForeignKey(
+        WeatherStation,
+        on_delete=models.CASCADE,
+        related_name='rollups',
+        help_text="Weather station the aggregate belongs to"
+    )
+    period = models.CharField(max_length=4, choices=Period.choices)
+    bucket = models.DateTimeField(help_text="Start of the hour or day (UTC)")
+    variable = models.CharField(max_length=50, help_text="Meteorology field name, e.g. 'temperature_C'")
+    count = models.IntegerField()
+    min = models.FloatField()
+    max = models.FloatField()
+    sum = models.FloatField()
+    mean = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['station', 'period', 'variable', 'bucket'],
+                name='unique_meteorology_rollup'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['period', 'variable', 'bucket'], name='weather_rollup_series_idx'),
+        ]
+        verbose_name = "Weather Rollup"
+        verbose_name_plural = "Weather Rollups"
+
+    def __str__(self):
+        return f"{self.station_id} {self.variable} {self.period} {self.bucket:%Y-%m-%d %H:%M}"
+
+
+class MeteorologyLatest(models.Model):
+    """Most recent observation per station, kept current on ingest and on
+    Meteorology.save / delete"""
+    station = models.OneToOneField(
+        WeatherStation,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='latest_observation'
+    )
+    date = models.DateTimeField(help_text="Date and time of the observation")
+    precipitation_mm = models.FloatField(null=True, blank=True)
+    wind_speed_m_s = models.FloatField(null=True, blank=True)
+    temperature_C = models.FloatField(null=True, blank=True)
+    solar_radiation_W_m2 = models.FloatField(null=True, blank=True)
+    humidity_percent = models.FloatField(null=True, blank=True)
+    vapor_pressure_hPa = models.FloatField(null=True, blank=True)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Latest Weather Measurement"
+        verbose_name_plural = "Latest Weather Measurements"
+
+    def __str__(self):
+        return f"{self.station_id} - {self.date.strftime('%Y-%m-%d %H:%M')}"
+
+    @staticmethod
+    def refresh_stations(station_ids):
+        """
+        Reset the latest observation of these stations to their newest raw
+        Meteorology row; stations without raw rows left lose theirs.
+        """
+        latest = connection.ops.quote_name(MeteorologyLatest._meta.db_table)
+        raw = connection.ops.quote_name(Meteorology._meta.db_table)
+        fields = [
+            connection.ops.quote_name(f.column) for f in MeteorologyLatest._meta.concrete_fields
+            if isinstance(f, models.FloatField)
+        ]
+        station_ids = list(station_ids)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                DELETE FROM {latest} l
+                WHERE l.station_id = ANY(%s)
+                  AND NOT EXISTS (SELECT 1 FROM {raw} m WHERE m.station_id = l.station_id)
+                """,
+                [station_ids],
+            )
+            cursor.execute(
+                f"""
+                INSERT INTO {latest} (station_id, date, {', '.join(fields)}, updated_at)
+                SELECT DISTINCT ON (station_id) station_id, date, {', '.join(fields)}, now()
+                FROM {raw}
+                WHERE station_id = ANY(%s)
+                ORDER BY station_id, date DESC
+                ON CONFLICT (station_id) DO UPDATE SET
+                    date = EXCLUDED.date,
+                    {', '.join(f"{f} = EXCLUDED.{f}" for f in fields)},
+                    updated_at = EXCLUDED.updated_at
+                """,
+                [station_ids],
+            )
+
 
 class InterpolatedRasterBase(models.Model):
     name = models.CharField(
@@ -135,8 +333,10 @@ class InterpolatedRasterBase(models.Model):
         max_length=50,
         choices=[
             ('idw', 'Inverse Distance Weighting'),
-            ('kriging', 'Kriging'),
-            ('spline', 'Spline'),
+            ('linear', 'Local Linear RBF'),
+            ('kriging', 'Ordinary Kriging'),
+            ('spline', 'Local Thin-Plate Spline'),
+            ('nearest', 'Nearest Station (Thiessen)'),
         ],
         default='idw',
         help_text="Spatial interpolation method used"
@@ -204,59 +404,31 @@ class InterpolatedRasterBase(models.Model):
         min_x, min_y, max_x, max_y = bounds
         return Polygon.from_bbox((min_x, min_y, max_x, max_y))
     
-    def _get_measurements_in_window(self, measurement_datetime, time_window_hours, field_name):
+    def _get_station_values(self, measurement_datetime, time_window_hours, field_name, aggregation):
         """
-        Get measurements within time window for a specific field
+        Interpolation input: one point per station, reduced over the window
         
         Args:
             measurement_datetime: Center datetime
             time_window_hours: Hours around center to include
             field_name: Field to extract (e.g., 'precipitation_mm', 'temperature_C')
+            aggregation: 'mean', 'sum' or 'last' (see WINDOW_AGGREGATIONS)
         
         Returns:
-            QuerySet of WeatherMeasurement
+            tuple: (station_data list, station ids list)
         """
         from datetime import timedelta
         
         time_window = timedelta(hours=time_window_hours)
+        rows = Meteorology.station_window_values(
+            field_name,
+            measurement_datetime - time_window,
+            measurement_datetime + time_window,
+            aggregation,
+        )
         
-        # Build filter dynamically to exclude null values for the specific field
-        filter_kwargs = {
-            'date__gte': measurement_datetime - time_window,
-            'date__lte': measurement_datetime + time_window,
-            'station__is_active': True,
-            f'{field_name}__isnull': False,
-        }
-        
-        return Meteorology.objects.filter(
-            **filter_kwargs
-        ).select_related('station')
-    
-    def _extract_station_data(self, measurements, field_name):
-        """
-        Extract point data from measurements
-        
-        Args:
-            measurements: QuerySet of WeatherMeasurement
-            field_name: Field to extract values from
-        
-        Returns:
-            tuple: (station_data list, stations_used list)
-        """
-        station_data = []
-        stations_used = []
-        
-        for measurement in measurements:
-            coord = measurement.station.geom
-            value = getattr(measurement, field_name)
-            
-            station_data.append({
-                'x': coord.x,
-                'y': coord.y,
-                'value': value
-            })
-            stations_used.append(measurement.station)
-        
+        station_data = [{'x': x, 'y': y, 'value': value} for _, x, y, value in rows]
+        stations_used = [station_id for station_id, _, _, _ in rows]
         return station_data, stations_used
     
     def generate_from_measurements(self, measurement_datetime=None, 
@@ -277,7 +449,8 @@ class InterpolatedRasterBase(models.Model):
             Province: Province model instance
             datetime: DateTime to interpolate for
             resolution: Cell size in meters
-            method: Interpolation method
+            method: Interpolation method; 'auto' picks the lowest
+                leave-one-out RMSE (see core.crossValidation)
         
         Returns:
             Raster instance
@@ -308,11 +481,27 @@ class InterpolatedRasterBase(models.Model):
         """
         raise NotImplementedError("Child classes must implement _get_metadata_keys")
     
+    def _get_aggregation(self):
+        """
+        How a station's readings in the time window are reduced to one value.
+        Override in child classes for accumulated variables.
+        """
+        return 'mean'
+    
     def generate_from_measurements(self, measurement_datetime=None, 
                                    bounds_geom=None, resolution=10, 
-                                   method='idw', time_window_hours=1):
+                                   method='idw', time_window_hours=1,
+                                   aggregation=None, cog_only=False):
         """
         Generic interpolation method - works for all child classes
+        
+        Each station contributes a single point: its readings in the time
+        window are reduced with `aggregation` (default: the child class's
+        `_get_aggregation()`).
+        
+        With `cog_only` the grid is written straight to a Cloud Optimized
+        GeoTIFF under COG_DIRECTORY and only metadata and bounds are stored;
+        the raster column stays empty.
         """
         from django.contrib.gis.gdal import GDALRaster
         import os
@@ -323,34 +512,74 @@ class InterpolatedRasterBase(models.Model):
         # Get the field name from child class
         field_name = self._get_field_name()
         
-        # Get measurements
-        measurements = self._get_measurements_in_window(
+        # One aggregated value per station
+        station_data, stations_used = self._get_station_values(
             measurement_datetime, 
             time_window_hours, 
-            field_name
+            field_name,
+            aggregation or self._get_aggregation()
         )
         
-        if not measurements.exists():
+        if not station_data:
             raise ValidationError(
                 f"No {field_name} measurements found near {measurement_datetime}"
             )
         
-        # Extract station data
-        station_data, stations_used = self._extract_station_data(
-            measurements, 
-            field_name
-        )
-        
         # Determine bounds
         bounds = self._get_interpolation_bounds(bounds_geom)
         
-        # Perform interpolation
-        raster_path = interpolate_raster(
+        # Leave-one-out scores of the method; 'auto' picks the best one
+        method, method_params, cross_validation = select_method(
+            [points_sample(station_data)], method
+        )
+        
+        # Perform interpolation, written window by window to a tiled GeoTIFF
+        raster_path = interpolate_raster_windowed(
             input_points=station_data,
+            values='value',
             bounds=bounds,
             resolution=resolution,
-            method=method
+            method=method,
+            dst_path=self._cog_output_path(measurement_datetime) if cog_only else None,
+            cog=cog_only,
+            **method_params,
+            **({'cache_weights': True} if method == 'idw' else {})
+        )
+        
+        return self._store_interpolated_raster(
+            raster_path, station_data, stations_used,
+            measurement_datetime, bounds, resolution, method,
+            cog_only=cog_only, cross_validation=cross_validation
         )
+    
+    def _cog_output_path(self, measurement_datetime):
+        """Final location of a directly written COG: cogs/<app>/<Model>_<time>_<uid>.tif"""
+        cog_subdir = os.path.join(COG_DIRECTORY, self._meta.app_label)
+        os.makedirs(cog_subdir, exist_ok=True)
+        stamp = measurement_datetime.strftime('%Y%m%dT%H%M%S')
+        return os.path.join(
+            cog_subdir, f"{self.__class__.__name__}_{stamp}_{uuid.uuid4().hex[:8]}.tif"
+        )
+    
+    def _store_interpolated_raster(self, raster_path, station_data, stations_used,
+                                   measurement_datetime, bounds, resolution, method,
+                                   cog_only=False, cross_validation=None):
+        """
+        Load an interpolated GeoTIFF into this record, fill metadata and save.
+        The temporary file is removed afterwards.
+        
+        With `cog_only`, `raster_path` is the final COG: it is kept, referenced
+        by `cog_path`, and the raster column is left empty.
+        `cross_validation` (leave-one-out RMSE / MAE) is stored in metadata.
+        """
+        from django.contrib.gis.gdal import GDALRaster
+        
+        if cog_only:
+            return self._store_cog(
+                raster_path, station_data, stations_used,
+                measurement_datetime, bounds, resolution, method,
+                cross_validation
+            )
         
         try:
             # Load the raster into PostGIS
@@ -373,6 +602,8 @@ class InterpolatedRasterBase(models.Model):
                 mean_key: float(gdal_raster.bands[0].mean),
                 'unit': unit
             }
+            if cross_validation:
+                self.metadata['cross_validation'] = cross_validation
             
             # Save the model
             self.save()
@@ -387,6 +618,42 @@ class InterpolatedRasterBase(models.Model):
         
         return self
     
+    def _store_cog(self, cog_path, station_data, stations_used,
+                   measurement_datetime, bounds, resolution, method,
+                   cross_validation=None):
+        """Reference an already written COG from this record, fill metadata and save."""
+        stats = raster_statistics(cog_path)
+        min_key, max_key, mean_key, unit = self._get_metadata_keys()
+        
+        self.raster = None
+        # Set before save() so the post_save COG export is skipped
+        self.cog_path = cog_path.replace("\\", "/")
+        self.resolution_m = resolution
+        self.interpolation_method = method
+        self.bounds = self._bounds_to_polygon(bounds)
+        self.metadata = {
+            'num_stations': len(station_data),
+            'measurement_time': measurement_datetime.isoformat(),
+            'bounds': bounds,
+            min_key: stats['min'],
+            max_key: stats['max'],
+            mean_key: stats['mean'],
+            'unit': unit,
+            'storage': 'cog',
+        }
+        if cross_validation:
+            self.metadata['cross_validation'] = cross_validation
+        
+        try:
+            self.save()
+            self.source_stations.set(stations_used)
+        except Exception:
+            if os.path.exists(cog_path):
+                os.remove(cog_path)
+            raise
+        
+        return self
+    
     def save(self, *args, **kwargs):
         # Auto-calculate bounds from raster if not already set
         if self.raster and not self.bounds:
@@ -395,6 +662,111 @@ class InterpolatedRasterBase(models.Model):
         self.full_clean()  # Ensure validation is called before saving
         super().save(*args, **kwargs)
     
+class WeatherCube(models.Model):
+    """One period (e.g. a day) of an interpolated variable as a multi-band COG
+
+    Band i holds the grid interpolated at band_times[i - 1]. A second COG
+    (aggregate_path) holds per-pixel min / max / mean / sum over the bands.
+    Built by weather.cubes.build_cubes.
+    """
+    raster_model = models.CharField(
+        max_length=50,
+        help_text="Raster layer the bands belong to, e.g. 'TemperatureRaster'"
+    )
+    variable = models.CharField(max_length=50, help_text="Meteorology field interpolated")
+    Province = models.ForeignKey(
+        'common.Province',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        help_text="Province this cube covers"
+    )
+    period_start = models.DateTimeField(help_text="Start of the period covered by the bands")
+    period_end = models.DateTimeField(help_text="End of the period covered by the bands (exclusive)")
+    band_times = models.JSONField(
+        default=list,
+        help_text="ISO timestamp of each band, in band order"
+    )
+    cog_path = models.CharField(max_length=500)
+    aggregate_path = models.CharField(
+        max_length=500, blank=True, null=True,
+        help_text="COG with per-pixel min / max / mean / sum bands"
+    )
+    bounds = models.PolygonField(srid=COORDINATE_SYSTEM, null=True, blank=True)
+    resolution_m = models.FloatField(default=10)
+    interpolation_method = models.CharField(max_length=50, default='idw')
+    metadata = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Per-band and period statistics"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-period_start']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['raster_model', 'Province', 'period_start'],
+                name='unique_weather_cube'
+            ),
+        ]
+        verbose_name = "Weather Cube"
+        verbose_name_plural = "Weather Cubes"
+
+    def __str__(self):
+        return f"{self.raster_model} cube - {self.period_start.strftime('%Y-%m-%d %H:%M')}"
+
+    def band_for(self, when):
+        """
+        1-based band index whose timestamp is nearest to `when`, or None when
+        `when` lies outside the cube's period.
+        """
+        from datetime import datetime
+        
+        if not self.band_times or not (self.period_start <= when < self.period_end):
+            return None
+        times = [datetime.fromisoformat(t) for t in self.band_times]
+        nearest = min(range(len(times)), key=lambda i: abs(times[i] - when))
+        return nearest + 1
+
+
+class RasterGenerationJob(models.Model):
+    """A weather.batch.generate_range run requested through the API
+
+    The request only queues the job; `manage.py generate_weather_rasters
+    --queued` runs it and stores the created / skipped rasters in result.
+    """
+    class Status(models.TextChoices):
+        QUEUED = 'queued', 'Queued'
+        RUNNING = 'running', 'Running'
+        DONE = 'done', 'Done'
+        FAILED = 'failed', 'Failed'
+
+    Province = models.ForeignKey(
+        'common.Province',
+        on_delete=models.CASCADE,
+        help_text="Province whose extent is interpolated"
+    )
+    params = models.JSONField(
+        default=dict,
+        help_text="models, start, end, step, resolution, method, window_hours, cog_only"
+    )
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.QUEUED)
+    result = models.JSONField(null=True, blank=True, help_text="Created and skipped rasters")
+    error = models.TextField(blank=True, default='')
+    requested_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['requested_at']
+        verbose_name = "Raster Generation Job"
+        verbose_name_plural = "Raster Generation Jobs"
+
+    def __str__(self):
+        return f"{self.params.get('start')} → {self.params.get('end')} ({self.status})"
+
+
 class PrecipitationRaster(InterpolatedRasterBase):
     """Interpolated precipitation raster layer"""
     
@@ -412,6 +784,9 @@ class PrecipitationRaster(InterpolatedRasterBase):
     def _get_metadata_keys(self):
         return ('min_precipitation_mm', 'max_precipitation_mm', 
                 'mean_precipitation_mm', 'mm')
+    
+    def _get_aggregation(self):
+        return 'sum'
 
 
 class TemperatureRaster(InterpolatedRasterBase):
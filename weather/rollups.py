@@ -0,0 +1,230 @@
+"""
+Maintained Meteorology rollups.
+
+Two tables sit next to the raw, partitioned Meteorology table:
+
+- MeteorologyRollup: count / min / max / sum / mean per station, variable
+  and hour or day (UTC buckets).
+- MeteorologyLatest: the newest observation of every station.
+
+Ingest (weather.ingest.load_observations) folds each batch into both in the
+same statement that inserts the raw rows, adding only rows that were
+actually inserted. ``Meteorology.save`` / ``delete`` keep the buckets of
+the station-day they touch current: a new row is merged in with one
+statement, an edited or deleted one has its station-day recomputed.
+QuerySet.update / bulk_create / delete and raw SQL bypass both paths; run
+``manage.py rollup_meteorology`` (``rebuild_rollups``) after those.
+``downsample_raw`` drops raw rows past the retention period once their
+rollups are in place.
+"""
+import re
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.db import connection, models
+
+from weather.models import Meteorology, MeteorologyRollup, MeteorologyLatest
+
+
+ROLLUP_FIELDS = [
+    f.column for f in Meteorology._meta.concrete_fields
+    if isinstance(f, models.FloatField)
+]
+
+_PARTITION_RE = re.compile(rf"^{Meteorology._meta.db_table}_(\d{{4}})(\d{{2}})$")
+
+
+def _q(name):
+    return connection.ops.quote_name(name)
+
+
+def _period_sql(period, table, source, merge):
+    """INSERT ... ON CONFLICT for one rollup period from the ``long`` CTE."""
+    stats = ['count', 'sum', 'min', 'max', 'mean']
+    if merge:
+        updates = [
+            f"{_q('count')} = r.{_q('count')} + EXCLUDED.{_q('count')}",
+            f"{_q('sum')} = r.{_q('sum')} + EXCLUDED.{_q('sum')}",
+            f"{_q('min')} = least(r.{_q('min')}, EXCLUDED.{_q('min')})",
+            f"{_q('max')} = greatest(r.{_q('max')}, EXCLUDED.{_q('max')})",
+            f"{_q('mean')} = (r.{_q('sum')} + EXCLUDED.{_q('sum')}) "
+            f"/ (r.{_q('count')} + EXCLUDED.{_q('count')})",
+        ]
+    else:
+        updates = [f"{_q(s)} = EXCLUDED.{_q(s)}" for s in stats]
+
+    return f"""
+        INSERT INTO {table} AS r
+            (station_id, period, bucket, variable, {', '.join(_q(s) for s in stats)})
+        SELECT
+            station_id, '{period}', date_trunc('{period}', date, 'UTC'), variable,
+            count(*), sum(value), min(value), max(value), avg(value)
+        FROM {source}
+        GROUP BY station_id, date_trunc('{period}', date, 'UTC'), variable
+        ON CONFLICT (station_id, period, variable, bucket) DO UPDATE SET
+            {', '.join(updates)}
+    """
+
+
+def rollup_sql(source_sql, merge=True):
+    """
+    Wrap a statement producing Meteorology rows into one SQL statement that
+    also updates the hourly and daily rollups and the latest-value table.
+
+    ``source_sql`` must return station_id, date and every ROLLUP_FIELDS
+    column; it may be a plain SELECT or an ``INSERT ... RETURNING``. With
+    ``merge`` the rows are added to existing buckets (ingest of new rows),
+    otherwise the buckets are overwritten (rebuild from complete raw data).
+    The statement returns the number of source rows.
+    """
+    rollup_table = _q(MeteorologyRollup._meta.db_table)
+    latest_table = _q(MeteorologyLatest._meta.db_table)
+    fields = ', '.join(_q(f) for f in ROLLUP_FIELDS)
+    pairs = ', '.join(f"('{f}', src.{_q(f)})" for f in ROLLUP_FIELDS)
+
+    return f"""
+        WITH src AS (
+            {source_sql}
+        ),
+        long AS (
+            SELECT src.station_id, src.date, v.variable, v.value
+            FROM src
+            CROSS JOIN LATERAL (VALUES {pairs}) AS v(variable, value)
+            WHERE v.value IS NOT NULL
+        ),
+        hourly AS ({_period_sql('hour', rollup_table, 'long', merge)}),
+        daily AS ({_period_sql('day', rollup_table, 'long', merge)}),
+        latest AS (
+            INSERT INTO {latest_table} AS l (station_id, date, {fields}, updated_at)
+            SELECT DISTINCT ON (station_id) station_id, date, {fields}, now()
+            FROM src
+            ORDER BY station_id, date DESC
+            ON CONFLICT (station_id) DO UPDATE SET
+                date = EXCLUDED.date,
+                {', '.join(f"{_q(f)} = EXCLUDED.{_q(f)}" for f in ROLLUP_FIELDS)},
+                updated_at = EXCLUDED.updated_at
+            WHERE l.date <= EXCLUDED.date
+        )
+        SELECT count(*) FROM src
+    """
+
+
+def _day_floor(value):
+    return datetime.combine(value.astimezone(dt_timezone.utc).date(), time.min, tzinfo=dt_timezone.utc)
+
+
+def rebuild_rollups(start=None, end=None):
+    """
+    Recompute rollups and latest values from raw Meteorology rows.
+
+    The range is widened to whole UTC days so every daily bucket is
+    complete. Buckets without raw rows (e.g. already downsampled) are left
+    untouched.
+
+    Returns:
+        Number of raw rows read.
+    """
+    table = _q(Meteorology._meta.db_table)
+    with connection.cursor() as cursor:
+        if start is None or end is None:
+            cursor.execute(f"SELECT min(date), max(date) FROM {table}")
+            first, last = cursor.fetchone()
+            if first is None:
+                return 0
+            start = start or first
+            end = end or last
+
+        source = (
+            f"SELECT station_id, date, {', '.join(_q(f) for f in ROLLUP_FIELDS)} "
+            f"FROM {table} WHERE date >= %s AND date < %s"
+        )
+        cursor.execute(rollup_sql(source, merge=False), [_day_floor(start), _day_floor(end) + timedelta(days=1)])
+        return cursor.fetchone()[0]
+
+
+def merge_raw_row(pk, date):
+    """Fold one newly inserted raw row into its buckets and the latest values."""
+    table = _q(Meteorology._meta.db_table)
+    source = (
+        f"SELECT station_id, date, {', '.join(_q(f) for f in ROLLUP_FIELDS)} "
+        f"FROM {table} WHERE id = %s AND date = %s"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(rollup_sql(source, merge=True), [pk, date])
+
+
+def refresh_station_days(keys):
+    """
+    Recompute the buckets of the UTC days of (station_id, datetime) pairs.
+
+    Used after raw rows are edited or deleted, which cannot be merged into
+    existing buckets. A day that had a raw row has not been downsampled, so
+    its remaining raw rows are complete; buckets left without rows go away.
+    """
+    rollups = _q(MeteorologyRollup._meta.db_table)
+    table = _q(Meteorology._meta.db_table)
+    source = (
+        f"SELECT station_id, date, {', '.join(_q(f) for f in ROLLUP_FIELDS)} "
+        f"FROM {table} WHERE station_id = %s AND date >= %s AND date < %s"
+    )
+    with connection.cursor() as cursor:
+        for station_id, day in {(station_id, _day_floor(date)) for station_id, date in keys}:
+            params = [station_id, day, day + timedelta(days=1)]
+            cursor.execute(
+                f"DELETE FROM {rollups} WHERE station_id = %s AND bucket >= %s AND bucket < %s",
+                params,
+            )
+            cursor.execute(rollup_sql(source, merge=False), params)
+
+
+def downsample_raw(before):
+    """
+    Drop raw Meteorology rows older than ``before``, keeping their rollups.
+
+    Rollups for the dropped range are rebuilt first. Whole monthly
+    partitions are dropped; the remainder is deleted row by row.
+
+    Returns:
+        dict with 'partitions_dropped' (names) and 'rows_deleted'.
+    """
+    before = _day_floor(before)
+    rebuild_rollups(end=before - timedelta(microseconds=1))
+
+    dropped = []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = %s::regclass
+            """,
+            [Meteorology._meta.db_table],
+        )
+        for (name,) in cursor.fetchall():
+            match = _PARTITION_RE.match(name)
+            if not match:
+                continue
+            year, month = int(match.group(1)), int(match.group(2))
+            month_end = datetime(year + month // 12, month % 12 + 1, 1, tzinfo=dt_timezone.utc)
+            if month_end <= before:
+                cursor.execute(f"DROP TABLE {_q(name)}")
+                dropped.append(name)
+
+        cursor.execute(f"DELETE FROM {_q(Meteorology._meta.db_table)} WHERE date < %s", [before])
+        deleted = cursor.rowcount
+
+    return {'partitions_dropped': dropped, 'rows_deleted': deleted}
+
+
+def station_series(station_ids, variable, period=MeteorologyRollup.Period.HOUR, start=None, end=None):
+    """Rollup rows for charting: one row per station and bucket."""
+    qs = MeteorologyRollup.objects.filter(
+        station_id__in=station_ids, variable=variable, period=period,
+    )
+    if start:
+        qs = qs.filter(bucket__gte=start)
+    if end:
+        qs = qs.filter(bucket__lte=end)
+    return qs.order_by('station_id', 'bucket').values(
+        'station_id', 'bucket', 'count', 'min', 'max', 'sum', 'mean'
+    )
@@ -1,3 +1,84 @@
-from django.test import TestCase
+from django.test import RequestFactory, SimpleTestCase, override_settings
+import numpy as np
+import pandas as pd
 
-# Create your tests here.
+from datetime import datetime, timedelta
+
+from weather.batch import count_timesteps, timesteps
+from weather.ingest import prepare_observations
+from weather.views import generate_rasters, ingest_observations
+
+
+class TestPrepareObservations(SimpleTestCase):
+
+    lookup = {'12': 12, '7': 7, 'Enschede': 7}
+
+    def test_float_station_ids_match(self):
+        # A gap in the column makes pandas read the ids as 12.0 / 7.0
+        df = pd.DataFrame({
+            'station_id': [12, np.nan, 7],
+            'date': ['2025-07-01T10:00Z'] * 3,
+            'temperature_C': [21.5, 20.0, 19.0],
+        })
+        clean, rejected = prepare_observations(df, lookup=self.lookup)
+        self.assertEqual(sorted(clean['station_id']), [7, 12])
+        self.assertEqual(list(rejected['reason']), ['unknown station'])
+
+    def test_names_and_ids_mix(self):
+        df = pd.DataFrame({
+            'station': ['Enschede', ' 12 ', '12.5'],
+            'date': ['2025-07-01T10:00Z', '2025-07-01T11:00Z', '2025-07-01T12:00Z'],
+            'temperature_C': [21.5, 20.0, 19.0],
+        })
+        clean, rejected = prepare_observations(df, lookup=self.lookup)
+        self.assertEqual(list(clean['station_id']), [7, 12])
+        self.assertEqual(list(rejected['reason']), ['unknown station'])
+
+
+class TestIngestAuthentication(SimpleTestCase):
+
+    def post(self, **headers):
+        request = RequestFactory().post(
+            '/weather/observations/ingest/', data='', content_type='application/x-ndjson', headers=headers,
+        )
+        return ingest_observations(request)
+
+    @override_settings(WEATHER_INGEST_TOKEN=None)
+    def test_disabled_without_token(self):
+        self.assertEqual(self.post(Authorization='Token anything').status_code, 503)
+
+    @override_settings(WEATHER_INGEST_TOKEN='s3cret')
+    def test_rejects_wrong_or_missing_token(self):
+        self.assertEqual(self.post(Authorization='Token wrong').status_code, 401)
+        self.assertEqual(self.post().status_code, 401)
+
+
+class TestGenerateRastersAuthentication(SimpleTestCase):
+
+    def post(self, **headers):
+        request = RequestFactory().post(
+            '/weather/rasters/generate/', data='{}', content_type='application/json', headers=headers,
+        )
+        return generate_rasters(request)
+
+    @override_settings(WEATHER_INGEST_TOKEN=None)
+    def test_disabled_without_token(self):
+        self.assertEqual(self.post(Authorization='Token anything').status_code, 503)
+
+    @override_settings(WEATHER_INGEST_TOKEN='s3cret')
+    def test_rejects_wrong_or_missing_token(self):
+        self.assertEqual(self.post(Authorization='Token wrong').status_code, 401)
+        self.assertEqual(self.post().status_code, 401)
+
+
+class TestCountTimesteps(SimpleTestCase):
+
+    def test_matches_timesteps(self):
+        start = datetime(2024, 1, 1)
+        for step in ('hourly', 'daily'):
+            for hours in (0, 1, 23, 24, 25, 24 * 40 + 7):
+                end = start + timedelta(hours=hours)
+                self.assertEqual(count_timesteps(start, end, step), len(list(timesteps(start, end, step))))
+
+    def test_empty_range(self):
+        self.assertEqual(count_timesteps(datetime(2024, 1, 2), datetime(2024, 1, 1)), 0)
@@ -0,0 +1,14 @@
+from django.urls import path
+from . import views
+
+app_name = "weather"
+
+urlpatterns = [
+    path('rasters/generate/', views.generate_rasters, name='generate_rasters'),
+    path('rasters/jobs/<int:job_id>/', views.raster_job, name='raster_job'),
+    path('observations/ingest/', views.ingest_observations, name='ingest_observations'),
+    path('cubes/', views.list_cubes, name='list_cubes'),
+    path('cubes/<int:cube_id>/', views.cube_info, name='cube_info'),
+    path('cubes/<int:cube_id>/tiles/', views.cube_tiles, name='cube_tiles'),
+    path('cubes/<int:cube_id>/point/', views.cube_point, name='cube_point'),
+]
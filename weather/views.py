@@ -1,3 +1,358 @@
-from django.shortcuts import render
+import hmac
+import io
+import json
+import threading
+import uuid
+from datetime import datetime
+
+import pandas as pd
+from django.conf import settings
+from django.db import transaction
+from django.http import JsonResponse
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from urllib.parse import quote
+
+from common.models import Province
+from core.rasterOperations import BAND_AGGREGATES
+from .batch import RASTER_MODELS, STEPS, count_timesteps
+from .ingest import prepare_observations, load_observations
+from .models import WeatherCube, RasterGenerationJob
+
+# Larger ranges belong in `manage.py generate_weather_rasters`
+MAX_API_RASTERS = 96
+
+# Ingest backpressure: rows per request and concurrent batches per worker
+MAX_INGEST_ROWS = 50_000
+MAX_CONCURRENT_INGESTS = 2
+_ingest_slots = threading.BoundedSemaphore(MAX_CONCURRENT_INGESTS)
+
+
+def _parse_datetime(value):
+    parsed = datetime.fromisoformat(value)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def _token_error(request):
+    """
+    None when the request carries ``Authorization: Token <WEATHER_INGEST_TOKEN>``,
+    else the error response: 503 without a configured token, 401 otherwise.
+    """
+    token = getattr(settings, 'WEATHER_INGEST_TOKEN', None)
+    if not token:
+        return JsonResponse({"error": "The weather API token is not configured"}, status=503)
+    supplied = request.headers.get('Authorization', '')
+    if not hmac.compare_digest(supplied.encode(), f"Token {token}".encode()):
+        return JsonResponse({"error": "Invalid weather API token"}, status=401)
+    return None
+
+
+@csrf_exempt
+@require_POST
+def generate_rasters(request):
+    """
+    Queue interpolated rasters for a time range.
+
+    POST JSON: province, start, end (ISO datetimes), step ('hourly'/'daily'),
+    models (list of raster model names), resolution, method, window_hours,
+    cog_only (write COGs directly, no PostGIS raster).
+
+    Returns 202 with the job id; `manage.py generate_weather_rasters --queued`
+    runs the job and raster_job reports its progress. Requests need the
+    ingest token (see ingest_observations).
+    """
+    error = _token_error(request)
+    if error:
+        return error
+
+    try:
+        body = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON"}, status=400)
+
+    try:
+        province = Province.objects.get(ProvinceName=body.get("province"))
+    except Province.DoesNotExist:
+        return JsonResponse({"error": f"Province '{body.get('province')}' not found"}, status=404)
+
+    try:
+        start = _parse_datetime(body["start"])
+        end = _parse_datetime(body["end"])
+    except (KeyError, TypeError, ValueError):
+        return JsonResponse({"error": "start and end must be ISO datetimes"}, status=400)
+
+    step = body.get("step", "hourly")
+    if step not in STEPS:
+        return JsonResponse({"error": f"step must be one of {', '.join(STEPS)}"}, status=400)
+
+    model_names = body.get("models") or list(RASTER_MODELS)
+    invalid = [m for m in model_names if m not in RASTER_MODELS]
+    if invalid:
+        return JsonResponse({"error": f"Unknown raster models: {', '.join(invalid)}"}, status=400)
+
+    n_rasters = count_timesteps(start, end, step) * len(model_names)
+    if n_rasters > MAX_API_RASTERS:
+        return JsonResponse({
+            "error": f"{n_rasters} rasters requested, the API limit is {MAX_API_RASTERS}. "
+                     f"Use the generate_weather_rasters management command for larger ranges."
+        }, status=400)
+
+    try:
+        resolution = float(body.get("resolution", 10))
+        window_hours = float(body.get("window_hours", 1))
+    except (TypeError, ValueError):
+        return JsonResponse({"error": "resolution and window_hours must be numbers"}, status=400)
+
+    job = RasterGenerationJob.objects.create(
+        Province=province,
+        params={
+            "models": model_names,
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "step": step,
+            "resolution": resolution,
+            "method": body.get("method", "idw"),
+            "window_hours": window_hours,
+            "cog_only": bool(body.get("cog_only", False)),
+        },
+    )
+
+    return JsonResponse({"job": job.id, "status": job.status, "rasters": n_rasters}, status=202)
+
+
+@require_GET
+def raster_job(request, job_id):
+    """Status of a queued raster generation, with its result once done."""
+    job = RasterGenerationJob.objects.filter(id=job_id).first()
+    if not job:
+        return JsonResponse({"error": f"Job {job_id} not found"}, status=404)
+
+    return JsonResponse({
+        "job": job.id,
+        "status": job.status,
+        "requested_at": job.requested_at.isoformat(),
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "result": job.result,
+        "error": job.error or None,
+    })
+
+
+def _parse_observation_batch(request):
+    """Read a JSON-lines or CSV request body into a DataFrame."""
+    content_type = request.content_type or ''
+    body = io.BytesIO(request.body)
+    if 'csv' in content_type:
+        return pd.read_csv(body)
+    return pd.read_json(body, lines=True, convert_dates=False)
+
+
+@csrf_exempt
+@require_POST
+def ingest_observations(request):
+    """
+    Push endpoint for station observations.
+
+    Body: JSON lines (application/x-ndjson, default) or CSV (text/csv), one
+    observation per row with station_id (or station name), date and any of
+    the Meteorology measurement fields. Many stations may share a batch.
+
+    Returns a per-batch acknowledgement; 429 with Retry-After when the
+    worker is already busy with other batches, 413 for oversized batches.
+    Requests need ``Authorization: Token <WEATHER_INGEST_TOKEN>``; without
+    a configured token the endpoint is disabled (503).
+    """
+    error = _token_error(request)
+    if error:
+        return error
+
+    batch_id = request.headers.get('X-Batch-Id') or uuid.uuid4().hex
+
+    if not _ingest_slots.acquire(blocking=False):
+        response = JsonResponse({"batch_id": batch_id, "error": "Ingest busy, retry later"}, status=429)
+        response['Retry-After'] = '1'
+        return response
+
+    try:
+        try:
+            df = _parse_observation_batch(request)
+        except ValueError as e:
+            return JsonResponse({"batch_id": batch_id, "error": f"Unreadable batch: {e}"}, status=400)
+
+        if len(df) > MAX_INGEST_ROWS:
+            return JsonResponse({
+                "batch_id": batch_id,
+                "error": f"Batch has {len(df)} rows, the limit is {MAX_INGEST_ROWS}",
+            }, status=413)
+
+        try:
+            clean, rejected = prepare_observations(df)
+        except ValueError as e:
+            return JsonResponse({"batch_id": batch_id, "error": str(e)}, status=400)
+
+        with transaction.atomic():
+            inserted = load_observations(clean)
+    finally:
+        _ingest_slots.release()
+
+    return JsonResponse({
+        "batch_id": batch_id,
+        "received": len(df),
+        "inserted": inserted,
+        "duplicates": len(clean) - inserted,
+        "rejected": rejected['reason'].value_counts().to_dict() if len(rejected) else {},
+    })
+
+
+# ── Weather cubes ─────────────────────────────────────────────────────
+
+def _cube_band(cube, request):
+    """
+    (path, band index, label) selected by ?aggregate=<min|max|mean|sum> or
+    ?time=<ISO datetime>; the first band when neither is given. Returns an
+    error JsonResponse instead when the selection is invalid.
+    """
+    aggregate = request.GET.get('aggregate')
+    if aggregate:
+        if aggregate not in BAND_AGGREGATES or not cube.aggregate_path:
+            return JsonResponse({"error": f"aggregate must be one of {', '.join(BAND_AGGREGATES)}"}, status=400)
+        return cube.aggregate_path, BAND_AGGREGATES.index(aggregate) + 1, aggregate
+
+    when = request.GET.get('time')
+    if not when:
+        return cube.cog_path, 1, cube.band_times[0] if cube.band_times else None
+    try:
+        band = cube.band_for(_parse_datetime(when))
+    except ValueError:
+        return JsonResponse({"error": "time must be an ISO datetime"}, status=400)
+    if band is None:
+        return JsonResponse({"error": f"{when} is outside this cube's period"}, status=404)
+    return cube.cog_path, band, cube.band_times[band - 1]
+
+
+@require_GET
+def list_cubes(request):
+    """Cubes filtered by ?model=<raster model>, ?province=<name> and ?time=<ISO datetime>."""
+    cubes = WeatherCube.objects.all()
+    if request.GET.get('model'):
+        cubes = cubes.filter(raster_model=request.GET['model'])
+    if request.GET.get('province'):
+        cubes = cubes.filter(Province__ProvinceName=request.GET['province'])
+    if request.GET.get('time'):
+        try:
+            when = _parse_datetime(request.GET['time'])
+        except ValueError:
+            return JsonResponse({"error": "time must be an ISO datetime"}, status=400)
+        cubes = cubes.filter(period_start__lte=when, period_end__gt=when)
+
+    return JsonResponse({"cubes": [
+        {
+            "id": cube.id,
+            "model": cube.raster_model,
+            "variable": cube.variable,
+            "period_start": cube.period_start.isoformat(),
+            "period_end": cube.period_end.isoformat(),
+            "bands": len(cube.band_times),
+        }
+        for cube in cubes[:200]
+    ]})
+
+
+@require_GET
+def cube_info(request, cube_id):
+    """Band-to-time mapping, bounds and statistics of a cube."""
+    cube = WeatherCube.objects.filter(id=cube_id).first()
+    if not cube:
+        return JsonResponse({"error": f"Cube {cube_id} not found"}, status=404)
+
+    return JsonResponse({
+        "id": cube.id,
+        "model": cube.raster_model,
+        "variable": cube.variable,
+        "period_start": cube.period_start.isoformat(),
+        "period_end": cube.period_end.isoformat(),
+        "band_times": cube.band_times,
+        "aggregates": list(BAND_AGGREGATES) if cube.aggregate_path else [],
+        "bounds": cube.bounds.extent if cube.bounds else None,
+        "metadata": cube.metadata,
+    })
+
+
+@require_GET
+def cube_tiles(request, cube_id):
+    """TiTiler tile URL for one band of a cube, selected by time or aggregate."""
+    cube = WeatherCube.objects.filter(id=cube_id).first()
+    if not cube:
+        return JsonResponse({"error": f"Cube {cube_id} not found"}, status=404)
+
+    selected = _cube_band(cube, request)
+    if isinstance(selected, JsonResponse):
+        return selected
+    path, band, label = selected
+
+    encoded_url = quote(f"file://{path}", safe="/:")
+    rescale = request.GET.get('rescale') or f"{cube.metadata.get('min', 0)},{cube.metadata.get('max', 40)}"
+    tile_url = (
+        f"{settings.TITILER_BASE_URL}/cog/tiles/WebMercatorQuad/{{z}}/{{x}}/{{y}}.png"
+        f"?url={encoded_url}"
+        f"&bidx={band}"
+        f"&colormap_name={request.GET.get('colormap', 'viridis')}"
+        f"&rescale={rescale}"
+    )
+
+    return JsonResponse({
+        "name": f"weather.{cube.raster_model}",
+        "band": band,
+        "selected": label,
+        "tile_url": tile_url,
+    })
+
+
+@require_GET
+def cube_point(request, cube_id):
+    """
+    Value of a cube at ?lon=&lat= (EPSG:4326).
+
+    With ?time= or ?aggregate= a single band is sampled, otherwise the whole
+    time series of the pixel is returned.
+    """
+    import rasterio
+    from rasterio.warp import transform
+
+    cube = WeatherCube.objects.filter(id=cube_id).first()
+    if not cube:
+        return JsonResponse({"error": f"Cube {cube_id} not found"}, status=404)
+
+    try:
+        lon, lat = float(request.GET['lon']), float(request.GET['lat'])
+    except (KeyError, ValueError):
+        return JsonResponse({"error": "lon and lat are required numbers"}, status=400)
+
+    single = request.GET.get('time') or request.GET.get('aggregate')
+    if single:
+        selected = _cube_band(cube, request)
+        if isinstance(selected, JsonResponse):
+            return selected
+        path, band, label = selected
+        indexes, labels = [band], [label]
+    else:
+        path, indexes, labels = cube.cog_path, list(range(1, len(cube.band_times) + 1)), cube.band_times
+
+    with rasterio.open(path) as src:
+        xs, ys = transform('EPSG:4326', src.crs, [lon], [lat])
+        left, bottom, right, top = src.bounds
+        if not (left <= xs[0] <= right and bottom <= ys[0] <= top):
+            return JsonResponse({"error": "Point is outside the cube extent"}, status=404)
+        sample = next(src.sample([(xs[0], ys[0])], indexes=indexes))
+        nodata = src.nodata
+
+    values = [None if nodata is not None and v == nodata else float(v) for v in sample]
+    return JsonResponse({
+        "cube": cube.id,
+        "unit": cube.metadata.get('unit'),
+        "values": [{"band": label, "value": value} for label, value in zip(labels, values)],
+    })
 
-# Create your views here.
@@ -0,0 +1,40 @@
+"""
+Process pool for the raster workers (weather.batch, weather.cubes).
+
+This module imports nothing from Django at load time: with the 'spawn'
+start method (Windows, where 'fork' does not exist) each worker unpickles
+its initializer by importing this module before Django is set up.
+
+Where available the pool forks, so workers inherit the configured apps;
+otherwise workers are spawned and run django.setup() themselves.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+def _init_worker(cache_mb, setup_django):
+    if setup_django:
+        import django
+
+        django.setup()
+    from core.interpolationWeights import set_cache_limit
+
+    set_cache_limit(cache_mb)
+
+
+def worker_pool(workers=None):
+    """
+    ProcessPoolExecutor with an explicit start method. Each worker's share
+    of the interpolation weights cache is CACHE_MAX_MB / workers.
+    """
+    from core.interpolationWeights import worker_cache_mb
+
+    workers = workers or os.cpu_count()
+    fork = 'fork' in multiprocessing.get_all_start_methods()
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('fork' if fork else 'spawn'),
+        initializer=_init_worker,
+        initargs=(worker_cache_mb(workers), not fork),
+    )